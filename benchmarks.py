@@ -0,0 +1,669 @@
+"""
+Offline benchmarks for the scraper hot paths.
+
+Each benchmark runs on synthetic payloads shaped like the real API
+responses, so nothing here touches the network.
+
+Usage:
+    python benchmarks.py vinted-parse [--items 96 100000]
+    python benchmarks.py accumulate [--rows 10000 100000 1000000] [--naive-max 100000]
+    python benchmarks.py import [--runs 5]
+    python benchmarks.py raw-archive [--pages 2000]
+    python benchmarks.py seen-index [--ids 10000000]
+    python benchmarks.py vc-flatten [--items 60 60000]
+    python benchmarks.py faume-export [--products 2000 50000]
+    python benchmarks.py e2e [--targets vinted vestiaire faume] [--latency 0.02] [--throttle-rate 0.02]
+                                [--vc-mode taxonomy|brand] [--profile DIR]
+
+e2e runs the real collectors against mock_marketplace.py on localhost,
+each target in a fresh interpreter so CPU time and peak RSS are its own.
+With --profile, each target also writes a per-stage report (stage_profiler.py)
+under DIR.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import tracemalloc
+import urllib.request
+from unittest import mock
+
+import pandas as pd
+
+try:
+    from scrapers import vinted_scraper
+    from scrapers.result_accumulator import ResultAccumulator
+    from scrapers.raw_archive import RawArchive
+    from scrapers.seen_index import SeenIndex
+    from scrapers.mock_marketplace import (
+        MarketConfig, MockMarketplace, add_config_arguments, config_from_args, faume_product,
+        vestiaire_item, vestiaire_taxonomy_rows)
+    from scrapers.scraper_metrics import time_breakdown
+    from scrapers.stage_profiler import profiler
+except Exception:
+    import vinted_scraper
+    from result_accumulator import ResultAccumulator
+    from raw_archive import RawArchive
+    from seen_index import SeenIndex
+    from mock_marketplace import (
+        MarketConfig, MockMarketplace, add_config_arguments, config_from_args, faume_product,
+        vestiaire_item, vestiaire_taxonomy_rows)
+    from scraper_metrics import time_breakdown
+    from stage_profiler import profiler
+
+
+def _timeit(fn, repeat: int = 5) -> float:
+    """Best-of-N wall time in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_vinted_item(i: int) -> dict:
+    """Synthetic catalog item with the fields vinted_api_to_df reads."""
+    return {
+        'id': 4000000000 + i,
+        'title': f"Jean slim {i}",
+        'price': {'amount': f"{random.uniform(3, 300):.2f}", 'currency_code': 'EUR'},
+        'is_visible': True,
+        'brand_title': 'Levi\'s',
+        'path': f"/items/{4000000000 + i}-jean-slim",
+        'url': f"https://www.vinted.fr/items/{4000000000 + i}-jean-slim",
+        'promoted': bool(i % 7 == 0),
+        'favourite_count': random.randint(0, 200),
+        'is_favourite': False,
+        'service_fee': {'amount': f"{random.uniform(0.7, 15):.2f}", 'currency_code': 'EUR'},
+        'total_item_price': {'amount': f"{random.uniform(4, 320):.2f}", 'currency_code': 'EUR'},
+        'view_count': random.randint(0, 5000),
+        'size_title': random.choice(['XS', 'S', 'M', 'L', 'W28', 'W30']),
+        'content_source': 'search',
+        'status': random.choice(['Très bon état', 'Bon état', 'Neuf avec étiquette']),
+        'user': {'id': 1000 + i % 5000, 'login': f"user{i % 5000}",
+                 'profile_url': f"https://www.vinted.fr/member/{1000 + i % 5000}", 'business': False},
+        'photo': None if i % 50 == 0 else {
+            'id': 9000000000 + i, 'width': 600, 'height': 800,
+            'url': f"https://images1.vinted.net/t/{i}.jpeg",
+            'dominant_color': '#2D3A4B', 'is_main': True,
+        },
+        'item_box': {'first_line': 'M', 'second_line': 'Très bon état',
+                     'accessibility_label': f"Jean slim {i}", 'item_id': 4000000000 + i},
+        'search_tracking_params': {'score': random.random()},
+    }
+
+
+def make_vinted_payload(n_items: int) -> dict:
+    return {'items': [make_vinted_item(i) for i in range(n_items)]}
+
+
+def _vinted_api_to_df_rowwise(data: dict) -> pd.DataFrame:
+    """Pre-columnar vinted_api_to_df (dict per item), kept as the baseline."""
+    flattened_items = []
+    for item in data.get('items', []):
+        flattened_items.append({
+            'id': item.get('id'),
+            'title': item.get('title'),
+            'price_amount': item.get('price', {}).get('amount'),
+            'price_currency': item.get('price', {}).get('currency_code'),
+            'is_visible': item.get('is_visible'),
+            'brand_title': item.get('brand_title'),
+            'path': item.get('path'),
+            'url': item.get('url'),
+            'promoted': item.get('promoted'),
+            'favourite_count': item.get('favourite_count'),
+            'is_favourite': item.get('is_favourite'),
+            'service_fee_amount': item.get('service_fee', {}).get('amount'),
+            'service_fee_currency': item.get('service_fee', {}).get('currency_code'),
+            'total_item_price_amount': item.get('total_item_price', {}).get('amount'),
+            'total_item_price_currency': item.get('total_item_price', {}).get('currency_code'),
+            'view_count': item.get('view_count'),
+            'size_title': item.get('size_title'),
+            'content_source': item.get('content_source'),
+            'status': item.get('status'),
+            'user_id': item.get('user', {}).get('id'),
+            'user_login': item.get('user', {}).get('login'),
+            'user_profile_url': item.get('user', {}).get('profile_url'),
+            'user_business': item.get('user', {}).get('business'),
+            'photo_id': item.get('photo', {}).get('id') if item.get('photo') else None,
+            'photo_width': item.get('photo', {}).get('width') if item.get('photo') else None,
+            'photo_height': item.get('photo', {}).get('height') if item.get('photo') else None,
+            'photo_url': item.get('photo', {}).get('url') if item.get('photo') else None,
+            'photo_dominant_color': item.get('photo', {}).get('dominant_color') if item.get('photo') else None,
+            'photo_is_main': item.get('photo', {}).get('is_main') if item.get('photo') else None,
+            'item_box_first_line': item.get('item_box', {}).get('first_line'),
+            'item_box_second_line': item.get('item_box', {}).get('second_line'),
+            'item_box_accessibility_label': item.get('item_box', {}).get('accessibility_label'),
+            'item_box_item_id': item.get('item_box', {}).get('item_id'),
+            'search_score': item.get('search_tracking_params', {}).get('score'),
+        })
+    df = pd.DataFrame(flattened_items)
+    for col in ['price_amount', 'service_fee_amount', 'total_item_price_amount',
+                'favourite_count', 'view_count', 'photo_width', 'photo_height', 'search_score']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def bench_vinted_parse(sizes: list[int]) -> None:
+    """Row-wise vs columnar vinted_api_to_df, from raw JSON text."""
+    print(f"{'items':>8} {'rowwise_s':>10} {'columnar_s':>11} {'speedup':>8}")
+    for n in sizes:
+        raw = json.dumps(make_vinted_payload(n))
+        data = json.loads(raw)
+        pd.testing.assert_frame_equal(_vinted_api_to_df_rowwise(data), vinted_scraper.vinted_api_to_df(data))
+        repeat = 20 if n <= 1000 else 3
+        old = _timeit(lambda: _vinted_api_to_df_rowwise(data), repeat)
+        new = _timeit(lambda: vinted_scraper.vinted_api_to_df(data), repeat)
+        print(f"{n:>8} {old:>10.4f} {new:>11.4f} {old / new:>7.2f}x")
+
+
+def _page_chunks(total_rows: int, page_size: int = 96) -> list[pd.DataFrame]:
+    """Pre-built page frames with a catalog-like mix of columns."""
+    template = vinted_scraper.vinted_api_to_df(make_vinted_payload(page_size))
+    n_pages = -(-total_rows // page_size)
+    return [template] * n_pages
+
+
+def _measure(fn) -> tuple[float, float]:
+    """Wall seconds and tracemalloc peak (MiB) of one call."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def bench_accumulate(sizes: list[int], naive_max: int) -> None:
+    """Per-page pd.concat vs ResultAccumulator over 96-row pages."""
+    def naive(chunks):
+        full_df = pd.DataFrame()
+        for df in chunks:
+            full_df = pd.concat([full_df, df])
+        return full_df
+
+    def accumulated(chunks):
+        results = ResultAccumulator()
+        for df in chunks:
+            results.add(df)
+        return results.to_frame()
+
+    print(f"{'rows':>8} {'concat_s':>9} {'concat_MiB':>11} {'accum_s':>8} {'accum_MiB':>10}")
+    for n in sizes:
+        chunks = _page_chunks(n)
+        new_s, new_mb = _measure(lambda: accumulated(chunks))
+        if n <= naive_max:
+            old_s, old_mb = _measure(lambda: naive(chunks))
+            old = f"{old_s:>9.2f} {old_mb:>11.1f}"
+        else:
+            old = f"{'skipped':>9} {'(quadratic)':>11}"
+        print(f"{n:>8} {old} {new_s:>8.2f} {new_mb:>10.1f}")
+
+
+IMPORT_TARGETS = ['pandas', 'vinted_scraper', 'vestiaire_co', 'faume_api', 'vc_condition_collector']
+
+
+def bench_import(runs: int) -> None:
+    """Fresh-interpreter import time per module (best of N), plus bare spawn cost."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    snippet = ("import time; t0 = time.perf_counter(); import {mod}; "
+               "print(time.perf_counter() - t0)")
+    print(f"{'module':<24} {'import_ms':>10} {'spawn+import_ms':>16}")
+    for mod in IMPORT_TARGETS:
+        best_import, best_total = float('inf'), float('inf')
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            out = subprocess.run([sys.executable, '-c', snippet.format(mod=mod)], cwd=here,
+                                 capture_output=True, text=True)
+            total = time.perf_counter() - t0
+            if out.returncode != 0:
+                best_import = None
+                break
+            best_import = min(best_import, float(out.stdout.strip().splitlines()[-1]))
+            best_total = min(best_total, total)
+        if best_import is None:
+            print(f"{mod:<24} {'failed':>10}  {out.stderr.strip().splitlines()[-1][:60]}")
+        else:
+            print(f"{mod:<24} {best_import * 1000:>10.1f} {best_total * 1000:>16.1f}")
+
+
+def _tree_usage(root: Path) -> tuple[int, int]:
+    """(file count, bytes) under a directory."""
+    files = [p for p in root.rglob('*') if p.is_file()]
+    return len(files), sum(p.stat().st_size for p in files)
+
+
+def bench_raw_archive(pages: int) -> None:
+    """One JSON file per page (parse + re-serialize) vs the compressed segment archive."""
+    bodies = [json.dumps(make_vinted_payload(96)).encode('utf-8') for _ in range(20)]
+    tmp = Path(tempfile.mkdtemp(prefix='raw_bench_'))
+    try:
+        def per_file():
+            for i in range(pages):
+                target = tmp / 'files' / '53' / str(221 + i % 5)
+                target.mkdir(parents=True, exist_ok=True)
+                with open(target / f"20250101_000000_p{i}.json", 'w', encoding='utf-8') as f:
+                    json.dump(json.loads(bodies[i % 20]), f, ensure_ascii=False)
+
+        archive = RawArchive(tmp / 'archive')
+
+        def archived():
+            for i in range(pages):
+                archive.append(bodies[i % 20], 53, 221 + i % 5, i)
+
+        t0 = time.perf_counter(); per_file(); old_s = time.perf_counter() - t0
+        t0 = time.perf_counter(); archived(); new_s = time.perf_counter() - t0
+        old_n, old_b = _tree_usage(tmp / 'files')
+        new_n, new_b = _tree_usage(tmp / 'archive')
+        refs = [ref for seg in archive.segments() for ref in archive.index(seg)]
+        t0 = time.perf_counter()
+        for ref in random.sample(refs, min(200, len(refs))):
+            archive.read(ref)
+        read_ms = (time.perf_counter() - t0) / min(200, len(refs)) * 1000
+        print(f"{'layout':<10} {'write_s':>8} {'files':>7} {'MiB':>8}")
+        print(f"{'per-file':<10} {old_s:>8.2f} {old_n:>7} {old_b / 2**20:>8.1f}")
+        print(f"{'archive':<10} {new_s:>8.2f} {new_n:>7} {new_b / 2**20:>8.1f}   codec={archive.codec}, "
+              f"random read {read_ms:.2f} ms/record")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_seen_index(n_ids: int) -> None:
+    """Build a seen index of n_ids, then time page-sized lookups and an incremental flush."""
+    import numpy as np
+    tmp = Path(tempfile.mkdtemp(prefix='seen_bench_'))
+    try:
+        rng = np.random.default_rng(0)
+        ids = rng.choice(8 * n_ids, size=n_ids, replace=False).astype(np.int64) + 4_000_000_000
+        index = SeenIndex(tmp / 'brand.npy')
+        t0 = time.perf_counter()
+        index.add(ids)
+        index.flush()
+        build_s = time.perf_counter() - t0
+        index = SeenIndex(tmp / 'brand.npy')  # cold open, memory-mapped
+        pages = [np.concatenate([rng.choice(ids, 77), rng.integers(0, 4_000_000_000, 19)]) for _ in range(2000)]
+        t0 = time.perf_counter()
+        for page in pages:
+            index.contains(page, include_run=False).mean()
+        lookup_us = (time.perf_counter() - t0) / len(pages) * 1e6
+        t0 = time.perf_counter()
+        for page in pages[:500]:
+            index.add(page)
+        add_us = (time.perf_counter() - t0) / 500 * 1e6
+        t0 = time.perf_counter()
+        added = index.flush()
+        flush_s = time.perf_counter() - t0
+        size = (tmp / 'brand.npy').stat().st_size
+        print(f"ids={n_ids:,} file={size / 2**20:.0f} MiB build={build_s:.2f}s")
+        print(f"page lookup (96 ids): {lookup_us:.0f} us   page add+dedup: {add_us:.0f} us")
+        print(f"incremental flush of {added:,} ids: {flush_s:.2f}s")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _flatten_json_to_df_recursive(data: list) -> pd.DataFrame:
+    """Pre-plan flatten_json_to_df (recursive walk per item), kept as the baseline."""
+    flattened_records = []
+    
+    for record in data:
+        flattened_record = {}
+        
+        # Flatten the record recursively
+        def flatten_dict(obj, parent_key: str = '', sep: str = '_') -> None:
+            if isinstance(obj, dict):
+                for key, value in obj.items():
+                    new_key = f"{parent_key}{sep}{key}" if parent_key else key
+                    flatten_dict(value, new_key, sep)
+            elif isinstance(obj, list):
+                # Handle lists - for colors.all, pictures, etc.
+                if len(obj) == 0:
+                    flattened_record[parent_key] = None
+                elif len(obj) == 1 and isinstance(obj[0], dict):
+                    # Single dict in list - flatten it
+                    flatten_dict(obj[0], parent_key, sep)
+                elif all(isinstance(item, dict) for item in obj):
+                    # Multiple dicts in list - create indexed columns
+                    for i, item in enumerate(obj):
+                        flatten_dict(item, f"{parent_key}_{i}", sep)
+                else:
+                    # List of simple values - join them or take first
+                    if all(isinstance(item, str) for item in obj):
+                        flattened_record[parent_key] = '; '.join(obj)
+                    else:
+                        flattened_record[parent_key] = obj[0] if obj else None
+            else:
+                flattened_record[parent_key] = obj
+        
+        flatten_dict(record)
+        flattened_records.append(flattened_record)
+    
+    # Create DataFrame
+    df = pd.DataFrame(flattened_records)
+    
+    return df
+
+
+def make_vestiaire_items(n_items: int) -> list:
+    """Search items with the occasional layout change (extra colour, discount, no model, ...)."""
+    items = []
+    for i in range(n_items):
+        item = vestiaire_item(i, '5439')
+        if i % 7 == 0:
+            item['colors']['all'].append({'id': 2, 'name': 'Noir'})
+        if i % 11 == 0:
+            item['discount'] = {'percentage': 10, 'originalPrice': {'cents': 12000}}
+        if i % 13 == 0:
+            item['pictures'] = []
+        if i % 17 == 0:
+            del item['model']
+        items.append(item)
+    return items
+
+
+def bench_vc_flatten(sizes: list[int]) -> None:
+    """Recursive vs plan-compiled flatten_json_to_df on Vestiaire search items."""
+    try:
+        from scrapers import vestiaire_co
+    except Exception:
+        import vestiaire_co
+    print(f"{'items':>8} {'recursive_s':>12} {'compiled_s':>11} {'speedup':>8}")
+    for n in sizes:
+        data = json.loads(json.dumps(make_vestiaire_items(n)))
+        pd.testing.assert_frame_equal(_flatten_json_to_df_recursive(data), vestiaire_co.flatten_json_to_df(data))
+        repeat = 20 if n <= 1000 else 3
+        old = _timeit(lambda: _flatten_json_to_df_recursive(data), repeat)
+        new = _timeit(lambda: vestiaire_co.flatten_json_to_df(data), repeat)
+        print(f"{n:>8} {old:>12.4f} {new:>11.4f} {old / new:>7.2f}x")
+
+
+def bench_faume_export(sizes: list[int]) -> None:
+    """Faume articles CSV + price summary: whole-catalog DataFrame vs streamed chunks."""
+    try:
+        from scrapers import faume_api
+    except Exception:
+        import faume_api
+    tmp = Path(tempfile.mkdtemp(prefix='faume_export_'))
+
+    def products(n):
+        for i in range(n):
+            product = faume_product(i, 'balzac', pad_bytes=200)
+            product['_domain'] = 'balzac-paris.fr'
+            yield product
+
+    def whole(n):
+        # The pre-streaming save_data_to_csv: every document, article and row held at once
+        df = faume_api.articles_to_dataframe(faume_api.extract_all_articles_from_products(list(products(n))))
+        df.to_csv(tmp / 'whole.csv', index=False, encoding='utf-8')
+        return faume_api.create_price_summary(df)
+
+    def streamed(n):
+        summary = faume_api.PriceSummaryAccumulator()
+        faume_api.write_articles_csv(faume_api.iter_articles_from_products(products(n)), tmp / 'streamed.csv',
+                                     summary=summary)
+        return summary.to_frame()
+
+    try:
+        print(f"{'products':>9} {'whole_s':>8} {'whole_MiB':>10} {'stream_s':>9} {'stream_MiB':>11}")
+        for n in sizes:
+            old_s, old_mb = _measure(lambda: whole(n))
+            new_s, new_mb = _measure(lambda: streamed(n))
+            assert (tmp / 'whole.csv').read_bytes() == (tmp / 'streamed.csv').read_bytes()
+            pd.testing.assert_frame_equal(whole(min(n, 500)), streamed(min(n, 500)))
+            print(f"{n:>9} {old_s:>8.2f} {old_mb:>10.1f} {new_s:>9.2f} {new_mb:>11.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+E2E_TARGETS = ('vinted', 'vestiaire', 'faume')
+E2E_RESULT_PREFIX = 'E2E_RESULT '
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _timed(fn, latencies: list):
+    """Wrap a page-level call so every call's wall time lands in latencies."""
+    if asyncio.iscoroutinefunction(fn):
+        async def wrapper(*a, **kw):
+            t0 = time.perf_counter()
+            try:
+                return await fn(*a, **kw)
+            finally:
+                latencies.append(time.perf_counter() - t0)
+    else:
+        def wrapper(*a, **kw):
+            t0 = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                latencies.append(time.perf_counter() - t0)
+    return wrapper
+
+
+def _e2e_vinted(tmp: Path, args, latencies: list) -> int:
+    v = vinted_scraper
+    # Keep state, identities and raw archives out of the real data directory
+    v.STATE_DIR = tmp / 'state'
+    v.IDENTITY_DIR = v.STATE_DIR / 'identities'
+    v.SEEN_INDEX_DIR = v.STATE_DIR / 'seen'
+    v.RAW_ARCHIVE_DIR = tmp / 'raw_archive'
+    v.LOGS_DIR = tmp / 'logs'
+    cats = [1000 + k for k in range(args.vinted_cats)]
+    v.VINTED_TAXONOMY_PATH = tmp / 'vinted_taxonomy.csv'
+    pd.DataFrame({'category_id': cats, 'category_name': [f"Cat {c}" for c in cats],
+                  'parent_id': [None] * len(cats)}).to_csv(v.VINTED_TAXONOMY_PATH, index=False)
+    v.rate_limiter.configure(v.VINTED_CATALOG_ENDPOINT, rate=args.rate, burst=1, max_rate=args.rate,
+                           cooldown=args.cooldown, jitter=0)
+    # Categories past the page cap are sharded by price in full mode
+    pages = min(v.VINTED_PAGE_CAP, -(-args.vinted_items // 96))
+    with mock.patch.object(v, 'cat_api_caller', _timed(v.cat_api_caller, latencies)), \
+            mock.patch.object(v, 'async_cat_api_caller', _timed(v.async_cat_api_caller, latencies)):
+        df = v.run_brand_category_collection(53, cats, pages=pages, mode='full', use_playwright=False,
+                                             concurrency=args.concurrency, query_profile=args.query_profile)
+    return len(df)
+
+
+def _e2e_vestiaire(tmp: Path, args, latencies: list) -> int:
+    try:
+        from scrapers import vestiaire_co
+        from scrapers.rate_limiter import rate_limiter
+    except Exception:
+        import vestiaire_co
+        from rate_limiter import rate_limiter
+    # The collector reads and writes ../data relative to the working directory
+    (tmp / 'data' / 'vc_tests').mkdir(parents=True)
+    (tmp / 'work').mkdir()
+    pd.DataFrame(vestiaire_taxonomy_rows()[:args.vc_categories]).to_csv(
+        tmp / 'data' / 'vestiaire_taxonomy.csv', index=False)
+    os.chdir(tmp / 'work')
+    rate_limiter.configure(vestiaire_co.VC_SEARCH_ENDPOINT, rate=args.rate, burst=1, max_rate=args.rate,
+                           cooldown=args.cooldown, jitter=0)
+    with mock.patch.object(vestiaire_co, 'cat_api_caller', _timed(vestiaire_co.cat_api_caller, latencies)), \
+            mock.patch.object(vestiaire_co, 'vc_api_call', _timed(vestiaire_co.vc_api_call, latencies)), \
+            mock.patch.object(vestiaire_co, 'vc_filters_page', _timed(vestiaire_co.vc_filters_page, latencies)):
+        if args.vc_mode == 'brand':
+            # Whole brand in one search, partitioned on facets once over the result cap
+            _, df = vestiaire_co.vestiaire_scraper(5439, '/mock-brand/', page_concurrency=args.vc_concurrency,
+                                                   query_profile=args.query_profile)
+        else:
+            df = vestiaire_co.full_cat_vc_api_call(5439, '/mock-brand/', page_concurrency=args.vc_concurrency,
+                                                   query_profile=args.query_profile)
+    return len(df)
+
+
+def _e2e_faume(tmp: Path, args, latencies: list) -> int:
+    try:
+        from scrapers import faume_api
+        from scrapers.rate_limiter import rate_limiter
+    except Exception:
+        import faume_api
+        from rate_limiter import rate_limiter
+    rate_limiter.configure(faume_api.FAUME_SEARCH_ENDPOINT, rate=args.rate, burst=1, max_rate=args.rate,
+                           cooldown=args.cooldown, jitter=0)
+    with mock.patch.object(faume_api, 'fetch_documents_batch', _timed(faume_api.fetch_documents_batch, latencies)):
+        products = faume_api.iter_product_sheets('bench-key', 'balzac', limit=100, query_profile=args.query_profile,
+                                                 concurrency=args.faume_concurrency)
+        return sum(1 for _ in products)
+
+
+def run_e2e_target(target: str, args) -> dict:
+    """Run one collector against the stand-in server in this process."""
+    runner = {'vinted': _e2e_vinted, 'vestiaire': _e2e_vestiaire, 'faume': _e2e_faume}[target]
+    tmp = Path(tempfile.mkdtemp(prefix=f"e2e_{target}_"))
+    cwd = os.getcwd()
+    latencies: list = []
+    try:
+        usage0 = resource.getrusage(resource.RUSAGE_SELF)
+        t0 = time.perf_counter()
+        items = runner(tmp, args, latencies)
+        wall = time.perf_counter() - t0
+        usage1 = resource.getrusage(resource.RUSAGE_SELF)
+        breakdown = time_breakdown().get(target, {})
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        'target': target,
+        'items': items,
+        'wall_s': wall,
+        'pages': len(latencies),
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'cpu_s': (usage1.ru_utime - usage0.ru_utime) + (usage1.ru_stime - usage0.ru_stime),
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mib': usage1.ru_maxrss / 1024,
+        # Where the wall time went, from the scrapers' own metrics
+        **{k: v for k, v in breakdown.items() if k.endswith('_s')},
+        'kib_per_request': breakdown.get('response_bytes', 0) / max(1, breakdown.get('requests', 0)) / 1024,
+    }
+
+
+def _server_stats(url: str) -> dict:
+    with urllib.request.urlopen(f"{url}/__stats", timeout=5) as r:
+        return json.loads(r.read())
+
+
+def bench_e2e(args) -> None:
+    """Start the stand-in marketplace, then time each collector in its own interpreter."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    shared = ['--rate', str(args.rate), '--cooldown', str(args.cooldown),
+              '--vinted-items', str(args.vinted_items), '--vinted-cats', str(args.vinted_cats),
+              '--concurrency', str(args.concurrency), '--vc-categories', str(args.vc_categories),
+              '--vc-concurrency', str(args.vc_concurrency), '--vc-mode', args.vc_mode,
+              '--faume-concurrency', str(args.faume_concurrency),
+              '--query-profile', args.query_profile]
+    if args.profile:
+        shared += ['--profile', os.path.abspath(args.profile)]
+    rows = []
+    with MockMarketplace(config_from_args(args)) as market:
+        env = {**os.environ, **market.env()}
+        print(f"stand-in marketplace at {market.url}")
+        for target in args.targets:
+            before = _server_stats(market.url)
+            out = subprocess.run([sys.executable, os.path.join(here, 'benchmarks.py'), 'e2e-run', target, *shared],
+                                 cwd=here, env=env, capture_output=True, text=True)
+            after = _server_stats(market.url)
+            result = next((json.loads(line[len(E2E_RESULT_PREFIX):]) for line in out.stdout.splitlines()
+                           if line.startswith(E2E_RESULT_PREFIX)), None)
+            if result is None:
+                tail = (out.stderr.strip() or out.stdout.strip()).splitlines()[-1:] or ['no output']
+                print(f"{target}: failed ({tail[0][:100]})")
+                continue
+            for status in (429, 403):
+                result[f"http_{status}"] = sum(n - before.get(k, 0) for k, n in after.items() if k.endswith(f":{status}"))
+            rows.append(result)
+    print(f"{'target':<10} {'items':>7} {'wall_s':>7} {'items/s':>8} {'pages':>6} {'p50_ms':>7} {'p99_ms':>7} "
+          f"{'cpu_s':>6} {'rss_MiB':>8} {'429':>5} {'403':>5} {'net_s':>6} {'wait_s':>6} {'parse_s':>7} {'KiB/req':>8}")
+    for r in rows:
+        rate = r['items'] / r['wall_s'] if r['wall_s'] else 0
+        print(f"{r['target']:<10} {r['items']:>7} {r['wall_s']:>7.2f} {rate:>8.0f} {r['pages']:>6} "
+              f"{r['p50_ms']:>7.1f} {r['p99_ms']:>7.1f} {r['cpu_s']:>6.2f} {r['peak_rss_mib']:>8.0f} "
+              f"{r['http_429']:>5} {r['http_403']:>5} {r.get('network_s', 0):>6.2f} {r.get('sleep_s', 0):>6.2f} "
+              f"{r.get('parse_s', 0):>7.2f} {r.get('kib_per_request', 0):>8.1f}")
+    if args.profile:
+        print(f"per-stage profiles written under {os.path.abspath(args.profile)}")
+
+
+def _add_e2e_run_arguments(p, with_items: bool = True) -> None:
+    if with_items:
+        p.add_argument('--vinted-items', type=int, default=MarketConfig().vinted_items)
+    p.add_argument('--rate', type=float, default=50.0, help='limiter requests/s per endpoint during the run')
+    p.add_argument('--cooldown', type=float, default=0.5, help='limiter cooldown after a 429 (s)')
+    p.add_argument('--vinted-cats', type=int, default=4, help='Vinted categories crawled')
+    p.add_argument('--concurrency', type=int, default=1, help='Vinted category concurrency')
+    p.add_argument('--vc-categories', type=int, default=4, help='Vestiaire taxonomy rows crawled')
+    p.add_argument('--vc-concurrency', type=int, default=1, help='Vestiaire pages fetched in parallel per category')
+    p.add_argument('--faume-concurrency', type=int, default=1, help='Faume document batches fetched in parallel')
+    p.add_argument('--vc-mode', choices=['taxonomy', 'brand'], default='taxonomy',
+                   help='Vestiaire: crawl taxonomy rows, or the whole brand via the facet partition planner')
+    p.add_argument('--query-profile', choices=['listing-lean', 'full'], default='full',
+                   help='fields/facets requested by every collector')
+    p.add_argument('--profile', metavar='DIR', default=None, help='write per-stage profile reports under DIR')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline scraper benchmarks')
+    sub = parser.add_subparsers(dest='bench', required=True)
+    p = sub.add_parser('vinted-parse', help='vinted_api_to_df row-wise vs columnar')
+    p.add_argument('--items', type=int, nargs='+', default=[96, 100000])
+    p = sub.add_parser('accumulate', help='per-page pd.concat vs ResultAccumulator')
+    p.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    p.add_argument('--naive-max', type=int, default=100000,
+                   help='largest size to run the quadratic baseline on')
+    p = sub.add_parser('import', help='cold import time of the scraper modules')
+    p.add_argument('--runs', type=int, default=5)
+    p = sub.add_parser('raw-archive', help='per-page JSON files vs compressed segment archive')
+    p.add_argument('--pages', type=int, default=2000)
+    p = sub.add_parser('seen-index', help='seen-id index lookups and flushes at scale')
+    p.add_argument('--ids', type=int, default=10_000_000)
+    p = sub.add_parser('vc-flatten', help='Vestiaire flatten_json_to_df recursive vs compiled plans')
+    p.add_argument('--items', type=int, nargs='+', default=[60, 60000])
+    p = sub.add_parser('faume-export', help='Faume articles CSV: whole-catalog DataFrame vs streamed chunks')
+    p.add_argument('--products', type=int, nargs='+', default=[2000, 50000])
+    p = sub.add_parser('e2e', help='collectors end to end against the local stand-in marketplace')
+    p.add_argument('--targets', nargs='+', choices=E2E_TARGETS, default=list(E2E_TARGETS))
+    add_config_arguments(p)
+    _add_e2e_run_arguments(p, with_items=False)
+    p = sub.add_parser('e2e-run', help='(used by e2e) one target in this process')
+    p.add_argument('target', choices=E2E_TARGETS)
+    _add_e2e_run_arguments(p)
+    args = parser.parse_args()
+
+    random.seed(0)
+    if args.bench == 'vinted-parse':
+        bench_vinted_parse(args.items)
+    elif args.bench == 'accumulate':
+        bench_accumulate(args.rows, args.naive_max)
+    elif args.bench == 'import':
+        bench_import(args.runs)
+    elif args.bench == 'raw-archive':
+        bench_raw_archive(args.pages)
+    elif args.bench == 'seen-index':
+        bench_seen_index(args.ids)
+    elif args.bench == 'vc-flatten':
+        bench_vc_flatten(args.items)
+    elif args.bench == 'faume-export':
+        bench_faume_export(args.products)
+    elif args.bench == 'e2e':
+        bench_e2e(args)
+    elif args.bench == 'e2e-run':
+        if args.profile:
+            profiler.start()
+        result = run_e2e_target(args.target, args)
+        profiler.finish(args.profile, args.target)
+        print(E2E_RESULT_PREFIX + json.dumps(result), flush=True)
@@ -0,0 +1,120 @@
+"""
+Append-only checkpoint store for long collection runs.
+
+Every collected page is written once as its own CSV segment, and a line
+describing it (segment name, row count, caller metadata such as the
+category and page number) is appended to ``manifest.jsonl``. The cost of
+a checkpoint therefore depends only on the page size, not on how much has
+been collected, and resuming replays the segments listed in the manifest.
+
+Layout:
+    <root>/manifest.jsonl
+    <root>/seg_000001.csv
+    <root>/seg_000002.csv
+    ...
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from scrapers.result_accumulator import ResultAccumulator
+    from scrapers.stage_profiler import profiler
+except ImportError:
+    from result_accumulator import ResultAccumulator
+    from stage_profiler import profiler
+
+
+class CheckpointStore:
+    """Segment-per-page checkpoints with a JSONL manifest."""
+
+    MANIFEST = 'manifest.jsonl'
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._entries: Optional[List[dict]] = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / self.MANIFEST
+
+    def entries(self) -> List[dict]:
+        """Manifest entries whose segment exists, in write order."""
+        if self._entries is None:
+            entries = []
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Torn last line from an interrupted run
+                            continue
+                        if (self.root / entry['segment']).exists():
+                            entries.append(entry)
+            except FileNotFoundError:
+                pass
+            self._entries = entries
+        return self._entries
+
+    def last(self) -> Optional[dict]:
+        entries = self.entries()
+        return entries[-1] if entries else None
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def append(self, df: pd.DataFrame, **meta) -> dict:
+        """Write one page as a new segment and record it in the manifest."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = self.entries()
+        seq = (entries[-1]['seq'] + 1) if entries else 1
+        segment = f"seg_{seq:06d}.csv"
+        tmp = self.root / f".{segment}.tmp"
+        with profiler.stage('checkpoint_write'):
+            df.to_csv(tmp, index=False)
+            os.replace(tmp, self.root / segment)
+        entry = {
+            'seq': seq,
+            'segment': segment,
+            'rows': int(len(df)),
+            'written_at': datetime.now(timezone.utc).isoformat(),
+            **meta,
+        }
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, default=str) + '\n')
+        entries.append(entry)
+        return entry
+
+    def replay(self) -> Iterator[Tuple[dict, pd.DataFrame]]:
+        """Yield (manifest entry, segment frame) in write order."""
+        for entry in self.entries():
+            if entry['rows'] == 0:
+                # Progress marker for a page that returned nothing
+                yield entry, pd.DataFrame()
+                continue
+            yield entry, pd.read_csv(self.root / entry['segment'])
+
+    def load(self) -> pd.DataFrame:
+        """Rebuild the collected data from all segments."""
+        results = ResultAccumulator()
+        for _, df in self.replay():
+            results.add(df)
+        return results.to_frame()
+
+    def start_fresh(self) -> None:
+        """Move an existing checkpoint aside so a new run starts empty."""
+        if self.root.exists() and any(self.root.iterdir()):
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+            os.replace(self.root, self.root.with_name(f"{self.root.name}.{stamp}"))
+        self._entries = None
+
+    def clear(self) -> None:
+        """Delete the checkpoint once its run has finished and been written out."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._entries = None
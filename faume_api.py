@@ -1,109 +1,296 @@
 import requests
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 import json
 import pandas as pd
 import os
-from time import sleep
+import time
+import argparse
+import atexit
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import quote
 
-def get_all_product_sheets(api_key: str, brand_name: str, limit: int = 100) -> List[Dict]:
+try:
+    from scrapers.rate_limiter import rate_limiter, THROTTLE_STATUSES
+    from scrapers.scraper_metrics import (
+        observe_request, observe_parse, count_retry, print_time_breakdown, write_run_metrics)
+    from scrapers.stage_profiler import profiler, add_profile_arguments
+except ImportError:
+    from rate_limiter import rate_limiter, THROTTLE_STATUSES
+    from scraper_metrics import (
+        observe_request, observe_parse, count_retry, print_time_breakdown, write_run_metrics)
+    from stage_profiler import profiler, add_profile_arguments
+
+# Meilisearch host; the index path is added per request
+FAUME_SEARCH_URL = os.getenv('FAUME_SEARCH_URL', 'https://search.faume.cloud').rstrip('/')
+
+# Shared limiter key for the Meilisearch documents API
+FAUME_SEARCH_ENDPOINT = 'faume.search'
+rate_limiter.configure(FAUME_SEARCH_ENDPOINT, rate=10.0, burst=2, max_rate=50.0, increase=1.0)
+# Document batches requested in parallel once the total is known; the limiter still sets the pace
+FAUME_CONCURRENCY = int(os.getenv('FAUME_CONCURRENCY', '4'))
+FAUME_REQUEST_TIMEOUT = 30
+
+# One keep-alive connection pool for every documents request
+_faume_session = None
+_faume_session_lock = threading.Lock()
+
+def get_faume_session() -> requests.Session:
+    global _faume_session
+    with _faume_session_lock:
+        if _faume_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(4, 2 * FAUME_CONCURRENCY))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _faume_session = session
+        return _faume_session
+
+def close_faume_session() -> None:
+    global _faume_session
+    with _faume_session_lock:
+        session, _faume_session = _faume_session, None
+    if session is not None:
+        session.close()
+
+atexit.register(close_faume_session)
+
+# Brand mapping - you can extend this dictionary with more brands
+FAUME_BRANDS = {
+    'balzac': {
+        'id': 3,
+        'domain': 'secondevie.balzac-paris.fr'
+    }
+    # Add more brands here as needed
+    # 'other_brand': {'id': X, 'domain': 'domain.com'}
+}
+
+# Document attributes fetched per query profile (Meilisearch `fields`, dot paths
+# reach into choices); None fetches whole documents
+FAUME_LEAN_FIELDS = [
+    'id', 'title', 'slug', 'choices.@id', 'choices.id', 'choices.slug', 'choices.title', 'choices.price',
+    'choices.state', 'choices.size', 'choices.type', 'choices.brand', 'choices.color', 'choices.gender',
+    'choices.season', 'choices.category', 'choices.sub_category', 'choices.collection', 'choices.publishedAt',
+]
+FAUME_QUERY_PROFILES = {
+    'count-only': {'fields': ['id'], 'limit': 1},
+    'listing-lean': {'fields': FAUME_LEAN_FIELDS, 'limit': None},
+    'full': {'fields': None, 'limit': None},
+}
+FAUME_QUERY_PROFILE = os.getenv('FAUME_QUERY_PROFILE', 'full')
+
+def faume_query_profile(name: Optional[str] = None) -> Dict:
+    """Settings of a named query profile (FAUME_QUERY_PROFILE by default)."""
+    name = name or FAUME_QUERY_PROFILE
+    if name not in FAUME_QUERY_PROFILES:
+        raise ValueError(f"Unknown query profile {name!r}; choose from {list(FAUME_QUERY_PROFILES)}")
+    return FAUME_QUERY_PROFILES[name]
+
+def faume_brand(brand_name: str) -> Dict:
+    brand_info = FAUME_BRANDS.get(brand_name.lower())
+    if not brand_info:
+        raise ValueError(f"Brand '{brand_name}' not found. Available brands: {list(FAUME_BRANDS.keys())}")
+    return brand_info
+
+def documents_url(brand_id: int, limit: int, offset: int, query_profile: Optional[str] = None) -> str:
+    """Documents API URL for one batch under a query profile."""
+    profile = faume_query_profile(query_profile)
+    url = f"{FAUME_SEARCH_URL}/indexes/articles/documents?filter=brand%3D{brand_id}&limit={profile['limit'] or limit}&offset={offset}"
+    if profile['fields']:
+        url += f"&fields={quote(','.join(profile['fields']), safe=',')}"
+    return url
+
+def count_product_sheets(api_key: str, brand_name: str) -> Optional[int]:
+    """Total number of product sheets of a brand, from a one-document request."""
+    brand_id = faume_brand(brand_name)['id']
+    rate_limiter.acquire(FAUME_SEARCH_ENDPOINT, api_key)
+    started = time.perf_counter()
+    response = get_faume_session().get(documents_url(brand_id, 1, 0, 'count-only'),
+                                       headers={'Authorization': f'Bearer {api_key}'}, timeout=FAUME_REQUEST_TIMEOUT)
+    rate_limiter.feedback(FAUME_SEARCH_ENDPOINT, api_key, response.status_code, response.headers)
+    observe_request('faume', 'search', None, response.status_code, time.perf_counter() - started,
+                    len(response.content or b''), query_profile='count-only')
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    return data.get('total', data.get('estimatedTotalHits')) if isinstance(data, dict) else None
+
+def fetch_documents_batch(url: str, headers: Dict, api_key: str, domain: str, query_profile: Optional[str] = None):
     """
-    Retrieve ALL product sheets from Meilisearch API for a given brand with pagination.
+    Fetch one documents batch through the pooled session.
+
+    Returns (products, total); total is None when the response does not
+    report one. Throttled requests are retried (up to 5 times) once the
+    limiter's cooldown has passed.
+
+    Raises:
+        requests.RequestException: If the API request fails
+        json.JSONDecodeError: If the response is not JSON
+    """
+    for throttle_retries in range(6):
+        # Make the API request (paced per API key by the shared limiter)
+        rate_limiter.acquire(FAUME_SEARCH_ENDPOINT, api_key)
+        started = time.perf_counter()
+        try:
+            response = get_faume_session().get(url, headers=headers, timeout=FAUME_REQUEST_TIMEOUT)
+        except requests.RequestException:
+            rate_limiter.on_error(FAUME_SEARCH_ENDPOINT, api_key)
+            observe_request('faume', 'search', None, None, time.perf_counter() - started)
+            raise
+        rate_limiter.feedback(FAUME_SEARCH_ENDPOINT, api_key, response.status_code, response.headers)
+        observe_request('faume', 'search', None, response.status_code,
+                        time.perf_counter() - started, len(response.content or b''), query_profile=query_profile)
+        if response.status_code not in THROTTLE_STATUSES or throttle_retries == 5:
+            break
+        count_retry('faume', 'search', f"status_{response.status_code}")
+    response.raise_for_status()
+    
+    # Parse JSON response
+    started = time.perf_counter()
+    with profiler.stage('json_decode'):
+        data = response.json()
+    
+    # Handle different response formats
+    if isinstance(data, dict):
+        if 'results' in data:
+            batch_products = data['results']
+            total = data.get('total')
+        elif 'hits' in data:
+            batch_products = data['hits']
+            total = data.get('estimatedTotalHits')
+        else:
+            batch_products = [data]
+            total = 1
+    else:
+        batch_products = data
+        total = None
+    
+    # Add domain info to each product
+    for product in batch_products:
+        product['_domain'] = domain
+    observe_parse('faume', 'search', len(batch_products), time.perf_counter() - started)
+    return batch_products, total
+
+def iter_product_sheets(api_key: str, brand_name: str, limit: int = 100, query_profile: Optional[str] = None,
+                        concurrency: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Stream all product sheets of a brand, batch by batch.
+    
+    A count-only request (count_product_sheets) sizes the catalog, then
+    every offset is fetched `concurrency` at a time over the pooled session
+    and yielded in offset order as they arrive, with at most
+    2 * concurrency batches held in memory. Without a count, the first
+    batch's total is used for the remaining offsets. If the catalog grew
+    past the total, the tail is read sequentially until a short batch.
     
     Args:
         api_key (str): The API access token
         brand_name (str): The brand name to filter products
         limit (int): Number of documents per request (max 1000)
+        query_profile (str, optional): 'full' (whole documents) or 'listing-lean'
+            (listing and price fields only); defaults to FAUME_QUERY_PROFILE
+        concurrency (int, optional): Batches in flight; defaults to FAUME_CONCURRENCY
         
-    Returns:
-        List[Dict]: List of all product documents
+    Yields:
+        Dict: One product document at a time
         
     Raises:
-        requests.RequestException: If the API request fails
-        ValueError: If the response is invalid
-    """
-    
-    # Brand mapping - you can extend this dictionary with more brands
-    brand_mapping = {
-        'balzac': {
-            'id': 3,
-            'domain': 'secondevie.balzac-paris.fr'
-        }
-        # Add more brands here as needed
-        # 'other_brand': {'id': X, 'domain': 'domain.com'}
-    }
-    
-    # Get brand info
-    brand_info = brand_mapping.get(brand_name.lower())
-    if not brand_info:
-        raise ValueError(f"Brand '{brand_name}' not found. Available brands: {list(brand_mapping.keys())}")
+        requests.RequestException: If the first API request fails
+        ValueError: If the first response is invalid
     
+    A later batch that fails ends the stream early, as the sequential
+    pager used to.
+    """
+    brand_info = faume_brand(brand_name)
+    query_profile = query_profile or FAUME_QUERY_PROFILE
     brand_id = brand_info['id']
     domain = brand_info['domain']
-    
-    # Headers
     headers = {
         'Authorization': f'Bearer {api_key}',
         'Content-Type': 'application/json'
     }
+    fetch = lambda offset: fetch_documents_batch(documents_url(brand_id, limit, offset, query_profile),
+                                                 headers, api_key, domain, query_profile)
+    
+    concurrency = max(1, concurrency or FAUME_CONCURRENCY)
+    total = None
+    if concurrency > 1:
+        # Knowing the total up front lets the first batch go out with the others
+        try:
+            total = count_product_sheets(api_key, brand_name)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Count request failed, reading the total from the first batch: {e}")
     
-    all_products = []
     offset = 0
+    try:
+        if total is None:
+            batch, total = fetch(0)
+            yield from batch
+            if len(batch) < limit:
+                return
+            offset = limit
+        if total is not None and total > offset and concurrency > 1:
+            offsets = iter(range(offset, total, limit))
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='faume-batch') as ex:
+                window = deque()
+                try:
+                    for next_offset in offsets:
+                        window.append((next_offset, ex.submit(fetch, next_offset)))
+                        if len(window) < 2 * concurrency:
+                            continue
+                        offset, future = window.popleft()
+                        batch, _ = future.result()
+                        yield from batch
+                    while window:
+                        offset, future = window.popleft()
+                        batch, _ = future.result()
+                        yield from batch
+                finally:
+                    # A failed batch or a consumer that stopped early: drop the batches not started yet
+                    for _, future in window:
+                        future.cancel()
+            if len(batch) < limit:
+                return
+            offset += limit
+        # No total reported, sequential mode, or a catalog that grew while we read it
+        while True:
+            batch, _ = fetch(offset)
+            yield from batch
+            if len(batch) < limit:
+                return
+            offset += limit
+    except requests.RequestException as e:
+        if offset == 0:
+            raise requests.RequestException(f"API request failed: {str(e)}")
+        print(f"Stopping at offset {offset}: {e}")
+    except json.JSONDecodeError as e:
+        if offset == 0:
+            raise ValueError(f"Invalid JSON response: {str(e)}")
+        print(f"Stopping at offset {offset}: {e}")
+
+def get_all_product_sheets(api_key: str, brand_name: str, limit: int = 100, query_profile: Optional[str] = None,
+                           concurrency: Optional[int] = None) -> List[Dict]:
+    """
+    Retrieve ALL product sheets from Meilisearch API for a given brand with pagination.
     
-    while True:
-        # API endpoint with pagination
-        url = f"https://search.faume.cloud/indexes/articles/documents?filter=brand%3D{brand_id}&limit={limit}&offset={offset}"
+    Args:
+        api_key (str): The API access token
+        brand_name (str): The brand name to filter products
+        limit (int): Number of documents per request (max 1000)
+        query_profile (str, optional): 'full' (whole documents) or 'listing-lean'
+            (listing and price fields only); defaults to FAUME_QUERY_PROFILE
+        concurrency (int, optional): Batches in flight; defaults to FAUME_CONCURRENCY
         
-        try:
-            # Make the API request
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            
-            # Parse JSON response
-            data = response.json()
-            
-            # Handle different response formats
-            if isinstance(data, dict):
-                if 'results' in data:
-                    batch_products = data['results']
-                    total = data.get('total', len(batch_products))
-                elif 'hits' in data:
-                    batch_products = data['hits']
-                    total = data.get('estimatedTotalHits', len(batch_products))
-                else:
-                    batch_products = [data]
-                    total = 1
-            else:
-                batch_products = data
-                total = len(batch_products)
-            
-            # Add domain info to each product
-            for product in batch_products:
-                product['_domain'] = domain
-            
-            # Add to our collection
-            all_products.extend(batch_products)
-            
-            # Check if we've got all products
-            if len(batch_products) < limit:
-                break
-            
-            # Update offset for next batch
-            offset += limit
-            
-            # Add small delay to be respectful to the API
-            sleep(0.1)
-            
-        except requests.RequestException as e:
-            if len(all_products) == 0:
-                raise requests.RequestException(f"API request failed: {str(e)}")
-            else:
-                break
-        except json.JSONDecodeError as e:
-            if len(all_products) == 0:
-                raise ValueError(f"Invalid JSON response: {str(e)}")
-            else:
-                break
-    return all_products
+    Returns:
+        List[Dict]: List of all product documents (see iter_product_sheets to stream them)
+        
+    Raises:
+        requests.RequestException: If the API request fails
+        ValueError: If the response is invalid
+    """
+    return list(iter_product_sheets(api_key, brand_name, limit, query_profile, concurrency))
 
 def construct_product_url(product: Dict, domain: str = None) -> str:
     """
@@ -148,73 +335,95 @@ def get_article_urls(product: Dict, domain: str = None) -> List[str]:
     
     return urls
 
-def extract_all_articles_from_products(products: List[Dict]) -> List[Dict]:
+# Column order of the articles CSV
+FAUME_ARTICLE_COLUMNS = [
+    'product_id', 'product_title', 'product_slug', 'product_url', 'domain',
+    'article_id', 'article_slug', 'article_title', 'article_url', 'price_eur',
+    'state', 'size', 'type', 'brand', 'color', 'gender', 'season', 'category', 'sub_category',
+    'collection', 'color_image', 'size_filters', 'description', 'information', 'published_at',
+    'photos_count', 'first_photo',
+]
+# Articles per DataFrame chunk when streaming to CSV
+FAUME_EXPORT_CHUNK_ROWS = int(os.getenv('FAUME_EXPORT_CHUNK_ROWS', '5000'))
+
+def iter_articles_from_products(products: Iterable[Dict]) -> Iterator[Dict]:
     """
-    Extract all individual articles from product sheets.
+    Yield individual articles from product sheets, one at a time.
     
     Args:
-        products (List[Dict]): List of product documents
+        products (Iterable[Dict]): Product documents (a list, or the
+            iter_product_sheets stream)
         
-    Returns:
-        List[Dict]: List of individual articles with product context
+    Yields:
+        Dict: One article with product context, keyed by FAUME_ARTICLE_COLUMNS
     """
-    all_articles = []
-    
     for product in products:
-        # Get product-level information
+        # Get product-level information (shared by every choice)
         product_id = product.get('id', '')
         product_title = product.get('title', '')
         product_slug = product.get('slug', '')
+        product_url = construct_product_url(product)
         domain = product.get('_domain', '')
         
         # Extract individual articles from choices
-        choices = product.get('choices', [])
-        
-        for choice in choices:
-            article = {
+        for choice in product.get('choices', []):
+            get = choice.get
+            price = get('price')
+            photos = get('photos')
+            article_path = get('@id')
+            yield {
                 # Product-level info
                 'product_id': product_id,
                 'product_title': product_title,
                 'product_slug': product_slug,
-                'product_url': construct_product_url(product),
+                'product_url': product_url,
                 'domain': domain,
                 
                 # Article-level info
-                'article_id': choice.get('id', ''),
-                'article_slug': choice.get('slug', ''),
-                'article_title': choice.get('title', ''),
-                'article_url': f"https://{domain}{choice.get('@id', '')}" if choice.get('@id') else '',
+                'article_id': get('id', ''),
+                'article_slug': get('slug', ''),
+                'article_title': get('title', ''),
+                'article_url': f"https://{domain}{article_path}" if article_path else '',
                 
                 # Pricing (convert from cents to euros)
-                'price_eur': choice.get('price', 0) / 100 if choice.get('price') else 0,
+                'price_eur': price / 100 if price else 0.0,
                 
                 # Article attributes
-                'state': choice.get('state', ''),
-                'size': choice.get('size', ''),
-                'type': choice.get('type', ''),
-                'brand': choice.get('brand', ''),
-                'color': choice.get('color', ''),
-                'gender': choice.get('gender', ''),
-                'season': choice.get('season', ''),
-                'category': choice.get('category', ''),
-                'sub_category': choice.get('sub_category', ''),
-                'collection': choice.get('collection', ''),
-                'color_image': choice.get('color_image', ''),
-                'size_filters': choice.get('size_filters', ''),
+                'state': get('state', ''),
+                'size': get('size', ''),
+                'type': get('type', ''),
+                'brand': get('brand', ''),
+                'color': get('color', ''),
+                'gender': get('gender', ''),
+                'season': get('season', ''),
+                'category': get('category', ''),
+                'sub_category': get('sub_category', ''),
+                'collection': get('collection', ''),
+                'color_image': get('color_image', ''),
+                'size_filters': get('size_filters', ''),
                 
                 # Additional info
-                'description': choice.get('description', ''),
-                'information': choice.get('information', ''),
-                'published_at': choice.get('publishedAt', ''),
+                'description': get('description', ''),
+                'information': get('information', ''),
+                'published_at': get('publishedAt', ''),
                 
                 # Photos
-                'photos_count': len(choice.get('photos', [])),
-                'first_photo': choice.get('photos', [None])[0] if choice.get('photos') else None,
+                'photos_count': len(photos) if photos else 0,
+                'first_photo': photos[0] if photos else None,
             }
-            
-            all_articles.append(article)
+
+def extract_all_articles_from_products(products: Iterable[Dict]) -> List[Dict]:
+    """
+    Extract all individual articles from product sheets.
     
-    return all_articles
+    Args:
+        products (Iterable[Dict]): Product documents (a list, or the
+            iter_product_sheets stream)
+        
+    Returns:
+        List[Dict]: List of individual articles with product context
+    """
+    return list(iter_articles_from_products(products))
 
 def articles_to_dataframe(articles: List[Dict]) -> pd.DataFrame:
     """
@@ -251,9 +460,79 @@ def create_price_summary(df: pd.DataFrame) -> pd.DataFrame:
     
     return price_summary
 
-def save_data_to_csv(api_key: str, brand_name: str, base_filename: str = None) -> Dict[str, str]:
+class PriceSummaryAccumulator:
+    """
+    Running create_price_summary: per sub_category min, max, sum and count
+    of price_eur, folded in one article chunk at a time.
+    """
+    def __init__(self):
+        self._stats: Dict = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        grouped = df.groupby('sub_category')['price_eur'].agg(['min', 'max', 'sum', 'count'])
+        for key, low, high, total, count in grouped.itertuples():
+            stats = self._stats.get(key)
+            if stats is None:
+                self._stats[key] = [low, high, total, count]
+            else:
+                stats[0] = min(stats[0], low)
+                stats[1] = max(stats[1], high)
+                stats[2] += total
+                stats[3] += count
+
+    def to_frame(self) -> pd.DataFrame:
+        """Same columns and rounding as create_price_summary."""
+        keys = sorted(self._stats)
+        stats = [self._stats[key] for key in keys]
+        return pd.DataFrame({
+            'sub_category': keys,
+            'min_price_eur': [round(s[0], 2) for s in stats],
+            'max_price_eur': [round(s[1], 2) for s in stats],
+            'avg_price_eur': [round(s[2] / s[3], 2) for s in stats],
+            'product_count': [int(s[3]) for s in stats],
+        })
+
+def write_articles_csv(articles: Iterable[Dict], path: str, chunk_rows: Optional[int] = None,
+                       summary: Optional[PriceSummaryAccumulator] = None) -> int:
+    """
+    Write articles to CSV in fixed-size DataFrame chunks, so memory stays
+    at one chunk whatever the catalog size.
+    
+    Args:
+        articles (Iterable[Dict]): Articles, e.g. from iter_articles_from_products
+        path (str): Output CSV path
+        chunk_rows (int, optional): Rows per chunk; defaults to FAUME_EXPORT_CHUNK_ROWS
+        summary (PriceSummaryAccumulator, optional): Fed every chunk as it is written
+        
+    Returns:
+        int: Number of article rows written
+    """
+    chunk_rows = chunk_rows or FAUME_EXPORT_CHUNK_ROWS
+    articles = iter(articles)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while True:
+            chunk = list(islice(articles, chunk_rows))
+            if not chunk and written:
+                break
+            with profiler.stage('articles_to_dataframe'):
+                df = pd.DataFrame.from_records(chunk, columns=FAUME_ARTICLE_COLUMNS)
+            if summary is not None:
+                with profiler.stage('price_summary'):
+                    summary.update(df)
+            with profiler.stage('csv_write'):
+                # The first chunk (possibly empty) carries the header
+                df.to_csv(f, index=False, header=not written)
+            written += len(df)
+            if len(chunk) < chunk_rows:
+                break
+    return written
+
+def save_data_to_csv(api_key: str, brand_name: str, base_filename: str = None, query_profile: Optional[str] = None) -> Dict[str, str]:
     """
-    Fetch all product data, extract articles, and save two CSV files:
+    Stream all product data through article extraction and save two CSV files:
     1. All products
     2. Price summary by sub_category
     
@@ -261,38 +540,33 @@ def save_data_to_csv(api_key: str, brand_name: str, base_filename: str = None) -
         api_key (str): The API access token
         brand_name (str): The brand name to filter products
         base_filename (str, optional): Base filename prefix
+        query_profile (str, optional): Passed to iter_product_sheets
         
     Returns:
         Dict[str, str]: Dictionary with CSV file paths
     """
-    # Get all product data
-    products = get_all_product_sheets(api_key, brand_name)
-    
-    # Extract all articles
-    articles = extract_all_articles_from_products(products)
-    
-    # Convert to DataFrame
-    df_articles = articles_to_dataframe(articles)
-    
-    # Create price summary
-    df_price_summary = create_price_summary(df_articles)
-    
     # Generate filenames
     if base_filename is None:
         base_filename = f"../data/faume_tests/{brand_name}_data"
     
     files_saved = {}
     
-    # Save all articles
+    # Stream products -> articles -> CSV chunks; the price summary is built as rows pass
+    products = iter_product_sheets(api_key, brand_name, query_profile=query_profile)
+    summary = PriceSummaryAccumulator()
     articles_filename = f"{base_filename}_all_products.csv"
-    df_articles.to_csv(articles_filename, index=False, encoding='utf-8')
+    write_articles_csv(iter_articles_from_products(products), articles_filename, summary=summary)
     files_saved['all_products'] = articles_filename
+    df_price_summary = summary.to_frame()
     
     # Save price summary
     summary_filename = f"{base_filename}_price_summary.csv"
-    df_price_summary.to_csv(summary_filename, index=False, encoding='utf-8')
+    with profiler.stage('csv_write'):
+        df_price_summary.to_csv(summary_filename, index=False, encoding='utf-8')
     files_saved['price_summary'] = summary_filename
     
+    print_time_breakdown()
+    write_run_metrics('faume', '../data/logs/faume/metrics')
     return files_saved
 
 
@@ -337,5 +611,18 @@ if __name__ == "__main__":
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()'''
+    parser = argparse.ArgumentParser(description='Faume collection analysis')
+    parser.add_argument('--brand', type=str, help='Collect this brand to CSV (save_data_to_csv) instead of running the analysis')
+    parser.add_argument('--api-key', type=str, default=os.getenv('FAUME_API_KEY'), help='Faume search API key (default: $FAUME_API_KEY)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.brand and not args.api_key:
+        parser.error('--brand needs --api-key or FAUME_API_KEY')
+    if args.profile:
+        profiler.start(cprofile=args.cprofile)
         
-    collection_analysis()
\ No newline at end of file
+    if args.brand:
+        save_data_to_csv(args.api_key, args.brand)
+    else:
+        collection_analysis()
+    profiler.finish('../data/logs/faume/profile', 'faume')
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+On-disk store of warmed scraping identities.
+
+Warming a session (page visits, cookie challenges, browser navigations)
+costs several requests and seconds of dwell time. Once an identity works,
+its cookie jar, UA / client-hint headers and, for browser contexts, the
+Playwright ``storage_state`` are saved here with an expiry, so the next
+session or process can start fetching straight away.
+
+Layout: one JSON file per identity name under the store root, e.g.
+
+    <root>/requests-direct.json
+    <root>/playwright-0-http___1.2.3.4_8080.json
+
+Files are written atomically and readable only by the owner (they hold
+session cookies).
+"""
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_TTL = 6 * 3600
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name) + '.json'
+
+
+def session_cookies(session) -> List[dict]:
+    """Cookies of a requests-style session as plain dicts."""
+    cookies = []
+    for c in getattr(session, 'cookies', []):
+        cookies.append({
+            'name': c.name,
+            'value': c.value,
+            'domain': c.domain,
+            'path': c.path or '/',
+            'expires': c.expires,
+            'secure': bool(c.secure),
+        })
+    return cookies
+
+
+class IdentityStore:
+    """Named identities (cookies, headers, storage_state) with expiry."""
+
+    def __init__(self, root, ttl: float = DEFAULT_TTL):
+        self.root = Path(root)
+        self.ttl = ttl
+
+    def _path(self, name: str) -> Path:
+        return self.root / _file_name(name)
+
+    def save(self, name: str, cookies: Optional[List[dict]] = None, headers: Optional[Dict[str, str]] = None,
+             storage_state: Optional[dict] = None, proxy: Optional[str] = None, ttl: Optional[float] = None) -> dict:
+        now = time.time()
+        identity = {
+            'name': name,
+            'saved_at': now,
+            'expires_at': now + (ttl if ttl is not None else self.ttl),
+            'proxy': proxy,
+            'headers': dict(headers or {}),
+            'cookies': list(cookies or []),
+            'storage_state': storage_state,
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._path(name)
+            tmp = path.with_name(path.name + '.tmp')
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(identity, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not save identity {name}: {e}")
+        return identity
+
+    def load(self, name: str) -> Optional[dict]:
+        """The saved identity, or None when missing, unreadable or expired."""
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                identity = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        now = time.time()
+        if identity.get('expires_at', 0) <= now:
+            self.delete(name)
+            return None
+        # Drop cookies that expired on their own since the save
+        identity['cookies'] = [c for c in identity.get('cookies', [])
+                               if not c.get('expires') or c['expires'] > now]
+        return identity
+
+    def delete(self, name: str) -> None:
+        try:
+            self._path(name).unlink()
+        except OSError:
+            pass
+
+    def names(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.stem for p in self.root.glob('*.json'))
+
+
+def hydrate_session(session, identity: dict) -> None:
+    """Apply a saved identity's headers and cookies to a requests-style session."""
+    session.headers.update(identity.get('headers') or {})
+    for c in identity.get('cookies') or []:
+        session.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path') or '/')
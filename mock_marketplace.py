@@ -0,0 +1,504 @@
+"""
+Local stand-in for the marketplaces the scrapers talk to.
+
+Serves deterministic, paginated synthetic data on the same paths as the
+real APIs, so collectors can be run and timed without touching the
+network:
+
+    GET  /api/v2/catalog/items            Vinted catalog (price / status / size filters, result cap)
+                                          plus / and /catalog pages
+    POST /v1/product/search               Vestiaire Collective search (filters, facets, result cap)
+    GET  /indexes/articles/documents      Faume Meilisearch documents
+    GET  /__stats                         requests served, by endpoint and status
+
+Latency (per response and per new connection, to stand in for the TLS
+handshake), 429 / 403 injection and per-item payload padding are
+configurable. Point the scrapers at it with the environment variables
+printed on start-up (VINTED_BASE_URL, VESTIAIRE_SEARCH_URL,
+FAUME_SEARCH_URL, VINTED_USE_PROXIES=0). Each scraper reads its host from
+these variables when it is imported and defaults to the real site, so
+they must be set before the import:
+
+    python mock_marketplace.py --latency 0.05 --throttle-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+VINTED_STATUSES = ('Neuf avec étiquette', 'Très bon état', 'Bon état', 'Satisfaisant')
+VINTED_STATUS_IDS = {'Neuf avec étiquette': 6, 'Très bon état': 2, 'Bon état': 3, 'Satisfaisant': 4}
+SIZES = ('XS', 'S', 'M', 'L', 'XL', 'W28', 'W30', '38', '40')
+COLORS = ('Noir', 'Bleu', 'Blanc', 'Beige', 'Rouge', 'Vert')
+# Synthetic Vestiaire category tree (categoryLvl0 id -> name); each has four
+# categoryLvl1 children (lvl0 * 10 + k), each with three categoryLvl2 (lvl1 * 10 + j)
+VESTIAIRE_LVL0 = {2: 'Vêtements', 3: 'Sacs', 4: 'Chaussures', 5: 'Accessoires'}
+VESTIAIRE_LVL0_WEIGHTS = (0.55, 0.2, 0.15, 0.1)
+# Attributes a search can filter and facet on ('<name>.id' filters)
+VESTIAIRE_ATTRIBUTES = ('universe', 'categoryLvl0', 'categoryLvl1', 'categoryLvl2', 'priceRange', 'condition', 'size0')
+
+
+@dataclass
+class MarketConfig:
+    """Shape and behaviour of the synthetic marketplace."""
+    vinted_items: int = 960          # per (brand, category)
+    vinted_result_cap: int = 960     # deepest result one Vinted catalog query serves
+    vestiaire_items: int = 2400      # per brand (catalogLinksWithoutLanguage)
+    vestiaire_result_cap: int = 1140  # deepest result one Vestiaire search serves
+    faume_products: int = 1000       # per brand
+    latency: float = 0.0             # seconds added to every API response
+    connect_latency: float = 0.0     # seconds added once per new connection (TCP + TLS setup)
+    jitter: float = 0.0              # extra uniform random latency, seconds
+    throttle_rate: float = 0.0       # share of API requests answered 429
+    block_rate: float = 0.0          # share of API requests answered 403
+    retry_after: Optional[float] = 1.0  # Retry-After on 429s (None: header omitted)
+    pad_bytes: int = 0               # filler added to each item's description
+    seed: int = 0
+
+
+def _filler(n: int) -> str:
+    return ('lorem ipsum dolor sit amet ' * (n // 27 + 1))[:n]
+
+
+def vinted_item(item_id: int, pad_bytes: int = 0) -> dict:
+    r = random.Random(item_id)
+    price = round(r.uniform(3, 300), 2)
+    return {
+        'id': item_id,
+        'title': f"Article {item_id}",
+        'price': {'amount': f"{price:.2f}", 'currency_code': 'EUR'},
+        'is_visible': True,
+        'brand_title': 'Mock Brand',
+        'path': f"/items/{item_id}-article",
+        'url': f"https://www.vinted.fr/items/{item_id}-article",
+        'promoted': item_id % 7 == 0,
+        'favourite_count': r.randint(0, 200),
+        'is_favourite': False,
+        'service_fee': {'amount': f"{0.7 + price * 0.05:.2f}", 'currency_code': 'EUR'},
+        'total_item_price': {'amount': f"{price * 1.05 + 0.7:.2f}", 'currency_code': 'EUR'},
+        'view_count': r.randint(0, 5000),
+        'size_title': r.choice(SIZES),
+        'content_source': 'search',
+        'status': r.choice(VINTED_STATUSES),
+        'user': {'id': 1000 + item_id % 5000, 'login': f"user{item_id % 5000}",
+                 'profile_url': f"https://www.vinted.fr/member/{1000 + item_id % 5000}", 'business': False},
+        'photo': {'id': item_id * 10, 'width': 600, 'height': 800,
+                  'url': f"https://images1.vinted.net/t/{item_id}.jpeg",
+                  'dominant_color': '#2D3A4B', 'is_main': True},
+        'item_box': {'first_line': r.choice(SIZES), 'second_line': r.choice(VINTED_STATUSES),
+                     'accessibility_label': f"Article {item_id}", 'item_id': item_id},
+        'search_tracking_params': {'score': r.random()},
+        'description': _filler(pad_bytes),
+    }
+
+
+def vestiaire_item(item_id: int, brand_id: str, pad_bytes: int = 0) -> dict:
+    r = random.Random(item_id)
+    return {
+        'id': str(item_id),
+        'name': f"Produit {item_id}",
+        'description': _filler(pad_bytes),
+        'brand': {'id': brand_id, 'name': 'Mock Brand', 'localizedName': 'Mock Brand'},
+        'model': {'id': str(item_id % 97), 'name': f"Model {item_id % 97}"},
+        'country': 'FR',
+        'price': {'currency': 'EUR', 'cents': r.randint(2000, 90000), 'formatted': ''},
+        'discount': None,
+        'link': f"/women-clothing/dresses/mock-brand/produit-{item_id}.shtml",
+        'sold': r.random() < 0.2,
+        'likes': r.randint(0, 80),
+        'editorPicks': False,
+        'shouldBeGone': False,
+        'seller': {'id': 500 + item_id % 3000, 'firstname': f"seller{item_id % 3000}",
+                   'badges': ['EXPERT_SELLER'] if item_id % 5 == 0 else []},
+        'directShipping': item_id % 2 == 0,
+        'local': False,
+        'pictures': [f"/produit-{item_id}-1.jpg", f"/produit-{item_id}-2.jpg"],
+        'colors': {'all': [{'id': 1, 'name': r.choice(COLORS)}]},
+        'size': {'id': 3, 'type': 'FR', 'size': r.choice(SIZES), 'localizedSize': ''},
+        'stock': False,
+        'universeId': 1,
+        'createdAt': 1700000000 + item_id,
+        'condition': {'id': 1, 'description': r.choice(VINTED_STATUSES)},
+    }
+
+
+def vestiaire_attributes(n_items: int, seed: str) -> list:
+    """Facet attributes of a brand's items; accessories have no size."""
+    r = random.Random(seed)
+    rows = []
+    for _ in range(n_items):
+        lvl0 = r.choices(list(VESTIAIRE_LVL0), VESTIAIRE_LVL0_WEIGHTS)[0]
+        lvl1 = lvl0 * 10 + r.randrange(4)
+        rows.append({
+            'universe': 1,
+            'categoryLvl0': lvl0,
+            'categoryLvl1': lvl1,
+            'categoryLvl2': lvl1 * 10 + r.randrange(3),
+            'priceRange': min(8, int(r.expovariate(0.5)) + 1),
+            'condition': r.choice((1, 2, 2, 3, 3, 3, 4)),
+            'size0': None if lvl0 == 5 else r.randrange(len(SIZES)) + 1,
+        })
+    return rows
+
+
+def vestiaire_taxonomy_rows() -> list:
+    """Taxonomy CSV rows (one per categoryLvl2) matching the synthetic catalogue."""
+    return [{'universe_id': 1, 'universe': 'Femme', 'parent_cat_id': lvl0, 'parent_cat': name,
+             'category_id': lvl0 * 10 + k, 'category': f"{name} {k}",
+             'sub_category_id': (lvl0 * 10 + k) * 10 + j, 'sub_category': f"{name} {k}.{j}"}
+            for lvl0, name in VESTIAIRE_LVL0.items() for k in range(4) for j in range(3)]
+
+
+def faume_product(product_id: int, brand_id: str, pad_bytes: int = 0) -> dict:
+    r = random.Random(product_id)
+    slug = f"produit-{product_id}"
+    choices = []
+    for k in range(r.randint(1, 3)):
+        choices.append({
+            '@id': f"/products/{slug}?variant={product_id * 10 + k}",
+            'id': product_id * 10 + k,
+            'slug': f"{slug}-{k}",
+            'title': f"Produit {product_id} ({k})",
+            'price': r.randint(2000, 40000),
+            'state': r.choice(('Très bon état', 'Bon état', 'Neuf')),
+            'size': r.choice(SIZES),
+            'type': 'Robe',
+            'brand': brand_id,
+            'color': r.choice(COLORS),
+            'gender': 'Femme',
+            'season': 'Été',
+            'category': 'Vêtements',
+            'sub_category': 'Robes',
+            'collection': 'SS24',
+            'color_image': '',
+            'size_filters': '',
+            'description': _filler(pad_bytes),
+            'information': '',
+            'publishedAt': '2024-05-01T10:00:00+00:00',
+            'photos': [f"https://cdn.example/{slug}-{k}.jpg"],
+        })
+    return {'id': product_id, 'title': f"Produit {product_id}", 'slug': slug, 'brand': brand_id, 'choices': choices}
+
+
+def _stable_id(*parts) -> int:
+    # Deterministic across processes (str hash() is salted)
+    value = 0
+    for part in parts:
+        for ch in str(part):
+            value = (value * 131 + ord(ch)) % 100_003
+    return value
+
+
+def _project(doc: dict, fields) -> dict:
+    """Keep only `fields` of a document; 'a.b' reaches into a nested object or list of objects."""
+    out: dict = {}
+    nested: Dict[str, list] = {}
+    for field in fields:
+        head, _, rest = field.partition('.')
+        if rest:
+            nested.setdefault(head, []).append(rest)
+        elif head in doc:
+            out[head] = doc[head]
+    for head, rests in nested.items():
+        value = doc.get(head)
+        if isinstance(value, dict):
+            out[head] = _project(value, rests)
+        elif isinstance(value, list):
+            out[head] = [_project(v, rests) if isinstance(v, dict) else v for v in value]
+    return out
+
+
+class MockMarketplace:
+    """Threaded HTTP server serving the synthetic marketplace APIs."""
+
+    def __init__(self, config: Optional[MarketConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MarketConfig()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self.stats: Counter = Counter()
+        self._vestiaire_brands: Dict[str, list] = {}
+        self._vestiaire_matches: Dict[str, list] = {}
+        self._vinted_categories: Dict[tuple, list] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the scrapers at this server."""
+        return {
+            'VINTED_BASE_URL': self.url,
+            'VESTIAIRE_SEARCH_URL': f"{self.url}/v1/product/search",
+            'FAUME_SEARCH_URL': self.url,
+            'VINTED_USE_PROXIES': '0',
+        }
+
+    def start(self) -> 'MockMarketplace':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _inject(self) -> Optional[int]:
+        """Status to fail this API request with, if any; sleeps out the latency."""
+        config = self.config
+        with self._rng_lock:
+            roll = self._rng.random()
+            delay = config.latency + (self._rng.uniform(0, config.jitter) if config.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if roll < config.throttle_rate:
+            return 429
+        if roll < config.throttle_rate + config.block_rate:
+            return 403
+        return None
+
+    # -- endpoint payloads -------------------------------------------------
+
+    def vinted_catalog(self, query: dict) -> dict:
+        config = self.config
+        page = max(1, int(query.get('page', ['1'])[0]))
+        per_page = max(1, int(query.get('per_page', ['96'])[0]))
+        brand = query.get('brand_ids', ['0'])[0] or '0'
+        cat = query.get('catalog_ids', ['0'])[0] or '0'
+        base = 4_000_000_000 + _stable_id(brand, cat) * 1_000_000
+        with self._rng_lock:
+            listing = self._vinted_categories.get((brand, cat))
+            if listing is None:
+                # (price, status id, size id) of every item, read off the generated items
+                listing = self._vinted_categories[(brand, cat)] = [
+                    (float(item['price']['amount']), VINTED_STATUS_IDS[item['status']], SIZES.index(item['size_title']) + 1)
+                    for item in (vinted_item(base + i) for i in range(config.vinted_items))]
+        price_from = float(query.get('price_from', ['0'])[0] or 0)
+        price_to = float(query.get('price_to', ['inf'])[0] or 'inf')
+        statuses = {int(s) for s in (query.get('status_ids', [''])[0] or '').split(',') if s}
+        sizes = {int(s) for s in (query.get('size_ids', [''])[0] or '').split(',') if s}
+        matched = [i for i, (price, status, size) in enumerate(listing)
+                   if price_from <= price <= price_to and (not statuses or status in statuses)
+                   and (not sizes or size in sizes)]
+        start = (page - 1) * per_page
+        stop = min(start + per_page, len(matched), config.vinted_result_cap)
+        return {
+            'items': [vinted_item(base + i, config.pad_bytes) for i in matched[start:stop]],
+            'pagination': {
+                'current_page': page,
+                'total_pages': -(-len(matched) // per_page),
+                'total_entries': len(matched),
+                'per_page': per_page,
+            },
+        }
+
+    def vestiaire_search(self, body: dict) -> dict:
+        config = self.config
+        pagination = body.get('pagination') or {}
+        offset = int(pagination.get('offset', 0))
+        limit = int(pagination.get('limit', 60))
+        filters = body.get('filters') or {}
+        brand = (filters.get('brand.id') or ['0'])[0]
+        catalog = (filters.get('catalogLinksWithoutLanguage') or [''])[0]
+        with self._rng_lock:
+            attributes = self._vestiaire_brands.get(brand + catalog)
+            if attributes is None:
+                attributes = self._vestiaire_brands[brand + catalog] = vestiaire_attributes(
+                    config.vestiaire_items, f"{config.seed}:{brand}:{catalog}")
+        # '<attribute>.id' filters select items whose attribute is one of the values
+        wanted = {key[:-3]: set(values) for key, values in filters.items()
+                  if key.endswith('.id') and key[:-3] in VESTIAIRE_ATTRIBUTES}
+        # Pages of one search share its match list
+        match_key = json.dumps([brand, catalog, sorted((k, sorted(v)) for k, v in wanted.items())])
+        with self._rng_lock:
+            matched = self._vestiaire_matches.get(match_key)
+        if matched is None:
+            matched = [i for i, attrs in enumerate(attributes)
+                       if all(str(attrs[name]) in values for name, values in wanted.items())]
+            with self._rng_lock:
+                if len(self._vestiaire_matches) > 256:
+                    self._vestiaire_matches.clear()
+                self._vestiaire_matches[match_key] = matched
+        base = _stable_id(brand, catalog) * 100_000
+        stop = min(offset + limit, len(matched), config.vestiaire_result_cap)
+        items = [vestiaire_item(base + i, brand, config.pad_bytes) for i in matched[offset:stop]]
+        if body.get('fields'):
+            # The real API always returns the id
+            items = [_project(item, ['id', *body['fields']]) for item in items]
+        facets = body.get('facets') or {}
+        fields = {}
+        for name in facets.get('fields') or []:
+            if name == 'brand':
+                fields[name] = [{'value': brand, 'count': len(matched)}] if matched else []
+            elif name in VESTIAIRE_ATTRIBUTES:
+                counts = Counter(attributes[i][name] for i in matched if attributes[i][name] is not None)
+                fields[name] = [{'value': str(value), 'count': n} for value, n in counts.most_common()]
+            elif name.startswith('size'):
+                fields[name] = []
+            else:
+                # Other facets come back with ~20 values each, like the real ones
+                fields[name] = [{'value': str(k), 'count': len(matched) // 20} for k in range(20)]
+        stats = {name: {'min': 20, 'max': 900} for name in facets.get('stats') or []}
+        return {
+            'items': items,
+            'paginationStats': {'totalHits': len(matched), 'totalPages': -(-len(matched) // limit)},
+            'facets': {'fields': fields, 'stats': stats},
+        }
+
+    def faume_documents(self, query: dict) -> dict:
+        config = self.config
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['20'])[0])
+        brand = (query.get('filter', ['brand=0'])[0]).split('=')[-1]
+        stop = min(offset + limit, config.faume_products)
+        results = [faume_product(i, brand, config.pad_bytes) for i in range(offset, stop)]
+        fields = query.get('fields', [''])[0]
+        if fields and fields != '*':
+            results = [_project(doc, fields.split(',')) for doc in results]
+        return {
+            'results': results,
+            'offset': offset,
+            'limit': limit,
+            'total': config.faume_products,
+        }
+
+    # -- HTTP plumbing -----------------------------------------------------
+
+    def _handler_class(self):
+        market = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes: without TCP_NODELAY, kept-alive
+            # connections would stall on delayed ACKs (~40 ms a response)
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                if market.config.connect_latency > 0:
+                    time.sleep(market.config.connect_latency)
+
+            def _send(self, status: int, body: bytes, content_type: str = 'application/json', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _api(self, endpoint: str, build) -> None:
+                failure = market._inject()
+                if failure == 429:
+                    headers = {} if market.config.retry_after is None else {'Retry-After': f"{market.config.retry_after:g}"}
+                    market.stats[(endpoint, 429)] += 1
+                    self._send(429, b'{"message":"Too Many Requests"}', headers=headers)
+                    return
+                if failure == 403:
+                    market.stats[(endpoint, 403)] += 1
+                    self._send(403, b'<html>Access denied</html>', 'text/html')
+                    return
+                body = json.dumps(build(), ensure_ascii=False).encode('utf-8')
+                market.stats[(endpoint, 200)] += 1
+                self._send(200, body)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query, keep_blank_values=True)
+                if parts.path == '/api/v2/catalog/items':
+                    self._api('vinted', lambda: market.vinted_catalog(query))
+                elif parts.path == '/indexes/articles/documents':
+                    self._api('faume', lambda: market.faume_documents(query))
+                elif parts.path in ('/', '/catalog'):
+                    market.stats[('page', 200)] += 1
+                    self._send(200, b'<html><body>mock</body></html>', 'text/html', {
+                        'Set-Cookie': 'access_token_web=mock-token; Path=/',
+                    })
+                elif parts.path == '/__stats':
+                    stats = {f"{endpoint}:{status}": n for (endpoint, status), n in market.stats.items()}
+                    self._send(200, json.dumps(stats).encode('utf-8'))
+                else:
+                    self._send(404, b'{}')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if urlsplit(self.path).path != '/v1/product/search':
+                    self._send(404, b'{}')
+                    return
+                try:
+                    body = json.loads(raw or b'{}')
+                except json.JSONDecodeError:
+                    self._send(400, b'{"message":"invalid json"}')
+                    return
+                self._api('vestiaire', lambda: market.vestiaire_search(body))
+
+        return Handler
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MarketConfig()
+    parser.add_argument('--vinted-items', type=int, default=defaults.vinted_items, help='Items per Vinted (brand, category)')
+    parser.add_argument('--vinted-result-cap', type=int, default=defaults.vinted_result_cap,
+                        help='Deepest result one Vinted catalog query serves')
+    parser.add_argument('--vestiaire-items', type=int, default=defaults.vestiaire_items, help='Items per Vestiaire brand')
+    parser.add_argument('--vestiaire-result-cap', type=int, default=defaults.vestiaire_result_cap,
+                        help='Deepest result one Vestiaire search serves')
+    parser.add_argument('--faume-products', type=int, default=defaults.faume_products, help='Products per Faume brand')
+    parser.add_argument('--latency', type=float, default=defaults.latency, help='Seconds added to every API response')
+    parser.add_argument('--connect-latency', type=float, default=defaults.connect_latency,
+                        help='Seconds added once per new connection (stands in for the TLS handshake)')
+    parser.add_argument('--jitter', type=float, default=defaults.jitter, help='Extra uniform random latency (s)')
+    parser.add_argument('--throttle-rate', type=float, default=defaults.throttle_rate, help='Share of API requests answered 429')
+    parser.add_argument('--block-rate', type=float, default=defaults.block_rate, help='Share of API requests answered 403')
+    parser.add_argument('--retry-after', type=float, default=defaults.retry_after, help='Retry-After seconds on 429')
+    parser.add_argument('--pad-bytes', type=int, default=defaults.pad_bytes, help='Filler bytes per item description')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def config_from_args(args) -> MarketConfig:
+    return MarketConfig(
+        vinted_items=args.vinted_items, vinted_result_cap=args.vinted_result_cap, vestiaire_items=args.vestiaire_items,
+        vestiaire_result_cap=args.vestiaire_result_cap,
+        faume_products=args.faume_products, latency=args.latency, connect_latency=args.connect_latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate, block_rate=args.block_rate,
+        retry_after=args.retry_after, pad_bytes=args.pad_bytes, seed=args.seed,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in marketplace server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0 picks a free port')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    market = MockMarketplace(config_from_args(args), host=args.host, port=args.port)
+    # First line is the base URL (read by benchmarks.py e2e)
+    print(market.url, flush=True)
+    for name, value in market.env().items():
+        print(f"export {name}={value}", flush=True)
+    try:
+        market._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        market._server.server_close()
@@ -0,0 +1,278 @@
+"""
+Scored pool of free HTTP proxies.
+
+Candidates are fetched from all source lists at once and health-checked
+concurrently. Every proxy keeps an EWMA of its latency and success rate,
+fed by the health checks and by the scrapers' own requests (report()).
+best() hands out the top-ranked healthy proxy straight from memory; a
+blocked proxy is banned for a while and the next one is returned at once.
+When the pool runs low it is topped up in the background.
+
+The pool is saved as JSON so a new run starts with the proxies that
+worked last time instead of re-testing from scratch.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+CHECK_URL = "https://www.google.com/generate_204"
+
+
+@dataclass
+class ProxyStats:
+    proxy: str
+    latency: Optional[float] = None  # EWMA seconds
+    success: float = 0.5             # EWMA of 1 (ok) / 0 (failed)
+    checks: int = 0
+    failures_in_row: int = 0
+    last_ok: float = 0.0
+    banned_until: float = 0.0
+
+    def score(self) -> float:
+        """Higher is better: success rate per second of latency."""
+        latency = self.latency if self.latency is not None else 5.0
+        return self.success / (0.05 + latency)
+
+
+def normalize_proxy(raw: str) -> Optional[str]:
+    """'host:port' or 'scheme://host:port' -> 'http://host:port'; None for auth/invalid entries."""
+    line = raw.strip()
+    if not line or line.startswith('#'):
+        return None
+    if '://' in line:
+        line = line.split('://', 1)[1]
+    # Filter out auth-bearing proxies (paid)
+    if '@' in line or line.count(':') != 1:
+        return None
+    return f"http://{line}"
+
+
+def fetch_proxy_lists(sources: Iterable[str], timeout: float = 10, limit: int = 500) -> List[str]:
+    """Download all source lists concurrently; deduplicated, in source order."""
+    sources = list(sources)
+
+    def fetch(url):
+        try:
+            resp = requests.get(url, timeout=timeout)
+            if resp.status_code == 200 and resp.text:
+                return resp.text.splitlines()
+        except Exception:
+            pass
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, len(sources))) as ex:
+        lists = list(ex.map(fetch, sources))
+    seen, result = set(), []
+    for lines in lists:
+        for line in lines:
+            proxy = normalize_proxy(line)
+            if proxy and proxy not in seen:
+                seen.add(proxy)
+                result.append(proxy)
+    return result[:limit]
+
+
+def check_proxy(proxy: str, timeout: float = 5, url: str = CHECK_URL) -> Tuple[bool, float]:
+    """One request through the proxy; returns (ok, elapsed seconds)."""
+    t0 = time.perf_counter()
+    try:
+        r = requests.get(url, proxies={'http': proxy, 'https': proxy}, timeout=timeout, verify=False)
+        ok = r.status_code in (200, 204)
+    except Exception:
+        ok = False
+    return ok, time.perf_counter() - t0
+
+
+class ProxyPool:
+    """Thread-safe, persisted, EWMA-ranked proxy pool."""
+
+    def __init__(self, path, candidates: Callable[[], List[str]], checker: Callable[[str], Tuple[bool, float]] = check_proxy,
+                 alpha: float = 0.3, max_failures: int = 2, ban_seconds: float = 900,
+                 check_batch: int = 60, check_workers: int = 30, min_healthy: int = 3,
+                 max_age: float = 24 * 3600, candidates_ttl: float = 600):
+        self.path = Path(path) if path else None
+        self._candidates = candidates
+        self._checker = checker
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.ban_seconds = ban_seconds
+        self.check_batch = check_batch
+        self.check_workers = check_workers
+        self.min_healthy = min_healthy
+        self.max_age = max_age
+        self.candidates_ttl = candidates_ttl
+        self._candidate_list: List[str] = []
+        self._candidates_at = 0.0
+        self._stats: Dict[str, ProxyStats] = {}
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._last_handed: Optional[str] = None
+        self._load()
+
+    # -- persistence -------------------------------------------------------
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        now = time.time()
+        for entry in entries:
+            try:
+                stats = ProxyStats(**entry)
+            except TypeError:
+                continue
+            if now - stats.last_ok <= self.max_age:
+                self._stats[stats.proxy] = stats
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            entries = [asdict(s) for s in self._stats.values() if s.last_ok]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # -- scoring -----------------------------------------------------------
+
+    def report(self, proxy: Optional[str], ok: bool, latency: Optional[float] = None, ban: bool = False) -> None:
+        """Feed one observed request outcome back into the proxy's score."""
+        if not proxy:
+            return
+        with self._lock:
+            stats = self._stats.setdefault(proxy, ProxyStats(proxy))
+            stats.checks += 1
+            stats.success = (1 - self.alpha) * stats.success + self.alpha * (1.0 if ok else 0.0)
+            if ok:
+                stats.failures_in_row = 0
+                stats.last_ok = time.time()
+                if latency is not None:
+                    stats.latency = latency if stats.latency is None else (1 - self.alpha) * stats.latency + self.alpha * latency
+            else:
+                stats.failures_in_row += 1
+                if ban or stats.failures_in_row >= self.max_failures:
+                    stats.banned_until = time.time() + self.ban_seconds
+
+    def _healthy(self, now: float) -> List[ProxyStats]:
+        return [s for s in self._stats.values()
+                if s.banned_until <= now and s.failures_in_row < self.max_failures and s.last_ok]
+
+    def ranked(self) -> List[ProxyStats]:
+        with self._lock:
+            return sorted(self._healthy(time.time()), key=lambda s: s.score(), reverse=True)
+
+    def healthy_count(self) -> int:
+        with self._lock:
+            return len(self._healthy(time.time()))
+
+    # -- selection ---------------------------------------------------------
+
+    def best(self, exclude: Iterable[str] = (), wait: bool = True) -> Optional[str]:
+        """Top-ranked healthy proxy. Refreshes in the background when the pool
+        runs low; when it is empty and wait is set, blocks only until the first
+        candidate passes its check."""
+        exclude = set(exclude)
+        ranked = [s for s in self.ranked() if s.proxy not in exclude]
+        if len(ranked) < self.min_healthy:
+            self.refresh_async()
+        if not ranked and wait:
+            self.refresh(until_first=True)
+            ranked = [s for s in self.ranked() if s.proxy not in exclude]
+        proxy = ranked[0].proxy if ranked else None
+        self._last_handed = proxy
+        return proxy
+
+    def ban(self, proxy: Optional[str] = None) -> None:
+        """Ban a proxy (the last one handed out by default) after a block."""
+        proxy = proxy or self._last_handed
+        if proxy:
+            self.report(proxy, ok=False, ban=True)
+
+    # -- health checks -----------------------------------------------------
+
+    def candidates(self) -> List[str]:
+        """Source proxies, re-downloaded at most every candidates_ttl seconds."""
+        if not self._candidate_list or time.time() - self._candidates_at > self.candidates_ttl:
+            self._candidate_list = list(self._candidates())
+            self._candidates_at = time.time()
+        return self._candidate_list
+
+    def refresh(self, until_first: bool = False, blocking: bool = True) -> int:
+        """Check untested candidates concurrently; returns how many passed.
+
+        With until_first, returns as soon as one passes and lets the remaining
+        checks finish in the background. Without blocking, returns 0 when
+        another refresh is already running.
+        """
+        if not self._refreshing.acquire(blocking=blocking and not until_first):
+            if not until_first:
+                return 0
+            # Another refresh is running: wait for its first result instead
+            deadline = time.time() + 30
+            while not self.healthy_count() and self._refreshing.locked() and time.time() < deadline:
+                time.sleep(0.05)
+            return self.healthy_count()
+        now = time.time()
+        try:
+            with self._lock:
+                # Skip banned proxies and the ones already healthy
+                skip = {s.proxy for s in self._stats.values() if s.banned_until > now}
+                skip.update(s.proxy for s in self._healthy(now))
+            todo = [p for p in self.candidates() if p not in skip][:self.check_batch]
+        except Exception:
+            self._refreshing.release()
+            raise
+        if not todo:
+            self._refreshing.release()
+            return 0
+
+        ex = ThreadPoolExecutor(max_workers=self.check_workers)
+        futures = {ex.submit(self._checker, p): p for p in todo}
+        passed = 0
+
+        def drain(pending):
+            nonlocal passed
+            try:
+                for fut in pending:
+                    ok, elapsed = fut.result()
+                    self.report(futures[fut], ok, elapsed, ban=not ok)
+                    passed += ok
+            finally:
+                ex.shutdown(wait=False)
+                self.save()
+                self._refreshing.release()
+
+        if not until_first:
+            drain(as_completed(futures))
+            return passed
+        pending = as_completed(futures)
+        for fut in pending:
+            ok, elapsed = fut.result()
+            self.report(futures[fut], ok, elapsed, ban=not ok)
+            if ok:
+                passed += 1
+                threading.Thread(target=drain, args=(pending,), daemon=True).start()
+                return passed
+        drain(())
+        return passed
+
+    def refresh_async(self) -> None:
+        if self._refreshing.locked():
+            return
+        threading.Thread(target=self.refresh, kwargs={'blocking': False}, daemon=True).start()
@@ -0,0 +1,240 @@
+"""
+Shared adaptive rate limiting for the scrapers.
+
+Requests are paced per (endpoint, identity) key, where the identity is
+whatever the site can tell apart: a proxy, a browser context, an API key.
+Each key owns a token bucket whose refill rate adapts AIMD-style to the
+responses reported back:
+
+    2xx          -> rate += increase              (up to max_rate)
+    429/503      -> rate *= decrease, and wait for Retry-After or a
+                    doubling cooldown before the next request
+    other errors -> rate unchanged, doubling error backoff
+
+Callers reserve a slot before each request and report the outcome after:
+
+    wait = rate_limiter.acquire('vinted.catalog', proxy)       # sync
+    await rate_limiter.acquire_async('vinted.catalog', proxy)  # asyncio
+    rate_limiter.feedback('vinted.catalog', proxy, response.status_code, response.headers)
+
+Reservations are handed out in order under a lock, so concurrent threads
+and tasks sharing a key are spaced 1/rate apart rather than bursting.
+Observers (add_observer) are told about every wait the limiter enforces.
+"""
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value, now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now_dt = datetime.fromtimestamp(now if now is not None else time.time(), tz=timezone.utc)
+    return max(0.0, (when - now_dt).total_seconds())
+
+
+@dataclass
+class LimitConfig:
+    """Pacing parameters of one endpoint (rates in requests per second)."""
+    rate: float = 1.0
+    burst: float = 1.0
+    min_rate: float = 0.05
+    max_rate: float = 5.0
+    increase: float = 0.05
+    decrease: float = 0.5
+    cooldown: float = 5.0
+    max_cooldown: float = 300.0
+    error_backoff: float = 2.0
+    # Extra random delay, as a fraction of the current interval
+    jitter: float = 0.25
+
+
+@dataclass
+class _Bucket:
+    config: LimitConfig
+    rate: float
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+    throttles: int = 0
+    errors: int = 0
+    stats: Dict[str, int] = field(default_factory=lambda: {'requests': 0, 'ok': 0, 'throttled': 0, 'errors': 0})
+
+
+class AdaptiveRateLimiter:
+    """Token buckets with AIMD rate control, keyed by (endpoint, identity)."""
+
+    def __init__(self, default: Optional[LimitConfig] = None, clock=time.monotonic):
+        self._default = default or LimitConfig()
+        self._configs: Dict[str, LimitConfig] = {}
+        self._buckets: Dict[Tuple[str, Hashable], _Bucket] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._observers: List[Callable] = []
+
+    def add_observer(self, callback: Callable) -> None:
+        """callback(endpoint, identity, seconds, reason) after every enforced wait;
+        reason is 'backoff' for throttle/error windows and 'pacing' otherwise."""
+        self._observers.append(callback)
+
+    def _waited(self, endpoint: str, identity: Hashable, seconds: float, reason: str) -> None:
+        for callback in self._observers:
+            try:
+                callback(endpoint, identity, seconds, reason)
+            except Exception:
+                pass
+
+    def configure(self, endpoint: str, **params) -> LimitConfig:
+        """Set the pacing of an endpoint; existing buckets keep their learned rate."""
+        with self._lock:
+            config = self._configs.get(endpoint) or LimitConfig(**vars(self._default))
+            for name, value in params.items():
+                if not hasattr(config, name):
+                    raise TypeError(f"Unknown rate limit parameter: {name}")
+                setattr(config, name, value)
+            self._configs[endpoint] = config
+            for (ep, _), bucket in self._buckets.items():
+                if ep == endpoint:
+                    bucket.config = config
+                    bucket.rate = min(max(bucket.rate, config.min_rate), config.max_rate)
+            return config
+
+    def _bucket(self, endpoint: str, identity: Hashable) -> _Bucket:
+        key = (endpoint, identity)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            config = self._configs.get(endpoint) or self._default
+            bucket = _Bucket(config=config, rate=config.rate, tokens=config.burst, updated=self._clock())
+            self._buckets[key] = bucket
+        return bucket
+
+    def reserve(self, endpoint: str, identity: Hashable = None, cost: float = 1.0) -> float:
+        """Take `cost` tokens now and return how long the caller must wait before sending."""
+        return self._reserve(endpoint, identity, cost)[0]
+
+    def _reserve(self, endpoint: str, identity: Hashable, cost: float) -> Tuple[float, str]:
+        with self._lock:
+            bucket = self._bucket(endpoint, identity)
+            now = self._clock()
+            bucket.tokens = min(bucket.config.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= cost
+            pacing = max(0.0, -bucket.tokens / bucket.rate)
+            blocked = max(0.0, bucket.blocked_until - now)
+            wait = max(pacing, blocked)
+            bucket.stats['requests'] += 1
+            if wait > 0 and bucket.config.jitter:
+                wait += random.uniform(0, bucket.config.jitter / bucket.rate)
+            return wait, 'backoff' if blocked >= pacing and blocked > 0 else 'pacing'
+
+    def acquire(self, endpoint: str, identity: Hashable = None, cost: float = 1.0) -> float:
+        """Block until the request may be sent; returns the time waited."""
+        wait, reason = self._reserve(endpoint, identity, cost)
+        if wait > 0:
+            time.sleep(wait)
+            self._waited(endpoint, identity, wait, reason)
+        return wait
+
+    async def acquire_async(self, endpoint: str, identity: Hashable = None, cost: float = 1.0) -> float:
+        wait, reason = self._reserve(endpoint, identity, cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+            self._waited(endpoint, identity, wait, reason)
+        return wait
+
+    def wait_ready(self, endpoint: str, identity: Hashable = None) -> float:
+        """Sleep out an active throttle/backoff window without taking a token."""
+        with self._lock:
+            wait = max(0.0, self._bucket(endpoint, identity).blocked_until - self._clock())
+        if wait > 0:
+            time.sleep(wait)
+            self._waited(endpoint, identity, wait, 'backoff')
+        return wait
+
+    async def wait_ready_async(self, endpoint: str, identity: Hashable = None) -> float:
+        with self._lock:
+            wait = max(0.0, self._bucket(endpoint, identity).blocked_until - self._clock())
+        if wait > 0:
+            await asyncio.sleep(wait)
+            self._waited(endpoint, identity, wait, 'backoff')
+        return wait
+
+    def on_success(self, endpoint: str, identity: Hashable = None) -> None:
+        with self._lock:
+            bucket = self._bucket(endpoint, identity)
+            bucket.rate = min(bucket.config.max_rate, bucket.rate + bucket.config.increase)
+            bucket.throttles = 0
+            bucket.errors = 0
+            bucket.stats['ok'] += 1
+
+    def on_throttle(self, endpoint: str, identity: Hashable = None, retry_after: Optional[float] = None) -> float:
+        """Halve the rate and block the key; returns the enforced pause in seconds."""
+        with self._lock:
+            bucket = self._bucket(endpoint, identity)
+            config = bucket.config
+            bucket.rate = max(config.min_rate, bucket.rate * config.decrease)
+            bucket.throttles += 1
+            bucket.stats['throttled'] += 1
+            pause = min(config.max_cooldown, config.cooldown * 2 ** (bucket.throttles - 1))
+            if retry_after is not None:
+                pause = max(retry_after, 1.0 / bucket.rate)
+            now = self._clock()
+            bucket.blocked_until = max(bucket.blocked_until, now + pause)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.updated = now
+            return pause
+
+    def on_error(self, endpoint: str, identity: Hashable = None) -> float:
+        """Back off after a failure that is not a rate limit; the rate is left as is."""
+        with self._lock:
+            bucket = self._bucket(endpoint, identity)
+            config = bucket.config
+            bucket.errors += 1
+            bucket.stats['errors'] += 1
+            pause = min(config.max_cooldown, config.error_backoff * 2 ** (bucket.errors - 1))
+            bucket.blocked_until = max(bucket.blocked_until, self._clock() + pause)
+            return pause
+
+    def feedback(self, endpoint: str, identity: Hashable = None, status: Optional[int] = None, headers=None) -> None:
+        """Report a response status (None for a transport error) for the key."""
+        if status is not None and 200 <= status < 400:
+            self.on_success(endpoint, identity)
+        elif status in THROTTLE_STATUSES:
+            retry_after = parse_retry_after((headers or {}).get('Retry-After')) if headers is not None else None
+            self.on_throttle(endpoint, identity, retry_after)
+        else:
+            self.on_error(endpoint, identity)
+
+    def state(self, endpoint: str, identity: Hashable = None) -> dict:
+        with self._lock:
+            bucket = self._bucket(endpoint, identity)
+            return {
+                'rate': bucket.rate,
+                'blocked_for': max(0.0, bucket.blocked_until - self._clock()),
+                **bucket.stats,
+            }
+
+
+# Process-wide limiter shared by every scraper
+rate_limiter = AdaptiveRateLimiter()
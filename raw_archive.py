@@ -0,0 +1,178 @@
+"""
+Append-only archive of raw API responses.
+
+Responses are appended, as received, to compressed JSONL segments
+partitioned by brand / category / UTC day:
+
+    <root>/<brand>/<cat>/<YYYY-MM-DD>/seg_000001.jsonl.gz   (.zst with zstandard)
+    <root>/<brand>/<cat>/<YYYY-MM-DD>/seg_000001.idx
+
+Every record is compressed as its own gzip member / zstd frame, so a
+segment is still a valid .gz/.zst JSONL file for zcat/zstdcat, and one
+record can be read back by seeking to its member. The .idx file holds one
+fixed-size entry per record (offset, compressed length, timestamp, page
+number) for that random access.
+
+The response bytes are stored as-is; only line breaks are turned into
+spaces so each response stays on one line (JSON strings cannot contain
+raw line breaks, so this never changes the document).
+
+A segment is closed once it passes max_segment_bytes; day partitions
+older than retention_days are deleted by apply_retention().
+"""
+import gzip
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# offset (u64), compressed length (u32), timestamp ms (u64), page number (u32)
+INDEX_ENTRY = struct.Struct('<QIQI')
+
+
+class RecordRef(NamedTuple):
+    segment: Path
+    offset: int
+    length: int
+    ts_ms: int
+    page_nb: int
+
+
+def _codec(name: str) -> str:
+    if name == 'auto':
+        return 'zstd' if zstandard is not None else 'gzip'
+    if name == 'zstd' and zstandard is None:
+        raise ImportError("zstd archives need the 'zstandard' package")
+    return name
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(path: Path, data: bytes) -> bytes:
+    if path.name.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("reading .zst segments needs the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _one_line(raw: bytes) -> bytes:
+    return raw.replace(b'\r', b' ').replace(b'\n', b' ') + b'\n'
+
+
+class RawArchive:
+    """Writer/reader for the segmented raw response archive.
+
+    Writes are serialized within the process; one process should write a
+    given archive root at a time.
+    """
+
+    def __init__(self, root, codec: str = 'auto', max_segment_bytes: int = 64 * 2**20,
+                 retention_days: Optional[int] = None):
+        self.root = Path(root)
+        self.codec = _codec(codec)
+        self.suffix = '.jsonl.zst' if self.codec == 'zstd' else '.jsonl.gz'
+        self.max_segment_bytes = max_segment_bytes
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        # partition dir -> (segment path, index path)
+        self._current: dict = {}
+        self._retention_day: Optional[str] = None
+
+    def _partition(self, brand_id, cat_id, ts: float) -> Path:
+        day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%d')
+        return self.root / str(brand_id) / str(cat_id) / day
+
+    def _segment_for(self, partition: Path, incoming: int) -> Tuple[Path, Path]:
+        current = self._current.get(partition)
+        if current is None:
+            partition.mkdir(parents=True, exist_ok=True)
+            existing = sorted(partition.glob('seg_*.idx'))
+            seq = int(existing[-1].stem.split('_')[1]) if existing else 1
+            current = self._paths(partition, seq)
+        segment, _ = current
+        size = segment.stat().st_size if segment.exists() else 0
+        if size and size + incoming > self.max_segment_bytes:
+            seq = int(segment.name.split('.')[0].split('_')[1]) + 1
+            current = self._paths(partition, seq)
+        self._current[partition] = current
+        return current
+
+    def _paths(self, partition: Path, seq: int) -> Tuple[Path, Path]:
+        return partition / f"seg_{seq:06d}{self.suffix}", partition / f"seg_{seq:06d}.idx"
+
+    def append(self, raw: bytes, brand_id, cat_id, page_nb: int = 0, ts: Optional[float] = None) -> RecordRef:
+        """Compress and append one response; returns where it was stored."""
+        ts = time.time() if ts is None else ts
+        member = _compress(self.codec, _one_line(raw))
+        with self._lock:
+            today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            if self.retention_days is not None and self._retention_day != today:
+                # At most one sweep per process per day
+                self._retention_day = today
+                self.apply_retention()
+            segment, index = self._segment_for(self._partition(brand_id, cat_id, ts), len(member))
+            with open(segment, 'ab') as f:
+                offset = f.tell()
+                f.write(member)
+            ts_ms = int(ts * 1000)
+            with open(index, 'ab') as f:
+                f.write(INDEX_ENTRY.pack(offset, len(member), ts_ms, int(page_nb)))
+        return RecordRef(segment, offset, len(member), ts_ms, int(page_nb))
+
+    # -- reading -------------------------------------------------------------
+
+    def segments(self, brand_id=None, cat_id=None, day: Optional[str] = None) -> List[Path]:
+        parts = [str(brand_id) if brand_id is not None else '*',
+                 str(cat_id) if cat_id is not None else '*',
+                 day or '*']
+        return sorted(p for p in self.root.glob('/'.join(parts) + '/seg_*.jsonl.*'))
+
+    def index(self, segment: Path) -> List[RecordRef]:
+        idx = segment.with_name(segment.name.split('.')[0] + '.idx')
+        try:
+            data = idx.read_bytes()
+        except FileNotFoundError:
+            return []
+        # A torn trailing entry from an interrupted write is ignored
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return [RecordRef(segment, *entry) for entry in INDEX_ENTRY.iter_unpack(data[:usable])]
+
+    def read(self, ref: RecordRef) -> bytes:
+        """Raw response bytes of one record (random access via the index)."""
+        with open(ref.segment, 'rb') as f:
+            f.seek(ref.offset)
+            return _decompress(ref.segment, f.read(ref.length)).rstrip(b'\n')
+
+    def records(self, brand_id=None, cat_id=None, day: Optional[str] = None) -> Iterator[Tuple[RecordRef, bytes]]:
+        for segment in self.segments(brand_id, cat_id, day):
+            for ref in self.index(segment):
+                yield ref, self.read(ref)
+
+    # -- retention -----------------------------------------------------------
+
+    def apply_retention(self, retention_days: Optional[int] = None) -> int:
+        """Delete day partitions older than retention_days; returns how many."""
+        days = self.retention_days if retention_days is None else retention_days
+        if days is None:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
+        removed = 0
+        for partition in self.root.glob('*/*/*'):
+            if partition.is_dir() and partition.name < cutoff:
+                shutil.rmtree(partition, ignore_errors=True)
+                self._current.pop(partition, None)
+                removed += 1
+        return removed
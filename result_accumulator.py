@@ -0,0 +1,88 @@
+"""
+Page-chunk accumulator shared by the collectors.
+
+Collectors used to grow their result with ``full_df = pd.concat([full_df, temp_df])``
+once per page, which copies everything collected so far on every page.
+ResultAccumulator keeps the page frames in a list and concatenates them
+once, when the result is actually needed, and can forward each chunk to a
+sink (e.g. a CSV file) as it arrives.
+"""
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+try:
+    from scrapers.stage_profiler import profiler
+except ImportError:
+    from stage_profiler import profiler
+
+
+class ResultAccumulator:
+    """Collect page DataFrames and materialize them with a single concat.
+
+    Args:
+        initial: Previously collected data (e.g. loaded on resume)
+        sink: Optional callable invoked with every added chunk
+        keep_in_memory: When False, chunks only go to the sink and
+            to_frame() returns an empty frame (bounded memory streaming)
+    """
+
+    def __init__(self, initial: Optional[pd.DataFrame] = None,
+                 sink: Optional[Callable[[pd.DataFrame], None]] = None,
+                 keep_in_memory: bool = True):
+        self._chunks: List[pd.DataFrame] = []
+        self._rows = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._sink = sink
+        self._keep = keep_in_memory
+        if initial is not None and len(initial.columns):
+            self._chunks.append(initial)
+            self._rows += len(initial)
+
+    def add(self, df: Optional[pd.DataFrame]) -> None:
+        """Append one page of results."""
+        if df is None or (len(df) == 0 and len(df.columns) == 0):
+            return
+        if self._sink is not None:
+            self._sink(df)
+        self._rows += len(df)
+        if self._keep:
+            self._chunks.append(df)
+            self._frame = None
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def empty(self) -> bool:
+        return self._rows == 0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Concatenate the collected chunks (cached until the next add)."""
+        if self._frame is None:
+            if not self._chunks:
+                self._frame = pd.DataFrame()
+            elif len(self._chunks) == 1:
+                self._frame = self._chunks[0]
+            else:
+                with profiler.stage('accumulate_concat'):
+                    self._frame = pd.concat(self._chunks)
+                # Later materializations start from this frame, not from every page again
+                self._chunks = [self._frame]
+        return self._frame
+
+
+class CsvSink:
+    """Append chunks to one CSV file, writing the header only once."""
+
+    def __init__(self, path, **to_csv_kwargs):
+        self.path = Path(path)
+        self._kwargs = to_csv_kwargs
+        self._header_written = self.path.exists() and self.path.stat().st_size > 0
+
+    def __call__(self, df: pd.DataFrame) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with profiler.stage('csv_write'):
+            df.to_csv(self.path, mode='a', header=not self._header_written, **self._kwargs)
+        self._header_written = True
@@ -0,0 +1,307 @@
+"""
+Request-level metrics shared by the scrapers.
+
+A small in-process registry of labeled counters and histograms, exported
+as Prometheus text (to_prometheus) or as a JSON run summary (summary).
+The scrapers record through the helpers at the bottom of this module:
+
+    observe_request('vinted', 'catalog', proxy, response.status_code, elapsed, len(response.content))
+    observe_parse('vinted', 'catalog', len(df), parse_seconds)
+    count_retry('vestiaire', 'search', 'status_403')
+
+Requests made under a named query profile (count-only, listing-lean, full)
+pass it as query_profile=, so response sizes can be compared per profile.
+
+Every wait enforced by the shared rate limiter is recorded as sleep time
+automatically (reason 'pacing' or 'backoff'), so a run summary splits
+wall-clock time into network, backoff/pacing and parsing per scraper.
+"""
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from scrapers.rate_limiter import rate_limiter
+except ImportError:
+    from rate_limiter import rate_limiter
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple('' if labels.get(n) is None else str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[tuple, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def total(self, **match) -> float:
+        """Sum over every label set matching the given label values."""
+        idx = [(self.labelnames.index(n), str(v)) for n, v in match.items()]
+        return sum(v for k, v in self.samples() if all(k[i] == want for i, want in idx))
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames, lock, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames, lock)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += value
+
+    def samples(self) -> List[Tuple[tuple, List[int], float]]:
+        with self._lock:
+            return sorted((k, list(v[0]), v[1]) for k, v in self._values.items())
+
+    def total(self, **match) -> float:
+        idx = [(self.labelnames.index(n), str(v)) for n, v in match.items()]
+        return sum(s for k, _, s in self.samples() if all(k[i] == want for i, want in idx))
+
+
+class MetricsRegistry:
+    """Named counters and histograms with Prometheus and JSON export."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self.started_at = time.time()
+
+    def _register(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, threading.Lock(), **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with another type or labels")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, tuple(labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, tuple(labelnames), buckets=buckets)
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if isinstance(metric, Counter):
+                for key, value in metric.samples():
+                    lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+            else:
+                for key, counts, total in metric.samples():
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (math.inf,), counts):
+                        cumulative += count
+                        labels = _format_labels(metric.labelnames, key, (('le', _format_value(bound)),))
+                        lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(metric.labelnames, key)
+                    lines.append(f"{metric.name}_sum{labels} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{labels} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> dict:
+        """JSON-serializable run summary: every sample plus a time breakdown."""
+        out = {}
+        for metric in self.metrics():
+            if isinstance(metric, Counter):
+                out[metric.name] = [{'labels': dict(zip(metric.labelnames, key)), 'value': value}
+                                    for key, value in metric.samples()]
+            else:
+                out[metric.name] = [{'labels': dict(zip(metric.labelnames, key)), 'count': sum(counts),
+                                     'sum': total, 'mean': total / sum(counts) if sum(counts) else None,
+                                     'buckets': dict(zip([str(b) for b in metric.buckets] + ['+Inf'], counts))}
+                                    for key, counts, total in metric.samples()]
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at, tz=timezone.utc).isoformat(),
+            'elapsed_s': time.time() - self.started_at,
+            'time_breakdown': time_breakdown(),
+            'metrics': out,
+        }
+
+    def write(self, path_prefix) -> Tuple[Path, Path]:
+        """Write <prefix>.json (run summary) and <prefix>.prom (Prometheus text)."""
+        prefix = Path(path_prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        json_path = prefix.with_name(prefix.name + '.json')
+        prom_path = prefix.with_name(prefix.name + '.prom')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+
+# Process-wide registry shared by every scraper
+metrics = MetricsRegistry()
+
+REQUESTS = metrics.counter('scraper_requests_total', 'HTTP requests by response status ("error" for transport failures)',
+                           ('scraper', 'endpoint', 'identity', 'status'))
+REQUEST_SECONDS = metrics.histogram('scraper_request_seconds', 'Request latency in seconds', ('scraper', 'endpoint'))
+RESPONSE_BYTES = metrics.counter('scraper_response_bytes_total', 'Response body bytes received', ('scraper', 'endpoint'))
+RESPONSE_SIZE = metrics.histogram('scraper_response_size_bytes', 'Response body size per request',
+                                  ('scraper', 'endpoint', 'query_profile'), buckets=SIZE_BUCKETS)
+RETRIES = metrics.counter('scraper_retries_total', 'Request retries by reason', ('scraper', 'endpoint', 'reason'))
+PROXY_SWITCHES = metrics.counter('scraper_proxy_switches_total', 'Proxy rotations after a block', ('scraper',))
+PLAYWRIGHT_FALLBACKS = metrics.counter('scraper_playwright_fallbacks_total',
+                                       'Pages the browser path could not fetch, retried over plain HTTP', ('scraper', 'reason'))
+ITEMS_PARSED = metrics.counter('scraper_items_parsed_total', 'Items parsed into rows', ('scraper', 'endpoint'))
+PARSE_SECONDS = metrics.histogram('scraper_parse_seconds', 'Time spent turning a response into rows',
+                                  ('scraper', 'endpoint'), buckets=PARSE_BUCKETS)
+SLEEP_SECONDS = metrics.counter('scraper_sleep_seconds_total', 'Time spent waiting (pacing, backoff, warm-up dwell)',
+                                ('scraper', 'endpoint', 'reason'))
+
+
+def observe_request(scraper: str, endpoint: str, identity, status, seconds: Optional[float] = None,
+                    nbytes: Optional[int] = None, query_profile: Optional[str] = None) -> None:
+    REQUESTS.inc(scraper=scraper, endpoint=endpoint, identity=identity or 'direct',
+                 status='error' if status is None else status)
+    if seconds is not None:
+        REQUEST_SECONDS.observe(seconds, scraper=scraper, endpoint=endpoint)
+    if nbytes:
+        RESPONSE_BYTES.inc(nbytes, scraper=scraper, endpoint=endpoint)
+        RESPONSE_SIZE.observe(nbytes, scraper=scraper, endpoint=endpoint, query_profile=query_profile or 'default')
+
+
+def observe_parse(scraper: str, endpoint: str, items: int, seconds: float) -> None:
+    ITEMS_PARSED.inc(items, scraper=scraper, endpoint=endpoint)
+    PARSE_SECONDS.observe(seconds, scraper=scraper, endpoint=endpoint)
+
+
+def observe_sleep(scraper: str, endpoint: str, seconds: float, reason: str) -> None:
+    if seconds > 0:
+        SLEEP_SECONDS.inc(seconds, scraper=scraper, endpoint=endpoint, reason=reason)
+
+
+def count_retry(scraper: str, endpoint: str, reason: str) -> None:
+    RETRIES.inc(scraper=scraper, endpoint=endpoint, reason=reason)
+
+
+def count_proxy_switch(scraper: str) -> None:
+    PROXY_SWITCHES.inc(scraper=scraper)
+
+
+def count_playwright_fallback(scraper: str, reason: str) -> None:
+    PLAYWRIGHT_FALLBACKS.inc(scraper=scraper, reason=reason)
+
+
+def sleep(seconds: float, scraper: str, endpoint: str, reason: str) -> None:
+    """time.sleep that is accounted for in the sleep metric."""
+    if seconds > 0:
+        time.sleep(seconds)
+        observe_sleep(scraper, endpoint, seconds, reason)
+
+
+def time_breakdown() -> Dict[str, Dict[str, float]]:
+    """Seconds spent on network, waiting and parsing, per scraper."""
+    scrapers = {key[0] for m in (REQUESTS, SLEEP_SECONDS, ITEMS_PARSED) for key, *_ in m.samples()}
+    return {
+        s: {
+            'network_s': REQUEST_SECONDS.total(scraper=s),
+            'sleep_s': SLEEP_SECONDS.total(scraper=s),
+            'parse_s': PARSE_SECONDS.total(scraper=s),
+            'requests': REQUESTS.total(scraper=s),
+            'items': ITEMS_PARSED.total(scraper=s),
+            'response_bytes': RESPONSE_BYTES.total(scraper=s),
+        }
+        for s in sorted(scrapers)
+    }
+
+
+def response_sizes() -> Dict[Tuple[str, str, str], Tuple[int, float]]:
+    """(responses, mean bytes) per (scraper, endpoint, query profile)."""
+    return {key: (sum(counts), total / sum(counts)) for key, counts, total in RESPONSE_SIZE.samples() if sum(counts)}
+
+
+def print_time_breakdown() -> None:
+    for scraper, t in time_breakdown().items():
+        print(f"[metrics] {scraper}: {int(t['requests'])} requests, {int(t['items'])} items | "
+              f"network {t['network_s']:.1f}s, waiting {t['sleep_s']:.1f}s, parsing {t['parse_s']:.1f}s")
+    for (scraper, endpoint, query_profile), (count, mean) in response_sizes().items():
+        print(f"[metrics] {scraper} {endpoint} [{query_profile}]: {count} responses, {mean / 1024:.1f} KiB/request")
+
+
+def write_run_metrics(scraper: str, directory) -> Optional[Tuple[Path, Path]]:
+    """Write this process's metrics as <directory>/<scraper>_<timestamp>.json/.prom
+    (SCRAPER_METRICS_DIR overrides the directory)."""
+    directory = os.getenv('SCRAPER_METRICS_DIR') or directory
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    try:
+        return metrics.write(Path(directory) / f"{scraper}_{stamp}")
+    except OSError as e:
+        print(f"Could not write metrics: {e}")
+        return None
+
+
+def _limiter_wait(endpoint: str, identity, seconds: float, reason: str) -> None:
+    scraper, _, name = endpoint.partition('.')
+    observe_sleep(scraper, name or endpoint, seconds, reason)
+
+
+rate_limiter.add_observer(_limiter_wait)
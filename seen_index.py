@@ -0,0 +1,149 @@
+"""
+Persistent index of item ids already collected.
+
+The index of one brand is a sorted, de-duplicated int64 array saved as a
+.npy file and opened memory-mapped, so tens of millions of ids cost a few
+hundred MB on disk and almost nothing in RAM; a membership test is a
+vectorized binary search (np.searchsorted) over the mapped pages.
+
+Ids added during a run are kept apart from the on-disk array until
+flush(), which merges them in one sequential pass into a new file that
+replaces the old one atomically. That split is deliberate: contains()
+can answer "was this known before the run?" (delta stopping) or "have
+we seen it at all?", while add() de-duplicates against this run's ids
+only, so items collected by earlier runs are still returned again.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+# Run ids are kept in a set until there are this many, then folded into a sorted array
+_RUN_SET_LIMIT = 100_000
+# Base elements copied per step when merging into the new file
+_MERGE_CHUNK = 1 << 20
+
+
+def _as_ids(ids: Iterable) -> np.ndarray:
+    return np.asarray(ids, dtype=np.int64).ravel()
+
+
+def _sorted_unique(ids: np.ndarray) -> np.ndarray:
+    # np.unique may take a (slower) hashing path for ints; sort + diff is enough here
+    ids = np.sort(ids)
+    if len(ids) > 1:
+        ids = ids[np.concatenate(([True], ids[1:] != ids[:-1]))]
+    return ids
+
+
+def _first_occurrences(ids: np.ndarray) -> np.ndarray:
+    order = np.argsort(ids, kind='stable')
+    ordered = ids[order]
+    first = np.ones(len(ids), dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    mask = np.zeros(len(ids), dtype=bool)
+    mask[order[first]] = True
+    return mask
+
+
+def _in_sorted(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    if not len(sorted_ids) or not len(ids):
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.searchsorted(sorted_ids, ids)
+    pos[pos == len(sorted_ids)] = 0
+    return sorted_ids[pos] == ids
+
+
+class SeenIndex:
+    """Sorted memory-mapped id set plus the ids added since the last flush."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._base = self._open()
+        self._run_sorted = np.empty(0, dtype=np.int64)
+        self._run_set: set = set()
+
+    def _open(self) -> np.ndarray:
+        try:
+            return np.load(self.path, mmap_mode='r')
+        except (FileNotFoundError, ValueError, OSError):
+            return np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        # Run ids may repeat stored ones until flush(), so this is an upper bound
+        return len(self._base) + len(self._run_sorted) + len(self._run_set)
+
+    @property
+    def stored(self) -> int:
+        """Ids on disk (known before this run)."""
+        return len(self._base)
+
+    def contains(self, ids: Iterable, include_run: bool = True) -> np.ndarray:
+        """Boolean mask: which ids are known (on disk, and optionally added this run)."""
+        ids = _as_ids(ids)
+        with self._lock:
+            known = _in_sorted(self._base, ids)
+            if include_run:
+                known |= self._in_run(ids)
+        return known
+
+    def _in_run(self, ids: np.ndarray) -> np.ndarray:
+        known = _in_sorted(self._run_sorted, ids)
+        if self._run_set:
+            known |= np.fromiter((i in self._run_set for i in ids.tolist()), dtype=bool, count=len(ids))
+        return known
+
+    def add(self, ids: Iterable) -> np.ndarray:
+        """Add ids; returns the mask of those not yet added this run (first occurrence only).
+
+        The ids on disk are not consulted: a run re-collects items that
+        earlier runs stored, and flush() skips the ones already in the file.
+        """
+        ids = _as_ids(ids)
+        with self._lock:
+            # Repeats inside the batch count once
+            fresh = ~self._in_run(ids) & _first_occurrences(ids)
+            added = ids[fresh]
+            if len(added) >= _RUN_SET_LIMIT:
+                # Bulk loads skip the set entirely
+                self._fold_run_set(added)
+            else:
+                self._run_set.update(added.tolist())
+                if len(self._run_set) >= _RUN_SET_LIMIT:
+                    self._fold_run_set()
+        return fresh
+
+    def _fold_run_set(self, extra: np.ndarray | None = None) -> None:
+        parts = [self._run_sorted, np.fromiter(self._run_set, dtype=np.int64, count=len(self._run_set))]
+        if extra is not None:
+            parts.append(extra)
+        self._run_sorted = _sorted_unique(np.concatenate(parts))
+        self._run_set.clear()
+
+    def flush(self) -> int:
+        """Merge this run's ids into the file; returns how many were written."""
+        with self._lock:
+            self._fold_run_set()
+            new = self._run_sorted
+            if not len(new):
+                return 0
+            base = self._base
+            new = new[~_in_sorted(base, new)]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.int64, shape=(len(base) + len(new),))
+            # new[k] lands before base[pos[k]]; base[i] shifts by the count of new ids placed before it
+            pos = np.searchsorted(base, new)
+            out[pos + np.arange(len(new))] = new
+            for start in range(0, len(base), _MERGE_CHUNK):
+                idx = np.arange(start, min(start + _MERGE_CHUNK, len(base)))
+                out[idx + np.searchsorted(pos, idx, side='right')] = base[start:start + len(idx)]
+            out.flush()
+            del out
+            os.replace(tmp, self.path)
+            self._base = self._open()
+            self._run_sorted = np.empty(0, dtype=np.int64)
+            return len(new)
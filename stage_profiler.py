@@ -0,0 +1,202 @@
+"""
+Opt-in per-stage profiling of the scraping pipelines.
+
+Named pipeline stages (JSON decode, DataFrame building, accumulation,
+CSV / checkpoint writes, ...) are wrapped with profiler.stage(name). While
+the profiler is off a stage costs one attribute check; once started
+(the CLIs' --profile flag) every stage records:
+
+    calls, wall time, CPU time (thread), net memory allocated and the
+    tracemalloc peak reached inside the stage
+
+and, with cProfile enabled (--cprofile), the whole run is sampled as well.
+finish() prints a per-stage report and writes it as .txt / .json (plus a
+.pstats file for snakeviz / pstats when cProfile ran).
+
+Nested stages are timed independently, so an outer stage's time includes
+its inner stages. Memory peaks are only tracked for outermost stages
+(tracemalloc has a single peak counter); inner stages report net
+allocation only.
+
+tracemalloc counts the whole process, so memory is only measured for
+stage calls on the main thread: the memory columns cover those calls
+only, stages that only ran in worker threads (Vestiaire page pool, Faume
+batch pool) report n/a, and main-thread figures can still include
+allocations made by workers running at the same time.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+_NULL = contextlib.nullcontext()
+
+
+class _StageStats:
+    __slots__ = ('calls', 'mem_calls', 'wall', 'cpu', 'alloc', 'peak')
+
+    def __init__(self):
+        self.calls = 0
+        self.mem_calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc = 0
+        self.peak = 0
+
+
+class StageProfiler:
+    """Per-stage wall / CPU / memory accounting, off by default."""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self._stats: Dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started_at = 0.0
+        self._started_cpu = 0.0
+
+    def start(self, cprofile: bool = False, trace_memory: bool = True) -> None:
+        self._stats.clear()
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started_at = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stage(self, name: str):
+        """Context manager timing one execution of a named stage."""
+        if not self.enabled:
+            return _NULL
+        return self._measure(name)
+
+    def profiled(self, name: str):
+        """Decorator form of stage()."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextlib.contextmanager
+    def _measure(self, name: str):
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        # One process-wide counter: worker threads would count each other's allocations
+        tracing = (self.trace_memory and tracemalloc.is_tracing()
+                   and threading.current_thread() is threading.main_thread())
+        if tracing:
+            if depth == 0:
+                tracemalloc.reset_peak()
+            mem0 = tracemalloc.get_traced_memory()[0]
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.thread_time() - cpu0
+            alloc = peak = 0
+            tracing = tracing and tracemalloc.is_tracing()
+            if tracing:
+                current, peak_now = tracemalloc.get_traced_memory()
+                alloc = current - mem0
+                peak = peak_now - mem0 if depth == 0 else 0
+            self._local.depth = depth
+            with self._lock:
+                stats = self._stats.get(name)
+                if stats is None:
+                    stats = self._stats[name] = _StageStats()
+                stats.calls += 1
+                stats.mem_calls += tracing
+                stats.wall += wall
+                stats.cpu += cpu
+                stats.alloc += alloc
+                stats.peak = max(stats.peak, peak)
+
+    # -- reporting -----------------------------------------------------------
+
+    def summary(self) -> dict:
+        with self._lock:
+            # Memory is None for stages that never ran on the main thread
+            stages = {name: {'calls': s.calls, 'wall_s': s.wall, 'cpu_s': s.cpu,
+                             'alloc_net_mib': s.alloc / 2**20 if s.mem_calls else None,
+                             'peak_mib': s.peak / 2**20 if s.mem_calls else None}
+                      for name, s in self._stats.items()}
+        return {
+            'run_wall_s': time.perf_counter() - self._started_at if self._started_at else 0.0,
+            'run_cpu_s': time.process_time() - self._started_cpu if self._started_at else 0.0,
+            'stages': dict(sorted(stages.items(), key=lambda kv: kv[1]['wall_s'], reverse=True)),
+        }
+
+    def report(self, top: int = 25) -> str:
+        summary = self.summary()
+        run_wall = summary['run_wall_s'] or 1.0
+        lines = [f"Run: {summary['run_wall_s']:.2f}s wall, {summary['run_cpu_s']:.2f}s CPU",
+                 f"{'stage':<28} {'calls':>7} {'wall_s':>9} {'%run':>6} {'cpu_s':>9} {'ms/call':>9} "
+                 f"{'alloc_MiB':>10} {'peak_MiB':>9}"]
+        mib = lambda value, width: f"{'n/a':>{width}}" if value is None else f"{value:>{width}.1f}"
+        for name, s in summary['stages'].items():
+            lines.append(f"{name:<28} {s['calls']:>7} {s['wall_s']:>9.3f} {100 * s['wall_s'] / run_wall:>5.1f}% "
+                         f"{s['cpu_s']:>9.3f} {1000 * s['wall_s'] / max(1, s['calls']):>9.2f} "
+                         f"{mib(s['alloc_net_mib'], 10)} {mib(s['peak_mib'], 9)}")
+        if self._cprofile is not None:
+            out = io.StringIO()
+            pstats.Stats(self._cprofile, stream=out).sort_stats('cumulative').print_stats(top)
+            lines += ['', f"cProfile (top {top} by cumulative time):", out.getvalue()]
+        return '\n'.join(lines)
+
+    def finish(self, directory, name: str) -> Optional[Path]:
+        """Stop profiling, print the report and write it under directory."""
+        if not self.enabled:
+            return None
+        report = self.report()
+        summary = self.summary()
+        self.stop()
+        print(report)
+        prefix = Path(directory) / f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        try:
+            prefix.parent.mkdir(parents=True, exist_ok=True)
+            prefix.with_suffix('.txt').write_text(report + '\n', encoding='utf-8')
+            with open(prefix.with_suffix('.json'), 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            if self._cprofile is not None:
+                self._cprofile.dump_stats(str(prefix.with_suffix('.pstats')))
+        except OSError as e:
+            print(f"Could not write profile report: {e}")
+            return None
+        print(f"Profile report written to {prefix.with_suffix('.txt')}")
+        return prefix.with_suffix('.txt')
+
+
+def add_profile_arguments(parser) -> None:
+    """--profile / --cprofile flags shared by the CLIs."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Time pipeline stages (wall, CPU, memory) and write a report at the end')
+    parser.add_argument('--cprofile', action='store_true', help='With --profile, also sample the run with cProfile')
+
+
+# Process-wide profiler shared by every scraper
+profiler = StageProfiler()
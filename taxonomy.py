@@ -0,0 +1,167 @@
+"""
+Indexed taxonomy lookups.
+
+The scrapers used to filter the whole taxonomy DataFrame with a boolean
+mask for every name lookup, and scan it with iterrows to find resume
+positions. Taxonomy reads each CSV once and precomputes dict indexes:
+
+    id -> name, id -> parent id, id -> descendant leaf ids, row key -> position
+
+Levels are given root to leaf as (id column, name column) pairs, e.g. for
+Vestiaire: universe_id -> parent_cat_id -> category_id -> sub_category_id.
+A flat table can declare a parent id column instead.
+
+The built indexes are pickled next to the CSV (``<name>.csv.idx.pkl``)
+and reused while the CSV's size and mtime are unchanged.
+"""
+import functools
+import math
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+def _norm_id(value):
+    """Normalize ids so 221, 221.0, '221' and '221.0' hit the same key."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str):
+        token = value.strip()
+        try:
+            number = float(token)
+        except ValueError:
+            return token
+        return int(number) if number.is_integer() else number
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _norm_key(value):
+    """Row-key normalization: NaN -> None so empty levels compare equal."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class Taxonomy:
+    """Precomputed indexes over one taxonomy table."""
+
+    def __init__(self, frame: pd.DataFrame, levels: Sequence[Tuple[str, str]],
+                 parent_col: Optional[str] = None, key_columns: Sequence[str] = ()):
+        self.frame = frame.reset_index(drop=True)
+        self.levels = [lvl for lvl in levels if lvl[0] in self.frame.columns]
+        self.level_ids = [id_col for id_col, _ in self.levels]
+        self.leaf_level = self.level_ids[-1]
+        self.key_columns = tuple(c for c in key_columns if c in self.frame.columns)
+        self._names: Dict[str, Dict[Hashable, str]] = {lvl: {} for lvl in self.level_ids}
+        self._parents: Dict[str, Dict[Hashable, Hashable]] = {lvl: {} for lvl in self.level_ids}
+        # Children kept in insertion-ordered dicts (ordered set)
+        self._children: Dict[Tuple[str, Hashable], Dict[Tuple[str, Hashable], None]] = {}
+        self._positions: Dict[tuple, int] = {}
+        self._build(parent_col)
+
+    def _build(self, parent_col: Optional[str]) -> None:
+        columns = {col: self.frame[col].tolist() for col in self.frame.columns}
+        for pos in range(len(self.frame)):
+            parent_node = None
+            for id_col, name_col in self.levels:
+                node_id = _norm_id(columns[id_col][pos])
+                if node_id is None:
+                    continue
+                names = self._names[id_col]
+                if node_id not in names:
+                    names[node_id] = columns[name_col][pos] if name_col in columns else None
+                if parent_node is not None:
+                    self._parents[id_col].setdefault(node_id, parent_node[1])
+                    self._children.setdefault(parent_node, {})[(id_col, node_id)] = None
+                parent_node = (id_col, node_id)
+            if parent_col and parent_col in columns:
+                # Flat table with an explicit parent pointer on the leaf level
+                node_id = _norm_id(columns[self.leaf_level][pos])
+                parent_id = _norm_id(columns[parent_col][pos])
+                if node_id is not None and parent_id is not None:
+                    self._parents[self.leaf_level].setdefault(node_id, parent_id)
+                    self._children.setdefault((self.leaf_level, parent_id), {})[(self.leaf_level, node_id)] = None
+            if self.key_columns:
+                key = tuple(_norm_key(columns[c][pos]) for c in self.key_columns)
+                self._positions.setdefault(key, pos)
+
+    def _level(self, level: Optional[str]) -> str:
+        return level or self.leaf_level
+
+    def name(self, node_id, level: Optional[str] = None):
+        """Name of an id at a level (leaf level by default), or None."""
+        return self._names[self._level(level)].get(_norm_id(node_id))
+
+    def parent(self, node_id, level: Optional[str] = None):
+        """Id of the parent node, or None for roots / unknown ids."""
+        return self._parents[self._level(level)].get(_norm_id(node_id))
+
+    def subtree(self, node_id, level: Optional[str] = None) -> List:
+        """Leaf ids under a node (the node itself when it has no children)."""
+        start = (self._level(level), _norm_id(node_id))
+        leaves, stack, seen = [], [start], set()
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            children = self._children.get(node)
+            if children:
+                stack.extend(reversed(list(children)))
+            elif node[1] in self._names[node[0]]:
+                leaves.append(node[1])
+        return leaves
+
+    def ids(self, level: Optional[str] = None) -> List:
+        """Sorted distinct ids present at a level."""
+        return sorted(self._names[self._level(level)], key=lambda x: (str(type(x)), x))
+
+    def position(self, **keys) -> Optional[int]:
+        """Row position of the first row matching the key columns, or None."""
+        key = tuple(_norm_key(keys.get(c)) for c in self.key_columns)
+        return self._positions.get(key)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+
+def _cache_path(path: Path) -> Path:
+    return path.with_name(path.name + '.idx.pkl')
+
+
+@functools.lru_cache(maxsize=None)
+def load_taxonomy(path, levels: Tuple[Tuple[str, str], ...], parent_col: Optional[str] = None,
+                  key_columns: Tuple[str, ...] = ()) -> Taxonomy:
+    """Load a taxonomy once per process, reusing the pickled index when fresh."""
+    path = Path(path)
+    stat = os.stat(path)
+    signature = (CACHE_VERSION, stat.st_size, stat.st_mtime_ns, levels, parent_col, key_columns)
+    cache = _cache_path(path)
+    try:
+        with open(cache, 'rb') as f:
+            cached_signature, taxonomy = pickle.load(f)
+        if cached_signature == signature:
+            return taxonomy
+    except Exception:
+        pass
+    taxonomy = Taxonomy(pd.read_csv(path), levels, parent_col=parent_col, key_columns=key_columns)
+    try:
+        tmp = cache.with_name(cache.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump((signature, taxonomy), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except OSError:
+        pass
+    return taxonomy
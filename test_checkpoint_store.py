@@ -0,0 +1,48 @@
+import pandas as pd
+
+try:
+    from scrapers.checkpoint_store import CheckpointStore
+except ImportError:
+    from checkpoint_store import CheckpointStore
+
+
+def test_replay_returns_segments_in_write_order(tmp_path):
+    store = CheckpointStore(tmp_path / 'ckpt')
+    store.append(pd.DataFrame({'id': [1, 2]}), category_id=10, page_nb=1)
+    store.append(pd.DataFrame(), category_id=10, page_nb=2)
+    store.append(pd.DataFrame({'id': [3]}), category_id=11, page_nb=1)
+
+    # A fresh store reads everything back from the manifest
+    replayed = list(CheckpointStore(tmp_path / 'ckpt').replay())
+    assert [(e['category_id'], e['page_nb'], e['rows']) for e, _ in replayed] == [(10, 1, 2), (10, 2, 0), (11, 1, 1)]
+    assert [df['id'].tolist() if len(df) else [] for _, df in replayed] == [[1, 2], [], [3]]
+    assert CheckpointStore(tmp_path / 'ckpt').load()['id'].tolist() == [1, 2, 3]
+
+
+def test_replay_skips_torn_lines_and_missing_segments(tmp_path):
+    store = CheckpointStore(tmp_path / 'ckpt')
+    store.append(pd.DataFrame({'id': [1]}), page_nb=1)
+    second = store.append(pd.DataFrame({'id': [2]}), page_nb=2)
+    store.append(pd.DataFrame({'id': [3]}), page_nb=3)
+    (tmp_path / 'ckpt' / second['segment']).unlink()
+    with open(store.manifest_path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 4, "segm')
+
+    resumed = CheckpointStore(tmp_path / 'ckpt')
+    assert [e['page_nb'] for e in resumed.entries()] == [1, 3]
+    assert resumed.load()['id'].tolist() == [1, 3]
+    # The next segment continues after the last readable one
+    assert resumed.append(pd.DataFrame({'id': [4]}), page_nb=4)['seq'] == 4
+
+
+def test_start_fresh_and_clear(tmp_path):
+    store = CheckpointStore(tmp_path / 'ckpt')
+    store.append(pd.DataFrame({'id': [1]}), page_nb=1)
+    store.start_fresh()
+    assert len(store) == 0
+    assert len(list(tmp_path.glob('ckpt.*'))) == 1
+
+    store.append(pd.DataFrame({'id': [2]}), page_nb=1)
+    store.clear()
+    assert not (tmp_path / 'ckpt').exists()
+    assert store.load().empty
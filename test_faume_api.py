@@ -0,0 +1,57 @@
+import threading
+
+import requests
+
+try:
+    from scrapers import faume_api
+except ImportError:
+    import faume_api
+
+
+def fake_catalog(monkeypatch, total, fail_at=None, hold_from=None, release=None):
+    """Patch the Faume API with a catalog of `total` documents; returns the offsets fetched.
+
+    Batches from offset hold_from on wait for the `release` event.
+    """
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(url, headers, api_key, domain, query_profile=None):
+        offset, limit = url
+        with lock:
+            fetched.append(offset)
+        if hold_from is not None and offset >= hold_from:
+            release.wait(5)
+        if offset == fail_at:
+            raise requests.ConnectionError('boom')
+        return [{'offset': offset + i} for i in range(min(limit, total - offset))], total
+
+    monkeypatch.setattr(faume_api, 'faume_brand', lambda name: {'id': 1, 'domain': 'example.com'})
+    monkeypatch.setattr(faume_api, 'count_product_sheets', lambda api_key, brand_name: total)
+    monkeypatch.setattr(faume_api, 'documents_url', lambda brand_id, limit, offset, query_profile=None: (offset, limit))
+    monkeypatch.setattr(faume_api, 'fetch_documents_batch', fetch)
+    return fetched
+
+
+def test_window_streams_every_document_in_offset_order(monkeypatch):
+    fetched = fake_catalog(monkeypatch, total=1050)
+    docs = list(faume_api.iter_product_sheets('key', 'balzac', limit=100, concurrency=4))
+    assert [d['offset'] for d in docs] == list(range(1050))
+    assert sorted(fetched) == list(range(0, 1100, 100))
+
+
+def test_stopping_early_cancels_queued_batches(monkeypatch):
+    release = threading.Event()
+    fetched = fake_catalog(monkeypatch, total=100_000, hold_from=200, release=release)
+    stream = faume_api.iter_product_sheets('key', 'balzac', limit=100, concurrency=4)
+    assert [next(stream)['offset'] for _ in range(150)] == list(range(150))
+    # The window holds offsets 200-800: four running (held), three queued
+    threading.Timer(0.2, release.set).start()
+    stream.close()
+    assert sorted(fetched) == [0, 100, 200, 300, 400, 500]
+
+
+def test_failed_batch_ends_the_stream(monkeypatch):
+    fake_catalog(monkeypatch, total=100_000, fail_at=300)
+    docs = list(faume_api.iter_product_sheets('key', 'balzac', limit=100, concurrency=4))
+    assert [d['offset'] for d in docs] == list(range(300))
@@ -0,0 +1,77 @@
+import pytest
+
+try:
+    from scrapers.rate_limiter import AdaptiveRateLimiter, LimitConfig, parse_retry_after
+except ImportError:
+    from rate_limiter import AdaptiveRateLimiter, LimitConfig, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(**params):
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(LimitConfig(jitter=0.0, **params), clock=clock)
+    return limiter, clock
+
+
+def test_bucket_refills_at_the_current_rate():
+    limiter, clock = make_limiter(rate=2.0, burst=2.0)
+    assert limiter.reserve('ep') == 0
+    assert limiter.reserve('ep') == 0
+    # Burst spent: the next slot is 1/rate away
+    assert limiter.reserve('ep') == pytest.approx(0.5)
+    clock.now = 2.0
+    # Refill is capped at the burst
+    assert limiter.reserve('ep') == 0
+    assert limiter.reserve('ep') == 0
+    assert limiter.reserve('ep') == pytest.approx(0.5)
+
+
+def test_success_raises_rate_additively_up_to_max():
+    limiter, _ = make_limiter(rate=1.0, increase=0.5, max_rate=2.0)
+    limiter.on_success('ep')
+    assert limiter.state('ep')['rate'] == pytest.approx(1.5)
+    limiter.on_success('ep')
+    limiter.on_success('ep')
+    assert limiter.state('ep')['rate'] == pytest.approx(2.0)
+
+
+def test_throttle_halves_rate_and_doubles_cooldown():
+    limiter, clock = make_limiter(rate=4.0, decrease=0.5, min_rate=1.0, cooldown=5.0)
+    assert limiter.on_throttle('ep') == pytest.approx(5.0)
+    assert limiter.state('ep')['rate'] == pytest.approx(2.0)
+    assert limiter.reserve('ep') == pytest.approx(5.0)
+    assert limiter.on_throttle('ep') == pytest.approx(10.0)
+    limiter.on_throttle('ep')
+    assert limiter.state('ep')['rate'] == pytest.approx(1.0)
+    # A success resets the cooldown doubling
+    clock.now = 100.0
+    limiter.on_success('ep')
+    assert limiter.on_throttle('ep') == pytest.approx(5.0)
+
+
+def test_errors_back_off_without_touching_the_rate():
+    limiter, clock = make_limiter(rate=3.0, error_backoff=2.0, max_cooldown=5.0)
+    assert limiter.on_error('ep') == pytest.approx(2.0)
+    assert limiter.on_error('ep') == pytest.approx(4.0)
+    assert limiter.on_error('ep') == pytest.approx(5.0)
+    assert limiter.state('ep')['rate'] == pytest.approx(3.0)
+    assert limiter.state('ep')['blocked_for'] == pytest.approx(5.0)
+    clock.now = 5.0
+    assert limiter.state('ep')['blocked_for'] == 0
+
+
+def test_feedback_uses_retry_after_and_keys_are_independent():
+    limiter, _ = make_limiter(rate=1.0, cooldown=5.0)
+    limiter.feedback('ep', 'proxy-a', 429, {'Retry-After': '30'})
+    assert limiter.state('ep', 'proxy-a')['blocked_for'] == pytest.approx(30.0)
+    assert limiter.state('ep', 'proxy-b')['blocked_for'] == 0
+    assert limiter.state('ep', 'proxy-a')['throttled'] == 1
+    assert parse_retry_after('Thu, 01 Jan 1970 00:01:00 GMT', now=0) == pytest.approx(60.0)
+    assert parse_retry_after('soon') is None
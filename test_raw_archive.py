@@ -0,0 +1,44 @@
+import gzip
+import time
+
+try:
+    from scrapers.raw_archive import RawArchive
+except ImportError:
+    from raw_archive import RawArchive
+
+
+def test_records_read_back_as_written(tmp_path):
+    archive = RawArchive(tmp_path, codec='gzip')
+    pages = [b'{"items": [1, 2]}', b'{"items":\n[3]}', b'{"items": []}']
+    refs = [archive.append(raw, 53, 1000, page_nb=i + 1) for i, raw in enumerate(pages)]
+    archive.append(b'{"other": true}', 53, 2000, page_nb=1)
+
+    # Line breaks become spaces so each response stays on one line
+    expected = [b'{"items": [1, 2]}', b'{"items": [3]}', b'{"items": []}']
+    assert [archive.read(ref) for ref in refs] == expected
+    # A second reader finds the same records through the index files
+    reader = RawArchive(tmp_path, codec='gzip')
+    assert [(ref.page_nb, raw) for ref, raw in reader.records(53, 1000)] == list(zip([1, 2, 3], expected))
+    assert len(list(reader.records(53))) == 4
+    # Segments stay plain .jsonl.gz files
+    assert gzip.decompress(refs[0].segment.read_bytes()).splitlines() == expected
+
+
+def test_segments_roll_over_and_torn_index_entries_are_ignored(tmp_path):
+    archive = RawArchive(tmp_path, codec='gzip', max_segment_bytes=1)
+    ts = time.time()
+    refs = [archive.append(f'{{"page": {i}}}'.encode(), 53, 1000, page_nb=i, ts=ts) for i in range(3)]
+    assert len({ref.segment for ref in refs}) == 3
+
+    index = refs[-1].segment.with_name(refs[-1].segment.name.split('.')[0] + '.idx')
+    with open(index, 'ab') as f:
+        f.write(b'\x00' * 5)
+    assert [raw for _, raw in RawArchive(tmp_path).records(53, 1000)] == [b'{"page": 0}', b'{"page": 1}', b'{"page": 2}']
+
+
+def test_retention_drops_old_days(tmp_path):
+    archive = RawArchive(tmp_path, codec='gzip')
+    archive.append(b'{}', 53, 1000, ts=time.time() - 10 * 86400)
+    archive.append(b'{}', 53, 1000)
+    assert archive.apply_retention(3) == 1
+    assert len(archive.segments()) == 1
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from scrapers.seen_index import SeenIndex
+    from scrapers.vinted_scraper import CategoryDeltaState
+except ImportError:
+    from seen_index import SeenIndex
+    from vinted_scraper import CategoryDeltaState
+
+
+def test_add_dedups_within_run_only(tmp_path):
+    path = tmp_path / 'brand.npy'
+    first = SeenIndex(path)
+    assert first.add([1, 2, 3, 2]).tolist() == [True, True, True, False]
+    assert first.flush() == 3
+
+    second = SeenIndex(path)
+    # Ids stored by the first run are collected again, repeats within this run are not
+    assert second.add([1, 2, 3, 4, 5]).all()
+    assert not second.add([3, 5]).any()
+    assert second.contains([1, 4], include_run=False).tolist() == [True, False]
+    assert second.flush() == 2
+    assert np.load(path).tolist() == [1, 2, 3, 4, 5]
+
+
+def test_full_run_keeps_items_from_earlier_runs(tmp_path):
+    path = tmp_path / 'brand.npy'
+    first = CategoryDeltaState(53, 1000, mode='full', seen=SeenIndex(path))
+    first.new_rows(pd.DataFrame({'id': [1, 2, 3]}))
+    first.seen.flush()
+
+    second = CategoryDeltaState(53, 1000, mode='full', seen=SeenIndex(path))
+    page = pd.DataFrame({'id': [1, 2, 3, 4, 5]})
+    assert second.new_rows(page)['id'].tolist() == [1, 2, 3, 4, 5]
+    assert second.new_rows(page).empty
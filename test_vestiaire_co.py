@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+try:
+    from scrapers.vestiaire_co import _FlattenPlan, _ShapeMismatch, _flatten_record, _pack_partition_values, flatten_json_to_df, vc_id
+except ImportError:
+    from vestiaire_co import _FlattenPlan, _ShapeMismatch, _flatten_record, _pack_partition_values, flatten_json_to_df, vc_id
+
+
+ITEM = {
+    'id': '1',
+    'price': {'cents': 12000, 'currency': 'EUR'},
+    'brand': {'id': 5439, 'name': 'Balzac'},
+    'colors': {'all': [{'name': 'black'}, {'name': 'white'}]},
+    'size': [{'label': 'M'}],
+    'pictures': ['a.jpg', 'b.jpg'],
+    'tags': [],
+    'sold': False,
+}
+
+
+def plan_row(record):
+    plan = _FlattenPlan(ITEM)
+    return dict(zip(plan.columns, plan.extract(record)))
+
+
+@pytest.mark.parametrize('record', [
+    ITEM,
+    {**ITEM, 'pictures': ['c.jpg'], 'tags': [3, 4], 'sold': None},
+    {**ITEM, 'brand': {'id': 1, 'name': None}},
+])
+def test_plan_matches_generic_flatten(record):
+    assert plan_row(record) == _flatten_record(record)
+    assert tuple(_flatten_record(record)) == _FlattenPlan(ITEM).columns
+
+
+@pytest.mark.parametrize('record', [
+    # missing top-level and nested fields
+    {k: v for k, v in ITEM.items() if k != 'sold'},
+    {**ITEM, 'brand': {'id': 5439}},
+    # nested object replaced by a value, value replaced by an object
+    {**ITEM, 'price': 12000},
+    {**ITEM, 'sold': {'at': 'today'}},
+    # list of objects with another length, list of values replaced by objects
+    {**ITEM, 'colors': {'all': [{'name': 'black'}]}},
+    {**ITEM, 'pictures': [{'url': 'a.jpg'}]},
+    # extra field
+    {**ITEM, 'extra': 1},
+])
+def test_plan_rejects_other_shapes(record):
+    with pytest.raises((_ShapeMismatch, KeyError)):
+        plan_row(record)
+
+
+def test_flatten_json_to_df_matches_generic_path_on_mixed_shapes():
+    records = [
+        ITEM,
+        {**ITEM, 'id': '2', 'pictures': []},
+        {k: v for k, v in ITEM.items() if k not in ('brand', 'tags')},
+        {**ITEM, 'id': '4', 'colors': {'all': [{'name': 'red'}]}, 'extra': 'x'},
+        ITEM,
+    ]
+    expected = pd.DataFrame([_flatten_record(r) for r in records])
+    df = flatten_json_to_df(records)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_pack_partition_values_first_fit_decreasing():
+    entries = [('a', 500), ('b', 9000), ('c', 3000), ('e', 6000), ('f', 1000), ('g', 10000)]
+    bins = _pack_partition_values(entries, 10000)
+    assert bins == [[['g'], 10000], [['b', 'f'], 10000], [['e', 'c', 'a'], 9500]]
+    # Every value lands in exactly one group, and no group goes over the cap
+    assert sorted(v for values, _ in bins for v in values) == sorted(v for v, _ in entries)
+    assert all(count == sum(dict(entries)[v] for v in values) <= 10000 for values, count in bins)
+    assert _pack_partition_values([], 10000) == []
+
+
+def test_vc_id_normalises_float_ids():
+    assert [vc_id(v) for v in (1234, 1234.0, '1234', '1234.0')] == ['1234'] * 4
@@ -0,0 +1,79 @@
+import json
+
+try:
+    from scrapers import vinted_scraper
+    from scrapers.vinted_scraper import VINTED_PAGE_CAP, VINTED_STATUS_IDS, split_vinted_shard, vinted_shard_checkpoint
+except ImportError:
+    import vinted_scraper
+    from vinted_scraper import VINTED_PAGE_CAP, VINTED_STATUS_IDS, split_vinted_shard, vinted_shard_checkpoint
+
+
+def test_split_bisects_price_on_cent_boundaries():
+    low, high = split_vinted_shard({'price_from': 10, 'price_to': 15.05})[0]
+    assert (low['price_from'], low['price_to']) == (10, 12.53)
+    assert (high['price_from'], high['price_to']) == (12.54, 15.05)
+
+    # Wide ranges are split in log space, the open top end is kept open
+    low, high = split_vinted_shard({'price_from': 0, 'price_to': None, 'status_ids': 6})[0]
+    assert (low['price_from'], low['price_to'], high['price_to']) == (0, 100.0, None)
+    assert high['price_from'] == 100.01
+    assert low['status_ids'] == high['status_ids'] == 6
+
+
+def test_split_falls_back_to_status_then_stops():
+    children, exhaustive = split_vinted_shard({'price_from': 9.99, 'price_to': 9.99})
+    assert exhaustive
+    assert [c['status_ids'] for c in children] == list(VINTED_STATUS_IDS)
+    assert all(c['price_from'] == c['price_to'] == 9.99 for c in children)
+    assert split_vinted_shard(children[0]) == ([], False)
+
+
+def test_plan_covers_every_item_under_the_cap(monkeypatch):
+    per_page = 10
+    cap = VINTED_PAGE_CAP * per_page
+    # 60 listings at each price from 1.00 to 2.00, and 300 at 5.00 spread over the statuses
+    items = [(round(1 + i / 100, 2), 6) for i in range(101) for _ in range(60)]
+    items += [(5.0, status) for status in VINTED_STATUS_IDS for _ in range(60)]
+
+    def covers(shard, price, status):
+        hi = shard.get('price_to')
+        return (shard['price_from'] <= price and (hi is None or price <= hi)
+                and shard.get('status_ids', status) == status)
+
+    def count(brand_id, cat_id, session, order=None, shard=None):
+        return sum(1 for price, status in items if covers(shard, price, status))
+
+    monkeypatch.setattr(vinted_scraper, 'vinted_category_count', count)
+    shards = vinted_scraper.plan_vinted_shards(53, 1000, None, total=len(items), per_page=per_page)
+    assert sum(n for _, n in shards) == len(items)
+    assert all(0 < n <= cap for _, n in shards)
+    assert [n for _, n in shards] == [count(53, 1000, None, shard=s) for s, _ in shards]
+    # Every listing falls in exactly one shard
+    assert all(sum(covers(s, *item) for s, _ in shards) == 1 for item in set(items))
+    # Shards are listed in price order
+    assert [s['price_from'] for s, _ in shards] == sorted(s['price_from'] for s, _ in shards)
+
+
+def test_shard_checkpoint_resumes_after_the_last_saved_page():
+    plan = [[{'price_from': 0, 'price_to': 50.0}, 900], [{'price_from': 50.01, 'price_to': None}, 400]]
+    entries = [
+        {'category_id': 7, 'page_nb': 1},
+        {'category_id': 8, 'page_nb': 1, 'saturated_total': 1300},
+        {'category_id': 8, 'page_nb': 0, 'shard_plan': plan},
+        {'category_id': 8, 'page_nb': 1, 'shard': plan[0][0]},
+        {'category_id': 8, 'page_nb': 1, 'shard': plan[1][0]},
+        {'category_id': 8, 'page_nb': 2, 'shard': plan[1][0]},
+    ]
+    # Entries come back from the JSONL manifest
+    entries = json.loads(json.dumps(entries))
+    assert vinted_shard_checkpoint(entries, 7) is None
+    assert vinted_shard_checkpoint(entries[:2], 8) == {'total': 1300, 'plan': None, 'next': (0, 1)}
+    state = vinted_shard_checkpoint(entries, 8)
+    assert state['plan'] == [tuple(p) for p in plan]
+    assert state['next'] == (1, 3)
+
+
+def test_unsplittable_shards_are_kept(monkeypatch):
+    monkeypatch.setattr(vinted_scraper, 'split_vinted_shard', lambda s: ([], False))
+    monkeypatch.setattr(vinted_scraper, 'vinted_category_count', lambda *a, **k: 5000)
+    assert vinted_scraper.plan_vinted_shards(53, 1000, None, per_page=10) == [({'price_from': 0, 'price_to': None}, 5000)]
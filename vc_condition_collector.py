@@ -1,34 +1,26 @@
 
+import argparse
 import pandas as pd
-from selenium import webdriver
-from bs4 import BeautifulSoup
-from urllib import request
 import time
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.select import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
 import random
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, ElementNotInteractableException, ElementClickInterceptedException, WebDriverException
-from selenium.webdriver.common.keys import Keys
-from  datetime import datetime
-import progressbar
 from datetime import datetime
-import timeit
 import asyncio
 import numpy as np
 import re
-import psutil
-from urllib3.exceptions import MaxRetryError
-import requests
-
 import os
-from google.cloud import bigquery
-from google.oauth2 import service_account
-from google.api_core.exceptions import NotFound, Conflict
+
+try:
+    from scrapers.stage_profiler import profiler, add_profile_arguments
+except ImportError:
+    from stage_profiler import profiler, add_profile_arguments
+
+# selenium and bs4 are imported inside driver_setup / parser so importing this
+# module (or spawning workers that import it) stays cheap.
 
 def driver_setup():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
     try:
         s = Service("/Users/julespastor/Desktop/chromedriver")
         options = Options()
@@ -142,14 +134,16 @@ async def condition_getter(urls):
 
     all_pages = ha + hb + hc #+ hd
     
-    for page in all_pages:
-        conditions.append(parser(page))
+    with profiler.stage('condition_parse'):
+        for page in all_pages:
+            conditions.append(parser(page))
         
         
     return conditions
 
 
 def parser(html):
+    from bs4 import BeautifulSoup
     try:
         #return listing_name, description, color, condition, size, location, availability, price, currency photo links
         soup = BeautifulSoup(html, 'html.parser')
@@ -193,7 +187,13 @@ async def macro_cond_collector(path):
     
     
 if __name__ == '__main__': 
+    arg_parser = argparse.ArgumentParser(description='Vestiaire condition collector')
+    add_profile_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    if args.profile:
+        profiler.start(cprofile=args.cprofile)
     asyncio.run(macro_cond_collector('../data/vc_tests/isabel-marant.csv'))
+    profiler.finish('../data/logs/vestiaire/profile', 'vc_conditions')
     #driver = driver_setup()
     #html = asyncio.run(get_page(driver, 'https://www.vestiairecollective.com/women-clothing/coats/other-stories/black-wool-other-stories-coat-57334896.shtml'))
     #print(html)
\ No newline at end of file
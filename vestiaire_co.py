@@ -13,9 +13,178 @@ import random
 import string
 import os
 import glob
+import argparse
+import atexit
+import threading
+import http.cookiejar
+from concurrent.futures import ThreadPoolExecutor
 
-vc_taxo = pd.read_csv('../data/vestiaire_taxonomy.csv')
-macro_vc_taxo = pd.read_csv('../data/macro_vestiaire_taxonomy.csv')
+try:
+    from scrapers.result_accumulator import ResultAccumulator
+    from scrapers.checkpoint_store import CheckpointStore
+    from scrapers.taxonomy import _norm_id, load_taxonomy
+    from scrapers.rate_limiter import rate_limiter
+    from scrapers.scraper_metrics import (
+        observe_request, observe_parse, count_retry, print_time_breakdown, write_run_metrics)
+    from scrapers.stage_profiler import profiler, add_profile_arguments
+except ImportError:
+    from result_accumulator import ResultAccumulator
+    from checkpoint_store import CheckpointStore
+    from taxonomy import _norm_id, load_taxonomy
+    from rate_limiter import rate_limiter
+    from scraper_metrics import (
+        observe_request, observe_parse, count_retry, print_time_breakdown, write_run_metrics)
+    from stage_profiler import profiler, add_profile_arguments
+
+# Root-to-leaf levels and the row key used to resume taxonomy runs
+VC_TAXONOMY_LEVELS = (
+    ('universe_id', 'universe'),
+    ('parent_cat_id', 'parent_cat'),
+    ('category_id', 'category'),
+    ('sub_category_id', 'sub_category'),
+)
+VC_TAXONOMY_KEY = ('universe', 'parent_cat', 'category', 'sub_category')
+
+VC_TAXONOMY_PATH = '../data/vestiaire_taxonomy.csv'
+MACRO_VC_TAXONOMY_PATH = '../data/macro_vestiaire_taxonomy.csv'
+
+def get_vc_taxonomy(macro: bool = False):
+    """Indexed Vestiaire taxonomy (full or macro), loaded on first use."""
+    path = MACRO_VC_TAXONOMY_PATH if macro else VC_TAXONOMY_PATH
+    return load_taxonomy(path, VC_TAXONOMY_LEVELS, key_columns=VC_TAXONOMY_KEY)
+
+def __getattr__(name):
+    # Lazy module attributes kept for callers that read them directly
+    if name == 'vc_taxonomy':
+        return get_vc_taxonomy()
+    if name == 'macro_vc_taxonomy':
+        return get_vc_taxonomy(macro=True)
+    if name == 'vc_taxo':
+        return get_vc_taxonomy().frame
+    if name == 'macro_vc_taxo':
+        return get_vc_taxonomy(macro=True).frame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Full URL of the product search endpoint (listings, counts and facets)
+VC_SEARCH_URL = os.getenv('VESTIAIRE_SEARCH_URL', 'https://search.vestiairecollective.com/v1/product/search')
+
+# Shared limiter key for the product search API (no proxies: one identity)
+VC_SEARCH_ENDPOINT = 'vestiaire.search'
+rate_limiter.configure(VC_SEARCH_ENDPOINT, rate=0.5, burst=1, max_rate=4.0, increase=0.25, cooldown=30.0)
+# Pages of one category fetched in parallel; the limiter above still sets the pace
+VC_PAGE_CONCURRENCY = int(os.getenv('VESTIAIRE_PAGE_CONCURRENCY', '4'))
+VC_REQUEST_TIMEOUT = 30
+
+VC_PAGE_SIZE = 60
+VC_ITEM_FIELDS = ["name", "condition", "description", "brand", "model", "country", "price", "discount", "link", "sold", "likes", "editorPicks", "shouldBeGone", "seller", "directShipping", "local", "pictures", "colors", "size", "stock", "universeId", "createdAt"]
+# Listing columns used downstream; drops descriptions, pictures and UI flags
+VC_LEAN_ITEM_FIELDS = ["name", "condition", "brand", "model", "price", "discount", "link", "sold", "seller", "colors", "size", "stock", "universeId", "createdAt"]
+VC_FACET_FIELDS = ["brand", "universe", "country", "stock", "color", "categoryLvl0", "priceRange", "price", "condition", "region", "editorPicks", "watchMechanism", "discount", "sold", "directShippingEligible", "directShippingCountries", "localCountries", "sellerBadge", "isOfficialStore", "materialLvl0", "size0", "size1", "size2", "size3", "size4", "size5", "size6", "size7", "size8", "size9", "size10", "size11", "size12", "size13", "size14", "size15", "size16", "size17", "size18", "size19", "size20", "size21", "size22", "size23", "model", "categoryLvl1", "categoryLvl2", "dealEligible"]
+
+# What a search request asks for. Facets are only read on page 0 (the item
+# count), so later pages never request them whatever the profile.
+VC_QUERY_PROFILES = {
+    'count-only': {'fields': ["price"], 'limit': 1, 'facets': ["brand"], 'stats': []},
+    'listing-lean': {'fields': VC_LEAN_ITEM_FIELDS, 'limit': VC_PAGE_SIZE, 'facets': ["brand"], 'stats': []},
+    'full': {'fields': VC_ITEM_FIELDS, 'limit': VC_PAGE_SIZE, 'facets': VC_FACET_FIELDS, 'stats': ["price"]},
+}
+VC_QUERY_PROFILE = os.getenv('VESTIAIRE_QUERY_PROFILE', 'full')
+
+# Deepest result one search serves: 19 pages of 60, whatever the item count
+VC_MAX_PAGES = 19
+VC_RESULT_CAP = VC_PAGE_SIZE * VC_MAX_PAGES
+# Facets an over-cap search is split on, preferred first; a value becomes a '<facet>.id' filter
+VC_SIZE_FACETS = [f"size{k}" for k in range(24)]
+VC_PARTITION_DIMENSIONS = (
+    ('categoryLvl0', ["categoryLvl0"]),
+    ('categoryLvl1', ["categoryLvl1"]),
+    ('categoryLvl2', ["categoryLvl2"]),
+    ('priceRange', ["priceRange"]),
+    ('condition', ["condition"]),
+    ('size', VC_SIZE_FACETS),
+)
+
+def vc_query_profile(name=None):
+    """Settings of a named query profile (VESTIAIRE_QUERY_PROFILE by default)."""
+    name = name or VC_QUERY_PROFILE
+    if name not in VC_QUERY_PROFILES:
+        raise ValueError(f"Unknown query profile {name!r}; choose from {list(VC_QUERY_PROFILES)}")
+    return VC_QUERY_PROFILES[name]
+
+def vc_profile_label(name, facets):
+    """Metrics label: the profile, marked when the request also carries facet counts."""
+    name = name or VC_QUERY_PROFILE
+    return f"{name}+facets" if facets else name
+
+def vc_search_payload(filters, page_nb, query_profile=None, sort_by="relevance", country="FR", facets=None):
+    """
+    Search request body for one page under a query profile. `facets`
+    replaces the profile's facet fields on page 0 ([] for none).
+    """
+    profile = vc_query_profile(query_profile)
+    first_page = page_nb == 0
+    return {
+        "pagination": {
+            "offset": VC_PAGE_SIZE*page_nb,
+            "limit": profile['limit']
+        },
+        "fields": profile['fields'],
+        "facets": {
+            "fields": (profile['facets'] if facets is None else facets) if first_page else [],
+            "stats": profile['stats'] if first_page and facets is None else []
+        },
+        "q": None,
+        "sortBy": sort_by,
+        "filters": filters,
+        "locale": {
+            "country": country,
+            "currency": "EUR",
+            "language": "fr",
+            "sizeType": "FR"
+        },
+        "mySizes": None,
+        "options": {
+            "innerFeedContext": "genericPLP",
+            "disableHierarchicalParentFiltering": True
+        },
+        "recentlyViewedProductIDs": []
+    }
+
+def vc_item_count(filters, query_profile='count-only'):
+    """Number of items matching `filters`, from the page-0 brand facet (0 for an empty search)."""
+    payload = vc_search_payload(filters, 0, query_profile)
+    response = make_request_with_retry(VC_SEARCH_URL, payload, "https://fr.vestiairecollective.com/",
+                                       query_profile=vc_profile_label(query_profile, False))
+    if response is None or response.status_code != 200:
+        return None
+    try:
+        with profiler.stage('json_decode'):
+            brand = response.json()['facets']['fields'].get('brand') or []
+        return brand[0]['count'] if brand else 0
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+def vc_facet_counts(filters, facets):
+    """
+    Item count of `filters` and {facet: {value: count}} for each requested
+    facet, from one count-only request. Returns (None, {}) on failure.
+    An empty search has no brand facet value and counts as 0.
+    """
+    payload = vc_search_payload(filters, 0, 'count-only', facets=["brand", *facets])
+    response = make_request_with_retry(VC_SEARCH_URL, payload, "https://fr.vestiairecollective.com/",
+                                       query_profile=vc_profile_label('count-only', bool(facets)))
+    if response is None or response.status_code != 200:
+        return None, {}
+    try:
+        with profiler.stage('json_decode'):
+            fields = response.json()['facets']['fields']
+        brand = fields.get('brand') or []
+        total = brand[0]['count'] if brand else 0
+        counts = {facet: {str(entry['value']): entry['count'] for entry in fields.get(facet) or []}
+                  for facet in facets}
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None, {}
+    return total, counts
 
 def generate_dynamic_headers():
     """
@@ -67,33 +236,73 @@ def generate_dynamic_headers():
     
     return headers
 
-def make_request_with_retry(url, payload, referer, max_retries=3):
+# One keep-alive connection pool shared by every search request (and page
+# thread). Identity headers still rotate per request: the pool keeps no
+# cookies, so nothing carries over from one identity to the next.
+_vc_session = None
+_vc_session_lock = threading.Lock()
+
+def get_vc_session():
+    global _vc_session
+    with _vc_session_lock:
+        if _vc_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=max(4, 2 * VC_PAGE_CONCURRENCY))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            _vc_session = session
+        return _vc_session
+
+def close_vc_session():
+    global _vc_session
+    with _vc_session_lock:
+        session, _vc_session = _vc_session, None
+    if session is not None:
+        session.close()
+
+atexit.register(close_vc_session)
+
+def vc_should_retry(status):
+    # Client errors other than throttling / blocking will not change with a new attempt
+    return not (400 <= status < 500) or status in (403, 429)
+
+def make_request_with_retry(url, payload, referer, max_retries=3, query_profile=None):
     """
-    Make a request with retry mechanism and fresh headers for each attempt
+    Make a request with retry mechanism and fresh headers for each attempt.
+    Requests go through the pooled keep-alive session. The first attempt is
+    sent as soon as the shared rate limiter allows; backoff between attempts
+    (Retry-After aware) also comes from the limiter.
     """
+    response = None
     for attempt in range(max_retries):
         try:
             # Generate fresh headers for each attempt
             headers = generate_dynamic_headers()
             headers["referer"] = referer
             
-            # Add a small delay to avoid rate limiting
-            time.sleep(random.uniform(1, 3))
-            
-            response = requests.request("POST", url, json=payload, headers=headers)
+            rate_limiter.acquire(VC_SEARCH_ENDPOINT)
+            started = time.perf_counter()
+            response = get_vc_session().post(url, json=payload, headers=headers, timeout=VC_REQUEST_TIMEOUT)
+            rate_limiter.feedback(VC_SEARCH_ENDPOINT, None, response.status_code, response.headers)
+            observe_request('vestiaire', 'search', None, response.status_code,
+                            time.perf_counter() - started, len(response.content or b''), query_profile=query_profile)
             
             # Check if response is successful
             if response.status_code == 200:
                 return response
-            
-            # If not successful, wait longer before retry
-            if attempt < max_retries - 1:
-                time.sleep(random.uniform(5, 10))
+            if not vc_should_retry(response.status_code):
+                print(f"HTTP {response.status_code} from search, not retrying")
+                return response
+            reason = f"status_{response.status_code}"
                 
         except Exception as e:
+            rate_limiter.on_error(VC_SEARCH_ENDPOINT)
+            observe_request('vestiaire', 'search', None, None)
             print(f"Attempt {attempt + 1} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(random.uniform(5, 10))
+            reason = 'transport'
+        if attempt < max_retries - 1:
+            count_retry('vestiaire', 'search', reason)
     
     # If all retries failed, return the last response
     return response
@@ -118,96 +327,223 @@ def test_dynamic_headers():
     print("Dynamic headers test completed successfully!")
 
 def sub_cat_name_finder(cat_id):
-    try:
-        cat_name = vc_taxo[vc_taxo['sub_category_id']==cat_id]['sub_category'].to_list()[0]
-    except: 
-        cat_name = None
-    return cat_name
+    return get_vc_taxonomy().name(cat_id, level='sub_category_id')
 
 def parent_cat_name_finder(cat_id):
-    try:
-        cat_name = vc_taxo[vc_taxo['category_id']==cat_id]['category'].to_list()[0]
-    except:
-        cat_name = None
-    return cat_name
+    return get_vc_taxonomy().name(cat_id, level='category_id')
 
 def divide_and_round_up(number):
     return math.ceil(number / 60)
 
+# Types a plain JSON value decodes to
+_JSON_SCALARS = frozenset((str, int, float, bool, type(None)))
+# Item layouts remembered across pages (most recently learned first)
+_FLATTEN_PLAN_LIMIT = 16
+_flatten_plans: tuple = ()
+
+class _ShapeMismatch(Exception):
+    pass
+
+def _list_leaf(obj: Any) -> Any:
+    """Column value of a list of plain values; lists of objects are flattened instead."""
+    if type(obj) is not list:
+        raise _ShapeMismatch
+    if not obj:
+        return None
+    if all(isinstance(item, str) for item in obj):
+        return '; '.join(obj)
+    if all(isinstance(item, dict) for item in obj):
+        raise _ShapeMismatch
+    return obj[0]
+
+class _FlattenPlan:
+    """
+    Column layout of one item shape, compiled into a function that reads every
+    column out of an item in one pass and raises _ShapeMismatch (or KeyError)
+    as soon as the item turns out to have another shape.
+    """
+    __slots__ = ('columns', 'extract')
+
+    def __init__(self, record: Dict[str, Any]):
+        # Column name -> slot, or None for list-valued columns (checked by _list_leaf)
+        slots: Dict[str, Any] = {}
+        lines = ['def extract(d0):']
+        self._compile_dict(record, 'd0', '', slots, lines)
+        values = ', '.join(f's{i}' for i in range(len(slots)))
+        # Plain values only: a nested object or list where a value was means another shape
+        scalars = [f'_type(s{i})' for i, slot in enumerate(slots.values()) if slot is not None]
+        if scalars:
+            lines.append(f"    if not {{{', '.join(scalars)}}} <= _scalars: raise _ShapeMismatch")
+        lines.append(f"    return [{values}]")
+        namespace = {'_len': len, '_type': type, '_dict': dict, '_list': list, '_scalars': _JSON_SCALARS,
+                     '_list_leaf': _list_leaf, '_ShapeMismatch': _ShapeMismatch}
+        exec('\n'.join(lines), namespace)
+        self.columns = tuple(slots)
+        self.extract = namespace['extract']
+
+    @staticmethod
+    def _compile_dict(obj, var, parent_key, slots, lines) -> None:
+        # Every key is read below, so equal lengths mean equal key sets
+        lines.append(f"    if _len({var}) != {len(obj)}: raise _ShapeMismatch")
+        for key, value in obj.items():
+            if not isinstance(key, str):
+                raise TypeError('only string keys are compiled')
+            new_key = f"{parent_key}_{key}" if parent_key else key
+            get = f"{var}[{key!r}]"
+            if isinstance(value, dict):
+                sub = f"v{len(lines)}"
+                lines.append(f"    {sub} = {get}")
+                lines.append(f"    if _type({sub}) is not _dict: raise _ShapeMismatch")
+                _FlattenPlan._compile_dict(value, sub, new_key, slots, lines)
+            elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                items = f"v{len(lines)}"
+                lines.append(f"    {items} = {get}")
+                lines.append(f"    if _type({items}) is not _list or _len({items}) != {len(value)}: raise _ShapeMismatch")
+                for i, item in enumerate(value):
+                    sub = f"v{len(lines)}"
+                    lines.append(f"    {sub} = {items}[{i}]")
+                    lines.append(f"    if _type({sub}) is not _dict: raise _ShapeMismatch")
+                    # A single object is flattened in place, several get indexed columns
+                    item_key = new_key if len(value) == 1 else f"{new_key}_{i}"
+                    _FlattenPlan._compile_dict(item, sub, item_key, slots, lines)
+            else:
+                if new_key in slots:
+                    raise TypeError(f"column {new_key!r} is written twice")
+                slot = len(slots)
+                if isinstance(value, list):
+                    slots[new_key] = None
+                    lines.append(f"    s{slot} = _list_leaf({get})")
+                else:
+                    slots[new_key] = slot
+                    lines.append(f"    s{slot} = {get}")
+
+def _flatten_with_plans(record: Dict[str, Any], last: "_FlattenPlan | None"):
+    """Row of one item using a known layout, learning a new one if none fits."""
+    global _flatten_plans
+    if last is not None:
+        try:
+            return last, last.extract(record)
+        except (_ShapeMismatch, KeyError):
+            pass
+    for plan in _flatten_plans:
+        if plan is last:
+            continue
+        try:
+            return plan, plan.extract(record)
+        except (_ShapeMismatch, KeyError):
+            pass
+    try:
+        plan = _FlattenPlan(record)
+        row = plan.extract(record)
+    except (TypeError, _ShapeMismatch, KeyError):
+        # Not a plain JSON object (key types, subclasses, repeated columns)
+        return None, None
+    # Swapped in whole, so concurrent page fetches never see a half-updated cache
+    _flatten_plans = (plan,) + _flatten_plans[:_FLATTEN_PLAN_LIMIT - 1]
+    return plan, row
+
+def _flatten_record(record: Any) -> Dict[str, Any]:
+    """Generic recursive flattening, for items no plan can be compiled for."""
+    flattened_record = {}
+
+    def flatten_dict(obj: Any, parent_key: str = '', sep: str = '_') -> None:
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                new_key = f"{parent_key}{sep}{key}" if parent_key else key
+                flatten_dict(value, new_key, sep)
+        elif isinstance(obj, list):
+            if len(obj) == 1 and isinstance(obj[0], dict):
+                flatten_dict(obj[0], parent_key, sep)
+            elif obj and all(isinstance(item, dict) for item in obj):
+                for i, item in enumerate(obj):
+                    flatten_dict(item, f"{parent_key}_{i}", sep)
+            elif obj and all(isinstance(item, str) for item in obj):
+                flattened_record[parent_key] = '; '.join(obj)
+            else:
+                flattened_record[parent_key] = obj[0] if obj else None
+        else:
+            flattened_record[parent_key] = obj
+
+    flatten_dict(record)
+    return flattened_record
+
 def flatten_json_to_df(data: List[Dict[str, Any]]) -> pd.DataFrame:
     """
-    Convert nested JSON data to a flattened pandas DataFrame
+    Convert nested JSON data to a flattened pandas DataFrame.
+
+    Nested keys are joined with '_'; a list holding one object is flattened in
+    place, several objects get indexed columns (colors_all_0_name, ...) and a
+    list of plain values becomes '; '-joined strings (or its first value).
+    Item layouts are compiled once into column plans and reused across pages.
     """
-    flattened_records = []
-    
+    layouts, rows = [], []
+    plan = None
+    checked = set()
     for record in data:
-        flattened_record = {}
-        
-        # Flatten the record recursively
-        def flatten_dict(obj: Any, parent_key: str = '', sep: str = '_') -> None:
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    new_key = f"{parent_key}{sep}{key}" if parent_key else key
-                    flatten_dict(value, new_key, sep)
-            elif isinstance(obj, list):
-                # Handle lists - for colors.all, pictures, etc.
-                if len(obj) == 0:
-                    flattened_record[parent_key] = None
-                elif len(obj) == 1 and isinstance(obj[0], dict):
-                    # Single dict in list - flatten it
-                    flatten_dict(obj[0], parent_key, sep)
-                elif all(isinstance(item, dict) for item in obj):
-                    # Multiple dicts in list - create indexed columns
-                    for i, item in enumerate(obj):
-                        flatten_dict(item, f"{parent_key}_{i}", sep)
-                else:
-                    # List of simple values - join them or take first
-                    if all(isinstance(item, str) for item in obj):
-                        flattened_record[parent_key] = '; '.join(obj)
-                    else:
-                        flattened_record[parent_key] = obj[0] if obj else None
+        plan, row = _flatten_with_plans(record, plan) if isinstance(record, dict) else (None, None)
+        if plan is not None and plan not in checked:
+            # Plans match on key sets; the first item of each layout also fixes column order
+            if plan.columns == tuple(_flatten_record(record)):
+                checked.add(plan)
             else:
-                flattened_record[parent_key] = obj
-        
-        flatten_dict(record)
-        flattened_records.append(flattened_record)
-    
-    # Create DataFrame
-    df = pd.DataFrame(flattened_records)
-    
-    return df
-
-def vc_api_call(brand_id, catalogLinksWithoutLanguage, page_nb):
-    url = "https://search.vestiairecollective.com/v1/product/search"
-    payload = {
-            "pagination": {
-                "offset": 60*page_nb,
-                "limit": 60
-            },
-            "fields": ["name","condition","description", "brand", "model", "country", "price", "discount", "link", "sold", "likes", "editorPicks", "shouldBeGone", "seller", "directShipping", "local", "pictures", "colors", "size", "stock", "universeId", "createdAt"],
-            "facets": {
-                "fields": ["brand", "universe", "country", "stock", "color", "categoryLvl0", "priceRange", "price", "condition", "region", "editorPicks", "watchMechanism", "discount", "sold", "directShippingEligible", "directShippingCountries", "localCountries", "sellerBadge", "isOfficialStore", "materialLvl0", "size0", "size1", "size2", "size3", "size4", "size5", "size6", "size7", "size8", "size9", "size10", "size11", "size12", "size13", "size14", "size15", "size16", "size17", "size18", "size19", "size20", "size21", "size22", "size23", "model", "categoryLvl1", "categoryLvl2", "dealEligible"],
-                "stats": ["price"]
-            },
-            "q": None,
-            "sortBy": "relevance",
-            "filters": {
-                "brand.id": [f"{brand_id}"],
-                "catalogLinksWithoutLanguage": [f"{catalogLinksWithoutLanguage}"]
-            },
-            "locale": {
-                "country": "GB",
-                "currency": "EUR",
-                "language": "fr",
-                "sizeType": "FR"
-            },
-            "mySizes": None,
-            "options": {
-                "innerFeedContext": "genericPLP",
-                "disableHierarchicalParentFiltering": True
-            },
-            "recentlyViewedProductIDs": []
-        }
+                plan = None
+        if plan is not None:
+            layouts.append(plan.columns)
+        else:
+            flat = _flatten_record(record)
+            layouts.append(tuple(flat))
+            row = list(flat.values())
+        rows.append(row)
+    if not rows:
+        return pd.DataFrame()
+
+    first = layouts[0]
+    if any(columns is not first and columns != first for columns in layouts):
+        # Several layouts: union of the columns in order of first appearance, NaN where absent
+        position: Dict[Any, int] = {}
+        for columns in dict.fromkeys(layouts):
+            for column in columns:
+                position.setdefault(column, len(position))
+        gathers = {}
+        for columns in dict.fromkeys(layouts):
+            local = {column: i for i, column in enumerate(columns)}
+            # Index len(columns) is the NaN appended to each row below
+            gathers[columns] = [local.get(column, len(columns)) for column in position]
+        aligned = []
+        for columns, row in zip(layouts, rows):
+            row.append(np.nan)
+            aligned.append([row[i] for i in gathers[columns]])
+        rows, first = aligned, tuple(position)
+    return pd.DataFrame(rows, columns=list(first))
+
+def vc_brand_filters(brand_id, catalogLinksWithoutLanguage):
+    return {
+        "brand.id": [f"{brand_id}"],
+        "catalogLinksWithoutLanguage": [f"{catalogLinksWithoutLanguage}"]
+    }
+
+def vc_id(value):
+    # Taxonomy ids read back as floats (1234.0) when their column has gaps; filters and facets use strings
+    return str(_norm_id(value))
+
+def vc_taxonomy_filters(brand_id, catalogLinksWithoutLanguage, universe_id, parent_cat_id, cat_id, sub_cat_id):
+    """Search filters of one taxonomy row, down to its deepest known level."""
+    filters = {
+        **vc_brand_filters(brand_id, catalogLinksWithoutLanguage),
+        "universe.id": [vc_id(universe_id)],
+        "categoryLvl0.id": [vc_id(parent_cat_id)],
+    }
+    if pd.notna(sub_cat_id):
+        filters["categoryLvl1.id"] = [vc_id(cat_id)]
+        filters["categoryLvl2.id"] = [vc_id(sub_cat_id)]
+    elif pd.notna(cat_id):
+        filters["categoryLvl1.id"] = [vc_id(cat_id)]
+    return filters
+
+def vc_api_call(brand_id, catalogLinksWithoutLanguage, page_nb, query_profile=None):
+    url = VC_SEARCH_URL
+    filters = vc_brand_filters(brand_id, catalogLinksWithoutLanguage)
+    payload = vc_search_payload(filters, page_nb, query_profile, sort_by="relevance", country="GB")
         ##edit the referer if 
         
     if page_nb == 0: 
@@ -218,16 +554,21 @@ def vc_api_call(brand_id, catalogLinksWithoutLanguage, page_nb):
     # Generate dynamic headers
     headers = generate_dynamic_headers()
     try:
-        response = make_request_with_retry(url, payload, referer)
+        response = make_request_with_retry(url, payload, referer, query_profile=vc_profile_label(query_profile, page_nb == 0))
+        started = time.perf_counter()
+        with profiler.stage('json_decode'):
+            body = response.json()
         
         if page_nb == 0:
-            item_nb = response.json()['facets']['fields']['brand'][0]['count']
+            item_nb = body['facets']['fields']['brand'][0]['count']
             print(item_nb)
             total_pages = divide_and_round_up(item_nb)
             print(total_pages)
         
-        data = response.json()['items']
-        temp_df = flatten_json_to_df(data)
+        data = body['items']
+        with profiler.stage('flatten_json_to_df'):
+            temp_df = flatten_json_to_df(data)
+        observe_parse('vestiaire', 'search', len(temp_df), time.perf_counter() - started)
         #print(temp_df)
     except Exception as e:
         print(f"Error on page {page_nb}: {e}")
@@ -241,110 +582,214 @@ def vc_api_call(brand_id, catalogLinksWithoutLanguage, page_nb):
         return temp_df
     
 
-def vestiaire_scraper(brand_id, catalogLinksWithoutLanguage):
-    ### Makes initial API call to get the number of pages + first page data        
-    total_pages, full_df = vc_api_call(brand_id, catalogLinksWithoutLanguage, 0)
+def iter_vc_pages(fetch_page, pages, concurrency=None):
+    """
+    Yield (page_nb, df) for each page in order, fetching up to `concurrency`
+    pages at once. Pages are independent offset queries; every request still
+    goes through make_request_with_retry and so through the shared limiter.
+    """
+    pages = list(pages)
+    concurrency = max(1, min(concurrency or VC_PAGE_CONCURRENCY, len(pages) or 1))
+    if concurrency == 1:
+        for page_nb in pages:
+            yield page_nb, fetch_page(page_nb)
+        return
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='vc-page') as ex:
+        # map() hands results back in submission order, whatever order they finish in
+        yield from zip(pages, ex.map(fetch_page, pages))
+
+def _pack_partition_values(entries, cap):
+    """
+    Group (value, count) facet entries into value lists whose counts sum to
+    at most cap (first-fit decreasing), so small partitions share pages.
+    """
+    bins = []
+    for value, count in sorted(entries, key=lambda e: e[1], reverse=True):
+        for group in bins:
+            if group[1] + count <= cap:
+                group[0].append(value)
+                group[1] += count
+                break
+        else:
+            bins.append([[value], count])
+    return bins
+
+def plan_vc_partitions(filters, total=None, cap=None, dimensions=VC_PARTITION_DIMENSIONS):
+    """
+    Split a search into filter sets that each fit under the result cap.
+
+    One count-only request per over-cap search returns the facet counts of
+    every dimension it is not yet filtered on; the search is split on the
+    dimension that covers the most items with the smallest largest part.
+    Parts still over the cap are split again, zero-count values are never
+    queried, and parts under the cap are packed together (several values
+    of one '<facet>.id' filter) so they share pages.
+
+    Returns [(filters, item_count), ...]. A part no dimension can split
+    further is returned as is and will be truncated at the cap.
+    """
+    cap = cap or VC_RESULT_CAP
+    partitions = []
+    facet_requests = 0
+    pending = [(filters, total)]
+    while pending:
+        filters, total = pending.pop()
+        if total is not None and total <= cap:
+            if total:
+                partitions.append((filters, total))
+            continue
+        remaining = [(name, facets) for name, facets in dimensions
+                     if not any(f"{facet}.id" in filters for facet in facets)]
+        total, counts = vc_facet_counts(filters, [facet for _, facets in remaining for facet in facets])
+        facet_requests += 1
+        if total is None:
+            print(f"Could not read facet counts, keeping partition as is: {filters}")
+            partitions.append((filters, cap))
+            continue
+        if total <= cap:
+            if total:
+                partitions.append((filters, total))
+            continue
+        best = None
+        for rank, (name, facets) in enumerate(remaining):
+            entries = [(facet, value, n) for facet in facets for value, n in counts.get(facet, {}).items() if n > 0]
+            if len(entries) < 2:
+                continue
+            covered = min(total, sum(n for _, _, n in entries))
+            key = (-covered, max(n for _, _, n in entries), rank)
+            if best is None or key < best[0]:
+                best = (key, name, entries)
+        if best is None:
+            print(f"No facet splits {total} items further; keeping the first {cap}: {filters}")
+            partitions.append((filters, total))
+            continue
+        (neg_covered, _, _), name, entries = best
+        if total + neg_covered:
+            print(f"{total + neg_covered} of {total} items have no {name} value and cannot be reached by splitting on it")
+        print(f"Splitting {total} items on {name} ({len(entries)} values)")
+        small = {}
+        for facet, value, n in entries:
+            if n > cap:
+                pending.append(({**filters, f"{facet}.id": [value]}, n))
+            else:
+                small.setdefault(facet, []).append((value, n))
+        for facet, values in small.items():
+            for group, count in _pack_partition_values(values, cap):
+                partitions.append(({**filters, f"{facet}.id": group}, count))
+    pages = sum(min(VC_MAX_PAGES, divide_and_round_up(count)) for _, count in partitions)
+    print(f"Planned {len(partitions)} partitions, {sum(c for _, c in partitions)} items in {pages} pages "
+          f"({facet_requests} facet requests)")
+    return partitions
+
+def vc_filters_page(filters, page_nb, query_profile=None, sort_by="recency"):
+    """Items of one page of a search whose size is already known (no facets requested)."""
+    payload = vc_search_payload(filters, page_nb, query_profile, sort_by=sort_by, country="FR", facets=[])
+    try:
+        response = make_request_with_retry(VC_SEARCH_URL, payload, "https://fr.vestiairecollective.com/",
+                                           query_profile=vc_profile_label(query_profile, False))
+        started = time.perf_counter()
+        with profiler.stage('json_decode'):
+            body = response.json()
+        with profiler.stage('flatten_json_to_df'):
+            temp_df = flatten_json_to_df(body['items'])
+        observe_parse('vestiaire', 'search', len(temp_df), time.perf_counter() - started)
+    except Exception as e:
+        print(f"Error on page {page_nb} of {filters}: {e}")
+        print(response.text if 'response' in locals() else "No response")
+        temp_df = pd.DataFrame()
+    return temp_df
+
+def iter_vc_partition_pages(partitions, concurrency=None, query_profile=None, done=()):
+    """
+    Yield (partition index, page_nb, df) for every page of planned
+    partitions. Page counts come from the plan, so all pages of all
+    partitions go through one iter_vc_pages pool. Pages whose
+    (partition index, page_nb) is in `done` are not fetched.
+    """
+    jobs = [(k, filters, page_nb) for k, (filters, count) in enumerate(partitions)
+            for page_nb in range(min(VC_MAX_PAGES, divide_and_round_up(count)))
+            if (k, page_nb) not in done]
+    fetch_page = lambda job: vc_filters_page(job[1], job[2], query_profile)
+    for (k, _, page_nb), temp_df in iter_vc_pages(fetch_page, jobs, concurrency):
+        yield k, page_nb, temp_df
+
+def vestiaire_scraper(brand_id, catalogLinksWithoutLanguage, page_concurrency=None, query_profile=None):
+    # Each page is written once as a checkpoint segment; the full frame is only built at the end
+    store = CheckpointStore(f"../data/vc_tests/{catalogLinksWithoutLanguage.replace('/','')}_brand_checkpoint")
+    store.start_fresh()
+    ### A count-only request sizes the search before any items are downloaded
+    filters = vc_brand_filters(brand_id, catalogLinksWithoutLanguage)
+    item_nb = vc_item_count(filters)
+    total_pages = divide_and_round_up(item_nb) if item_nb is not None else 1
+    results = ResultAccumulator()
+    temp_df = pd.DataFrame()
     print(total_pages)
     
-    # Apply hard limit of 19 pages per category
-    max_pages = min(total_pages, 19)
-    
-    if total_pages < 16:
-        ### Iterates over number of pages 
-        print(f"Total pages available: {total_pages}, limiting to: {max_pages}")
-        for i in range(1, max_pages):
-            temp_df = vc_api_call(brand_id, catalogLinksWithoutLanguage, i)
-            full_df = pd.concat([full_df, temp_df])
-            full_df.to_csv(f"../data/vc_tests/{catalogLinksWithoutLanguage.replace('/','')}_{i}.csv")
+    if total_pages <= VC_MAX_PAGES:
+        ### Iterates over number of pages, the first one included
+        print(f"Total pages available: {total_pages}")
+        def fetch_page(page_nb):
+            page = vc_api_call(brand_id, catalogLinksWithoutLanguage, page_nb, query_profile)
+            # Page 0 also returns the page count, known already
+            return page[1] if page_nb == 0 else page
+        for i, temp_df in iter_vc_pages(fetch_page, range(total_pages), page_concurrency):
+            results.add(temp_df)
+            store.append(temp_df, page_nb=i)
     else: 
-        ### need to iterate over categories to have maximum 1000 items per category
-        ## create a catalog + naming for vestiaire co with associated id for each (and universe and lv1,2 3)
-        pass
-    full_df.to_csv(f'../data/{catalogLinksWithoutLanguage}_full.csv')
+        ### More items than one search serves: split it on facets until every part fits under the cap
+        print(f"Total pages available: {total_pages}, more than the {VC_MAX_PAGES}-page cap: partitioning")
+        partitions = plan_vc_partitions(filters, total=item_nb)
+        for k, page_nb, temp_df in iter_vc_partition_pages(partitions, page_concurrency, query_profile):
+            results.add(temp_df)
+            store.append(temp_df, page_nb=page_nb, partition=k)
+    full_df = results.to_frame()
+    with profiler.stage('csv_write'):
+        full_df.to_csv(f"../data/{catalogLinksWithoutLanguage.replace('/','')}_full.csv")
+    store.clear()
     
     return temp_df, full_df
 
-def cat_api_caller(page_nb, brand_id, catalogLinksWithoutLanguage, universe_id, parent_cat_id, cat_id, sub_cat_id):
-    url = "https://search.vestiairecollective.com/v1/product/search"
+def label_vc_categories(temp_df, cat_id, sub_cat_id):
+    """Add the taxonomy row's sub_category / parent_category names to a page."""
+    try:
+        try:
+            sub_cat_name = sub_cat_name_finder(sub_cat_id)
+        except:
+            print('No Sub Cat Name Found')
+            sub_cat_name = None
+        temp_df['sub_category'] = sub_cat_name
+        try:
+            parent_cat_name = parent_cat_name_finder(cat_id)
+        except: 
+            print('No Parent Cat Name Found')
+            parent_cat_name = None
+        temp_df['parent_category'] = parent_cat_name
+    except:
+        print('sub_cat_issue')
+
+def cat_api_caller(page_nb, brand_id, catalogLinksWithoutLanguage, universe_id, parent_cat_id, cat_id, sub_cat_id, query_profile=None):
+    url = VC_SEARCH_URL
     cat_id = str(cat_id).split('.')[0]
     print(universe_id,parent_cat_id,cat_id)
-    if pd.notna(sub_cat_id):
-        #print('NA Ignored')
-        filters = {
-            "brand.id": [f"{brand_id}"],
-            "catalogLinksWithoutLanguage": [f"{catalogLinksWithoutLanguage}"],
-            "universe.id": [f"{universe_id}"],
-            "categoryLvl0.id": [f"{parent_cat_id}"],
-            "categoryLvl1.id": [f"{cat_id}"],
-            "categoryLvl2.id": [f"{sub_cat_id}"]
-        }
-    else:
-        if pd.notna(cat_id):
-            #print('NA Not Ignored')
-            filters = {
-                "brand.id": [f"{brand_id}"],
-                "catalogLinksWithoutLanguage": [f"{catalogLinksWithoutLanguage}"],
-                "universe.id": [f"{universe_id}"],
-                "categoryLvl0.id": [f"{parent_cat_id}"],
-                "categoryLvl1.id": [f"{cat_id}"],
-            }
-        else: 
-            filters = {
-                "brand.id": [f"{brand_id}"],
-                "catalogLinksWithoutLanguage": [f"{catalogLinksWithoutLanguage}"],
-                "universe.id": [f"{universe_id}"],
-                "categoryLvl0.id": [f"{parent_cat_id}"],
-            }
-
-    payload = {
-        "pagination": {
-            "offset": 60*page_nb,
-            "limit": 60
-        },
-       "fields": ["name", "description", "brand", "model", "country", "price", "discount", "link", "sold", "likes", "editorPicks", "shouldBeGone", "seller", "directShipping", "local", "pictures", "colors", "size", "stock", "universeId", "createdAt"],
-        "facets": {
-            "fields": ["brand", "universe", "country", "stock", "color", "categoryLvl0", "priceRange", "price", "condition", "region", "editorPicks", "watchMechanism", "discount", "sold", "directShippingEligible", "directShippingCountries", "localCountries", "sellerBadge", "isOfficialStore", "materialLvl0", "size0", "size1", "size2", "size3", "size4", "size5", "size6", "size7", "size8", "size9", "size10", "size11", "size12", "size13", "size14", "size15", "size16", "size17", "size18", "size19", "size20", "size21", "size22", "size23", "model", "categoryLvl1", "categoryLvl2", "dealEligible"],
-            "stats": ["price"]
-        },
-        "q": None,
-        "sortBy": "recency",
-        "filters": filters,
-        "locale": {
-            "country": "FR",
-            "currency": "EUR",
-            "language": "fr",
-            "sizeType": "FR"
-        },
-        "mySizes": None,
-        "options": {
-            "innerFeedContext": "genericPLP",
-            "disableHierarchicalParentFiltering": True
-        },
-    }
+    filters = vc_taxonomy_filters(brand_id, catalogLinksWithoutLanguage, universe_id, parent_cat_id, cat_id, sub_cat_id)
+
+    payload = vc_search_payload(filters, page_nb, query_profile, sort_by="recency", country="FR")
     try:
-        response = make_request_with_retry(url, payload, "https://fr.vestiairecollective.com/")
+        response = make_request_with_retry(url, payload, "https://fr.vestiairecollective.com/",
+                                           query_profile=vc_profile_label(query_profile, page_nb == 0))
+        started = time.perf_counter()
+        with profiler.stage('json_decode'):
+            body = response.json()
         
         if page_nb == 0:
-            item_nb = response.json()['facets']['fields']['brand'][0]['count']
+            item_nb = body['facets']['fields']['brand'][0]['count']
             total_pages = divide_and_round_up(item_nb)
 
-        data = response.json()['items']
-        temp_df = flatten_json_to_df(data)
-        try:
-            try:
-                sub_cat_name = sub_cat_name_finder(sub_cat_id)
-            except:
-                print('No Sub Cat Name Found')
-                sub_cat_name = None
-            temp_df['sub_category'] = sub_cat_name
-            try:
-                parent_cat_name = parent_cat_name_finder(cat_id)
-            except: 
-                print('No Parent Cat Name Found')
-                parent_cat_name = None
-            temp_df['parent_category'] = parent_cat_name
-        except:
-            print('sub_cat_issue')
+        data = body['items']
+        with profiler.stage('flatten_json_to_df'):
+            temp_df = flatten_json_to_df(data)
+        observe_parse('vestiaire', 'search', len(temp_df), time.perf_counter() - started)
+        label_vc_categories(temp_df, cat_id, sub_cat_id)
     except Exception as e: 
         print(f"Error in cat_api_caller: {e}")
         print(response.text if 'response' in locals() else "No response")
@@ -357,14 +802,41 @@ def cat_api_caller(page_nb, brand_id, catalogLinksWithoutLanguage, universe_id,
         return temp_df
     
 
+def vc_taxonomy_row_count(counts, row):
+    """
+    Upper bound on a taxonomy row's items from brand-wide category facet
+    counts: 0 when any of its levels has no items, None when unknown.
+    Only facets listed in full are in `counts` (see full_cat_vc_api_call).
+    """
+    if counts is None:
+        return None
+    bound = None
+    for facet, column in (('categoryLvl0', 'parent_cat_id'), ('categoryLvl1', 'category_id'),
+                          ('categoryLvl2', 'sub_category_id')):
+        if facet not in counts or pd.isna(row[column]):
+            continue
+        n = counts[facet].get(vc_id(row[column]), 0)
+        bound = n if bound is None else min(bound, n)
+    return bound
+
+def vc_checkpoint_store(catalogLinksWithoutLanguage):
+    """Append-only page checkpoint for a brand's taxonomy run."""
+    return CheckpointStore(f"../data/vc_tests/{catalogLinksWithoutLanguage.replace('/','')}_checkpoint")
+
 def find_last_collected_category(catalogLinksWithoutLanguage, continuous=False):
     """
-    Find the last collected category by checking existing CSV files
+    Find the last collected category by checking the page checkpoint, then existing CSV files
     Prioritizes vc_tests data files
     Returns the index of the last collected category, or 0 if no files found
     """
     brand_name = catalogLinksWithoutLanguage.replace('/','')
     
+    # Checkpoint manifest records the taxonomy row of every collected page
+    last = vc_checkpoint_store(catalogLinksWithoutLanguage).last()
+    if last is not None:
+        print(f"Last collected category from checkpoint: {last['universe']}, {last['parent_cat']}, {last['category']}, {last['sub_category']}")
+        return last
+    
     # First, check for vc_tests files (priority)
     vc_tests_pattern = f"../data/vc_tests/{brand_name}.csv"
     if os.path.exists(vc_tests_pattern):
@@ -386,7 +858,7 @@ def find_last_collected_category(catalogLinksWithoutLanguage, continuous=False):
             if not last_categories.empty:
                 last_row = last_categories.iloc[0]
                 print(f"Last collected category from vc_tests: {last_row['universe']}, {last_row['parent_cat']}, {last_row['category']}, {last_row['sub_category']}")
-                return last_row
+                return last_row.to_dict()
             else:
                 print("No categories found in vc_tests file")
                 return 0
@@ -442,7 +914,7 @@ def find_last_collected_category(catalogLinksWithoutLanguage, continuous=False):
         if not last_categories.empty:
             last_row = last_categories.iloc[0]
             print(f"Last collected category: {last_row['universe']}, {last_row['parent_cat']}, {last_row['category']}, {last_row['sub_category']}")
-            return last_row
+            return last_row.to_dict()
         else:
             print("No categories found in the file")
             return 0
@@ -453,25 +925,27 @@ def find_last_collected_category(catalogLinksWithoutLanguage, continuous=False):
     
     return 0
 
-def full_cat_vc_api_call(brand_id, catalogLinksWithoutLanguage, continuous=False, macro_taxo=False):
+def full_cat_vc_api_call(brand_id, catalogLinksWithoutLanguage, continuous=False, macro_taxo=False, page_concurrency=None, query_profile=None):
     # Check for existing data and find last collected category
     last_collected = find_last_collected_category(catalogLinksWithoutLanguage, continuous)
+    store = vc_checkpoint_store(catalogLinksWithoutLanguage)
     
-    full_df = pd.DataFrame()
-    if macro_taxo:
-        taxo = macro_vc_taxo
-    else:
-        taxo = vc_taxo
+    results = ResultAccumulator()
+    taxonomy = get_vc_taxonomy(macro=macro_taxo)
+    taxo = taxonomy.frame
     
     # If we found existing data, load it
     if last_collected != 0:
         brand_name = catalogLinksWithoutLanguage.replace('/','')
         
-        # First, check for vc_tests files (priority)
+        # Replay checkpoint segments first, then fall back to legacy snapshots
         vc_tests_pattern = f"../data/vc_tests/{brand_name}.csv"
-        if os.path.exists(vc_tests_pattern):
+        if store.last() is not None:
+            results = ResultAccumulator(store.load())
+            print(f"Replayed {len(store)} checkpoint pages: {len(results)} items")
+        elif os.path.exists(vc_tests_pattern):
             print(f"Loading existing data from vc_tests: {vc_tests_pattern}")
-            full_df = pd.read_csv(vc_tests_pattern)
+            results = ResultAccumulator(pd.read_csv(vc_tests_pattern))
         else:
             # If no vc_tests file, check other locations
             possible_files = []
@@ -494,51 +968,117 @@ def full_cat_vc_api_call(brand_id, catalogLinksWithoutLanguage, continuous=False
             if possible_files:
                 latest_file = max(possible_files, key=os.path.getctime)
                 print(f"Loading existing data from: {latest_file}")
-                full_df = pd.read_csv(latest_file)
+                results = ResultAccumulator(pd.read_csv(latest_file))
             else:
                 print("No existing files found to load")
     
     # Find the starting index based on last collected category
     start_index = 0
-    if last_collected != 0:
+    resume_row, resume_pages = None, set()
+    if last_collected != 0 and last_collected.get('macro_taxo') == macro_taxo and 'taxo_index' in last_collected:
+        start_index = last_collected['taxo_index']
+        if last_collected.get('row_done'):
+            start_index += 1
+            print(f"Resuming from category index {start_index}")
+        else:
+            # Interrupted inside this row: fetch only the pages the checkpoint lacks
+            resume_row = start_index
+            resume_pages = {(entry.get('partition'), entry['page_nb']) for entry in store.entries()
+                            if entry.get('taxo_index') == resume_row and 'page_nb' in entry}
+            print(f"Resuming inside category index {start_index}: {len(resume_pages)} pages already collected")
+    elif last_collected != 0:
         # Find the index of the last collected category in the taxonomy
-        for i, row in taxo.iterrows():
-            if (row['universe'] == last_collected['universe'] and 
-                row['parent_cat'] == last_collected['parent_cat'] and 
-                row['category'] == last_collected['category'] and 
-                row['sub_category'] == last_collected['sub_category']):
-                start_index = i + 1  # Start from the next category
-                print(f"Resuming from category index {start_index}")
-                break
+        position = taxonomy.position(**{k: last_collected.get(k) for k in VC_TAXONOMY_KEY})
+        if position is not None:
+            start_index = position + 1  # Start from the next category
+            print(f"Resuming from category index {start_index}")
+    if start_index >= len(taxo):
+        # The previous run got through the whole taxonomy: this is a new run
+        print("Previous run completed, starting from the first category")
+        start_index = 0
+        results = ResultAccumulator()
+        store.start_fresh()
+    
+    # One facet request tells which taxonomy rows have items at all for this brand
+    brand_total, category_counts = vc_facet_counts(vc_brand_filters(brand_id, catalogLinksWithoutLanguage),
+                                                   ["categoryLvl0", "categoryLvl1", "categoryLvl2"])
+    if brand_total is None:
+        category_counts = None
+    else:
+        # A facet whose values do not add up to the total was cut short: absent values are unknown, not empty
+        category_counts = {facet: values for facet, values in category_counts.items()
+                           if sum(values.values()) >= brand_total}
+    skipped = 0
     
     # Process categories starting from the determined index
     for i, row in taxo.iloc[start_index:].iterrows(): 
+        expected = vc_taxonomy_row_count(category_counts, row)
+        if expected == 0:
+            skipped += 1
+            continue
         print(f"Started Collecting: {row['universe']}, {row['parent_cat']}, {row['category']}, {row['sub_category']}.")
-        total_pages, temp_df = cat_api_caller(0, brand_id, catalogLinksWithoutLanguage, row['universe_id'], row['parent_cat_id'], row['category_id'], row['sub_category_id'])
-        full_df = pd.concat([full_df, temp_df])
-        # Apply hard limit of 19 pages per category
-        max_pages = min(total_pages, 19)
+        checkpoint_meta = {
+            'taxo_index': int(i),
+            'macro_taxo': macro_taxo,
+            'universe': row['universe'],
+            'parent_cat': row['parent_cat'],
+            'category': row['category'],
+            'sub_category': row['sub_category'],
+        }
+        done = resume_pages if int(i) == resume_row else set()
+        total_pages = None
+        if expected is None or expected <= VC_RESULT_CAP:
+            total_pages, temp_df = cat_api_caller(0, brand_id, catalogLinksWithoutLanguage, row['universe_id'], row['parent_cat_id'], row['category_id'], row['sub_category_id'], query_profile)
         
-        if total_pages == 1: 
-            print(f"Finished Collecting: {row['universe']}, {row['parent_cat']}, {row['category']}, {row['sub_category']}.\n")
-            continue
-        else: 
-            print(f"Total pages available: {total_pages}, limiting to: {max_pages}")
-            for i in range(1, max_pages):
-                temp_df = cat_api_caller(i, brand_id, catalogLinksWithoutLanguage, row['universe_id'], row['parent_cat_id'], row['category_id'], row['sub_category_id'])
-                full_df = pd.concat([full_df, temp_df])
-                full_df.to_csv(f"../data/vc_tests/{catalogLinksWithoutLanguage.replace('/','')}.csv")
-                print(f"Collecting page {i+1}: {row['universe']}, {row['parent_cat']}, {row['category']}, {row['sub_category']}.")
+        if total_pages is not None and total_pages <= VC_MAX_PAGES:
+            if (None, 0) not in done:
+                results.add(temp_df)
+                store.append(temp_df, page_nb=0, **checkpoint_meta)
+            print(f"Total pages available: {total_pages}")
+            fetch_page = lambda page_nb: cat_api_caller(page_nb, brand_id, catalogLinksWithoutLanguage, row['universe_id'], row['parent_cat_id'], row['category_id'], row['sub_category_id'], query_profile)
+            pages = [page_nb for page_nb in range(1, total_pages) if (None, page_nb) not in done]
+            for page_nb, temp_df in iter_vc_pages(fetch_page, pages, page_concurrency):
+                results.add(temp_df)
+                store.append(temp_df, page_nb=page_nb, **checkpoint_meta)
+                print(f"Collecting page {page_nb+1}: {row['universe']}, {row['parent_cat']}, {row['category']}, {row['sub_category']}.")
+        else:
+            # Over the cap: split the row on facets so every item is reachable
+            print(f"More than {VC_RESULT_CAP} items: partitioning")
+            cat_id = vc_id(row['category_id'])
+            filters = vc_taxonomy_filters(brand_id, catalogLinksWithoutLanguage, row['universe_id'], row['parent_cat_id'], cat_id, row['sub_category_id'])
+            partitions = plan_vc_partitions(filters)
+            for k, page_nb, temp_df in iter_vc_partition_pages(partitions, page_concurrency, query_profile, done=done):
+                label_vc_categories(temp_df, cat_id, row['sub_category_id'])
+                results.add(temp_df)
+                store.append(temp_df, page_nb=page_nb, partition=k, **checkpoint_meta)
+                print(f"Collecting partition {k+1}/{len(partitions)} page {page_nb+1}: {row['universe']}, {row['parent_cat']}, {row['category']}, {row['sub_category']}.")
+        # Row marker: a resume starts at the next row, not inside this one
+        store.append(pd.DataFrame(), row_done=True, **checkpoint_meta)
         print(f"Finished Collecting: {row['universe']}, {row['parent_cat']}, {row['category']}, {row['sub_category']}.\n")
+    if skipped:
+        print(f"Skipped {skipped} taxonomy rows with no items for this brand")
     
-    if continuous == True:
-        full_df.to_csv(f"../data/vc_continuous/{catalogLinksWithoutLanguage.replace('/','')}/{datetime.today().date()}.csv")
-    else: 
-        full_df.to_csv(f"../data/{catalogLinksWithoutLanguage.replace('/','')}_full_vc.csv")
+    full_df = results.to_frame()
+    with profiler.stage('csv_write'):
+        if continuous == True:
+            full_df.to_csv(f"../data/vc_continuous/{catalogLinksWithoutLanguage.replace('/','')}/{datetime.today().date()}.csv")
+        else: 
+            full_df.to_csv(f"../data/{catalogLinksWithoutLanguage.replace('/','')}_full_vc.csv")
+    # The output holds everything now; the next run starts over instead of resuming past the last row
+    store.clear()
     return full_df
 
     
 if __name__ == '__main__': 
+    parser = argparse.ArgumentParser(description='Vestiaire Collective brand collector')
+    parser.add_argument('--page-concurrency', type=int, default=VC_PAGE_CONCURRENCY,
+                        help='Pages of a category fetched in parallel (paced by the shared limiter)')
+    parser.add_argument('--query-profile', choices=['listing-lean', 'full'], default=VC_QUERY_PROFILE,
+                        help='Fields/facets requested per page (listing-lean for routine runs)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.profile:
+        profiler.start(cprofile=args.cprofile)
     # Test dynamic headers first
     test_dynamic_headers()
     
@@ -555,7 +1095,11 @@ if __name__ == '__main__':
     catalogLinksWithoutLanguage = '/zadig-voltaire/'
     '''brand_id = 23
     catalogLinksWithoutLanguage = '/sandro/' '''
-    full_cat_vc_api_call(brand_id, catalogLinksWithoutLanguage, True, False)
+    full_cat_vc_api_call(brand_id, catalogLinksWithoutLanguage, True, False, page_concurrency=args.page_concurrency,
+                         query_profile=args.query_profile)
+    print_time_breakdown()
+    write_run_metrics('vestiaire', '../data/logs/vestiaire/metrics')
+    profiler.finish('../data/logs/vestiaire/profile', 'vestiaire')
     
     '''We're gonna do a manual split
     by macro_category: 
@@ -6,52 +6,159 @@ import time
 import random 
 import ssl
 import urllib.request
-from fake_useragent import UserAgent
 import cloudscraper
 from pathlib import Path
 import os
 import glob
+import math
 import uuid
 import re
 import argparse
+import asyncio
+import atexit
+import contextlib
+import threading
+import weakref
+from urllib.parse import urlsplit
 
-# Optional curl-cffi HTTP/2 + TLS mimic
-try:
-    from curl_cffi import requests as curl_requests
-    _CURL_AVAILABLE = True
-except Exception:
-    _CURL_AVAILABLE = False
+# Optional curl-cffi HTTP/2 + TLS mimic (imported on first use, see _curl_requests)
+_curl_module = None
 
-# Optional Playwright client import
 try:
-    from scrapers.vinted_scraper_playwright import PlaywrightVintedClient
-except Exception:
-    try:
-        from vinted_scraper_playwright import PlaywrightVintedClient
-    except Exception:
-        PlaywrightVintedClient = None
+    from scrapers.result_accumulator import ResultAccumulator
+    from scrapers.checkpoint_store import CheckpointStore
+    from scrapers.taxonomy import load_taxonomy
+    from scrapers.rate_limiter import rate_limiter
+    from scrapers.proxy_pool import ProxyPool, check_proxy, fetch_proxy_lists
+    from scrapers.identity_store import IdentityStore, hydrate_session, session_cookies
+    from scrapers.raw_archive import RawArchive
+    from scrapers.seen_index import SeenIndex
+    from scrapers.scraper_metrics import (
+        observe_request, observe_parse, count_retry, count_proxy_switch,
+        count_playwright_fallback, sleep as metered_sleep, print_time_breakdown, write_run_metrics)
+    from scrapers.stage_profiler import profiler, add_profile_arguments
+except ImportError:
+    from result_accumulator import ResultAccumulator
+    from checkpoint_store import CheckpointStore
+    from taxonomy import load_taxonomy
+    from rate_limiter import rate_limiter
+    from proxy_pool import ProxyPool, check_proxy, fetch_proxy_lists
+    from identity_store import IdentityStore, hydrate_session, session_cookies
+    from raw_archive import RawArchive
+    from seen_index import SeenIndex
+    from scraper_metrics import (
+        observe_request, observe_parse, count_retry, count_proxy_switch,
+        count_playwright_fallback, sleep as metered_sleep, print_time_breakdown, write_run_metrics)
+    from stage_profiler import profiler, add_profile_arguments
+
+# Optional Playwright module (imported on first use, see _playwright_module)
+_pw_module = None
+# Browser contexts in the shared Playwright pool
+PLAYWRIGHT_CONTEXTS = int(os.getenv('VINTED_PW_CONTEXTS', '4'))
+# Catalog pages fetched per in-page batch on the Playwright path
+PLAYWRIGHT_BATCH_PAGES = int(os.getenv('VINTED_PW_BATCH_PAGES', '4'))
 
 # Resolve paths relative to repo root
 REPO_ROOT = Path(__file__).resolve().parents[1]
+# Data directories are created on first write, not at import
 RAW_DATA_DIR = (REPO_ROOT / 'data' / 'vinted_tests' / 'raw_data')
-RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 LOGS_DIR = (REPO_ROOT / 'data' / 'logs' / 'vinted')
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
-RAW_JSON_DIR = (REPO_ROOT / 'data' / 'vinted_tests' / 'raw_json')
-RAW_JSON_DIR.mkdir(parents=True, exist_ok=True)
+# Compressed, segmented raw responses (see raw_archive.py)
+RAW_ARCHIVE_DIR = (REPO_ROOT / 'data' / 'vinted_tests' / 'raw_archive')
+RAW_ARCHIVE_RETENTION_DAYS = int(os.getenv('VINTED_RAW_RETENTION_DAYS', '0')) or None
 STATE_DIR = (REPO_ROOT / 'data' / 'vinted_tests' / 'state')
-STATE_DIR.mkdir(parents=True, exist_ok=True)
 VINTED_TAXONOMY_PATH = (REPO_ROOT / 'data' / 'vinted_taxonomy.csv')
+IDENTITY_DIR = STATE_DIR / 'identities'
+SEEN_INDEX_DIR = STATE_DIR / 'seen'
+# Delta crawls stop once this share of a page was collected by earlier runs
+DELTA_KNOWN_RATIO = float(os.getenv('VINTED_DELTA_KNOWN_RATIO', '0.8'))
+# Site root for the catalog API and the warm-up pages
+VINTED_BASE_URL = os.getenv('VINTED_BASE_URL', 'https://www.vinted.fr').rstrip('/')
+CATALOG_API_URL = f"{VINTED_BASE_URL}/api/v2/catalog/items"
+# VINTED_USE_PROXIES=0 connects directly instead of through the free proxy pool
+VINTED_USE_PROXIES = os.getenv('VINTED_USE_PROXIES', '1') != '0'
 
-# Initialize fake user agent
-try:
-    ua = UserAgent()
-except:
-    # Fallback user agents if fake_useragent fails
-    ua = None
+# Shared limiter key for catalog API calls; identities are proxies (or
+# 'direct') on the requests path and 'playwright' on the browser path
+VINTED_CATALOG_ENDPOINT = 'vinted.catalog'
+PLAYWRIGHT_IDENTITY = 'playwright'
+rate_limiter.configure(VINTED_CATALOG_ENDPOINT, rate=1.0, burst=1, max_rate=4.0, cooldown=60.0)
+
+def _limiter_identity(session) -> str:
+    return _session_proxy(session) or 'direct'
+
+# The catalog API has no field selection: profiles set the page size and
+# whether raw responses are archived (count-only reads pagination totals)
+VINTED_QUERY_PROFILES = {
+    'count-only': {'per_page': 1, 'archive_raw': False},
+    'listing-lean': {'per_page': 96, 'archive_raw': False},
+    'full': {'per_page': 96, 'archive_raw': True},
+}
+VINTED_QUERY_PROFILE = os.getenv('VINTED_QUERY_PROFILE', 'full')
+
+def vinted_query_profile(name: str | None = None) -> dict:
+    """Settings of a named query profile (VINTED_QUERY_PROFILE by default)."""
+    name = name or VINTED_QUERY_PROFILE
+    if name not in VINTED_QUERY_PROFILES:
+        raise ValueError(f"Unknown query profile {name!r}; choose from {list(VINTED_QUERY_PROFILES)}")
+    return VINTED_QUERY_PROFILES[name]
+
+# The catalog serves at most this many pages of one query; bigger brand/category
+# pairs are split into price (then status, optionally size) shards in full mode
+VINTED_PAGE_CAP = int(os.getenv('VINTED_PAGE_CAP', '10'))
+VINTED_STATUS_IDS = (6, 1, 2, 3, 4)
+# Notional top of the open-ended price range, where the first bisection is placed
+VINTED_SHARD_MAX_PRICE = 10000.0
+
+# fake_useragent is loaded on first use: UserAgent() may read a data file or hit the network
+_ua = None
+_ua_loaded = False
+
+def _user_agent_pool():
+    global _ua, _ua_loaded
+    if not _ua_loaded:
+        _ua_loaded = True
+        try:
+            from fake_useragent import UserAgent
+            _ua = UserAgent()
+        except Exception:
+            # Fallback user agents if fake_useragent fails
+            _ua = None
+    return _ua
+
+def _curl_requests():
+    """curl_cffi.requests, imported on first use; None when unavailable."""
+    global _curl_module
+    if _curl_module is None:
+        try:
+            from curl_cffi import requests as curl_requests
+            _curl_module = curl_requests
+        except Exception:
+            _curl_module = False
+    return _curl_module or None
+
+def _playwright_module():
+    """vinted_scraper_playwright, imported on first use; None when unavailable."""
+    global _pw_module
+    if _pw_module is None:
+        try:
+            from scrapers import vinted_scraper_playwright as module
+        except Exception:
+            try:
+                import vinted_scraper_playwright as module
+            except Exception:
+                module = False
+        _pw_module = module
+    return _pw_module or None
+
+def _playwright_client_cls():
+    """PlaywrightVintedClient, imported on first use; None when unavailable."""
+    module = _playwright_module()
+    return module.PlaywrightVintedClient if module else None
 
 def get_random_user_agent():
     """Get a random user agent"""
+    ua = _user_agent_pool()
     if ua:
         return ua.random
     else:
@@ -107,6 +214,7 @@ def ensure_anon_id(session: requests.Session) -> bool:
 def log_response(prefix: str, response: requests.Response, note: str = "") -> None:
     try:
         ts = int(time.time())
+        LOGS_DIR.mkdir(parents=True, exist_ok=True)
         fname = LOGS_DIR / f"{prefix}_{response.status_code}_{ts}.log"
         body = ""
         try:
@@ -125,16 +233,24 @@ def log_response(prefix: str, response: requests.Response, note: str = "") -> No
     except Exception:
         pass
 
-def save_raw_json(payload: dict, brand_id: int, cat_id: int, page_nb: int) -> None:
+_raw_archive = None
+
+def get_raw_archive() -> RawArchive:
+    global _raw_archive
+    if _raw_archive is None:
+        _raw_archive = RawArchive(RAW_ARCHIVE_DIR, retention_days=RAW_ARCHIVE_RETENTION_DAYS)
+    return _raw_archive
+
+@profiler.profiled('raw_archive_write')
+def save_raw_json(payload: dict | None, brand_id: int, cat_id: int, page_nb: int, raw: bytes | None = None) -> None:
+    """Archive one catalog response. Pass the response body as `raw` to store it
+    byte for byte; otherwise the parsed payload is serialized compactly."""
     try:
-        ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        target_dir = RAW_JSON_DIR / str(brand_id) / str(cat_id)
-        target_dir.mkdir(parents=True, exist_ok=True)
-        out = target_dir / f"{ts}_p{page_nb}.json"
-        with open(out, 'w', encoding='utf-8') as f:
-            json.dump(payload, f, ensure_ascii=False)
-    except Exception:
-        pass
+        if raw is None:
+            raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        get_raw_archive().append(raw, brand_id, cat_id, page_nb)
+    except Exception as e:
+        print(f"Could not archive raw response: {e}")
 
 def _state_path(brand_id: int, cat_id: int) -> Path:
     return STATE_DIR / f"{brand_id}_{cat_id}.json"
@@ -152,6 +268,7 @@ def read_last_seen(brand_id: int, cat_id: int):
 
 def write_last_seen(brand_id: int, cat_id: int, last_seen_id) -> None:
     try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
         p = _state_path(brand_id, cat_id)
         with open(p, 'w', encoding='utf-8') as f:
             json.dump({
@@ -161,28 +278,95 @@ def write_last_seen(brand_id: int, cat_id: int, last_seen_id) -> None:
     except Exception:
         pass
 
-_pw_client_singleton = None
+_seen_indexes: dict = {}
+_seen_lock = threading.Lock()
+
+def get_seen_index(brand_id: int) -> SeenIndex:
+    """Per-brand persistent index of collected item ids (see seen_index.py)."""
+    with _seen_lock:
+        index = _seen_indexes.get(brand_id)
+        if index is None:
+            index = _seen_indexes[brand_id] = SeenIndex(SEEN_INDEX_DIR / f"{brand_id}.npy")
+        return index
+
+def flush_seen_index(brand_id: int) -> None:
+    try:
+        added = get_seen_index(brand_id).flush()
+        if added:
+            print(f"Seen index for brand {brand_id}: {added} new ids")
+    except Exception as e:
+        print(f"Could not save seen index for brand {brand_id}: {e}")
+
+def _page_ids(df: pd.DataFrame) -> pd.Series:
+    return pd.to_numeric(df['id'], errors='coerce')
+
+_pw_pool = None
+_pw_pool_lock = threading.Lock()
+
+def get_playwright_pool(proxies: list[str | None] | None = None, contexts: int | None = None):
+    """Shared PlaywrightVintedPool (one browser, several leased contexts).
 
-def get_playwright_client(proxy: str | None):
-    global _pw_client_singleton
-    if PlaywrightVintedClient is None:
+    Thread-safe; the pool is created on first call and reused afterwards.
+    `proxies` and `contexts` only apply to that first call: later callers get
+    the existing pool whatever they pass, until close_playwright_pool() or
+    reset_playwright_client() rebuilds it. Returns None when Playwright is
+    unavailable or the browser fails to start.
+    """
+    global _pw_pool
+    module = _playwright_module()
+    if module is None:
         return None
-    if _pw_client_singleton is None:
+    with _pw_pool_lock:
+        if _pw_pool is None:
+            try:
+                _pw_pool = module.PlaywrightVintedPool(
+                    size=contexts or PLAYWRIGHT_CONTEXTS, proxies=proxies, headless=True,
+                    identity_store=get_identity_store())
+            except Exception as e:
+                print(f"Playwright pool unavailable: {e}")
+                _pw_pool = None
+        return _pw_pool
+
+def playwright_feedback(results, seconds: float | None = None) -> None:
+    """Report browser-path fetch results (fetch_catalog_items shapes) to the limiter
+    and metrics; seconds is the wall time of the fetch (whole batch for batches)."""
+    statuses = [r.get('status', 0) if isinstance(r, dict) and r.get('error') else 200 for r in results]
+    for st in statuses:
+        observe_request('vinted', 'catalog', PLAYWRIGHT_IDENTITY, st or None, seconds)
+    throttled = [st for st in statuses if st in (429, 503)]
+    if throttled:
+        rate_limiter.feedback(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY, throttled[0])
+    elif any(st != 200 for st in statuses):
+        rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
+    else:
+        rate_limiter.on_success(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
+
+def get_playwright_client():
+    # The pool exposes the PlaywrightVintedClient surface and leases a context per call;
+    # its proxy is the best working one when the pool is created
+    with _pw_pool_lock:
+        pool = _pw_pool
+    if pool is not None:
+        return pool
+    proxy = get_working_proxy()
+    return get_playwright_pool([proxy] if proxy else None)
+
+def close_playwright_pool():
+    global _pw_pool
+    with _pw_pool_lock:
+        pool, _pw_pool = _pw_pool, None
+    if pool is not None:
         try:
-            _pw_client_singleton = PlaywrightVintedClient(proxy=proxy, headless=True)
+            pool.close()
         except Exception:
-            _pw_client_singleton = None
-    return _pw_client_singleton
+            pass
 
-def reset_playwright_client(proxy: str | None):
-    global _pw_client_singleton
-    try:
-        if _pw_client_singleton is not None:
-            _pw_client_singleton.close()
-    except Exception:
-        pass
-    _pw_client_singleton = None
-    return get_playwright_client(proxy)
+atexit.register(close_playwright_pool)
+
+def reset_playwright_client():
+    """Restart the whole browser on the current best proxy. Failing contexts are already recycled by the pool itself."""
+    close_playwright_pool()
+    return get_playwright_client()
 
 '''
 # Legacy paid proxy example removed
@@ -195,15 +379,84 @@ def reset_playwright_client(proxy: str | None):
 # )
 '''
 
-vinted_taxonomy = pd.read_csv(VINTED_TAXONOMY_PATH)
+# Flat Vinted taxonomy; a parent_id column, when present, enables subtree lookups
+VINTED_TAXONOMY_LEVELS = (('category_id', 'category_name'),)
+
+def get_vinted_taxonomy():
+    """Indexed Vinted taxonomy, loaded on first use."""
+    return load_taxonomy(VINTED_TAXONOMY_PATH, VINTED_TAXONOMY_LEVELS, parent_col='parent_id')
+
+def __getattr__(name):
+    # Lazy module attributes kept for callers that read them directly
+    if name == 'vinted_taxonomy':
+        return get_vinted_taxonomy().frame
+    if name == 'vinted_taxonomy_index':
+        return get_vinted_taxonomy()
+    if name == 'ua':
+        return _user_agent_pool()
+    if name == 'PlaywrightVintedClient':
+        return _playwright_client_cls()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def cat_name_finder(cat_id):
-    return vinted_taxonomy[vinted_taxonomy['category_id']==cat_id]['category_name'].to_list()[0]
+    return get_vinted_taxonomy().name(cat_id)
+    
+# Column layout of vinted_api_to_df: (column, nested object key or None, field)
+VINTED_ITEM_SCHEMA = (
+    ('id', None, 'id'),
+    ('title', None, 'title'),
+    ('price_amount', 'price', 'amount'),
+    ('price_currency', 'price', 'currency_code'),
+    ('is_visible', None, 'is_visible'),
+    ('brand_title', None, 'brand_title'),
+    ('path', None, 'path'),
+    ('url', None, 'url'),
+    ('promoted', None, 'promoted'),
+    ('favourite_count', None, 'favourite_count'),
+    ('is_favourite', None, 'is_favourite'),
+    ('service_fee_amount', 'service_fee', 'amount'),
+    ('service_fee_currency', 'service_fee', 'currency_code'),
+    ('total_item_price_amount', 'total_item_price', 'amount'),
+    ('total_item_price_currency', 'total_item_price', 'currency_code'),
+    ('view_count', None, 'view_count'),
+    ('size_title', None, 'size_title'),
+    ('content_source', None, 'content_source'),
+    ('status', None, 'status'),
     
+    # User information
+    ('user_id', 'user', 'id'),
+    ('user_login', 'user', 'login'),
+    ('user_profile_url', 'user', 'profile_url'),
+    ('user_business', 'user', 'business'),
+    
+    # Main photo information
+    ('photo_id', 'photo', 'id'),
+    ('photo_width', 'photo', 'width'),
+    ('photo_height', 'photo', 'height'),
+    ('photo_url', 'photo', 'url'),
+    ('photo_dominant_color', 'photo', 'dominant_color'),
+    ('photo_is_main', 'photo', 'is_main'),
+    
+    # Item box information
+    ('item_box_first_line', 'item_box', 'first_line'),
+    ('item_box_second_line', 'item_box', 'second_line'),
+    ('item_box_accessibility_label', 'item_box', 'accessibility_label'),
+    ('item_box_item_id', 'item_box', 'item_id'),
+    
+    # Search tracking
+    ('search_score', 'search_tracking_params', 'score'),
+)
+
+VINTED_NUMERIC_COLUMNS = frozenset(['price_amount', 'service_fee_amount', 'total_item_price_amount', 
+                                    'favourite_count', 'view_count', 'photo_width', 'photo_height', 'search_score'])
+
 def vinted_api_to_df(json_data):
     """
     Convert Vinted API response to pandas DataFrame
     
+    Items are read into per-column buffers following VINTED_ITEM_SCHEMA,
+    and numeric columns are converted straight from their buffers.
+    
     Args:
         json_data: Either a JSON string or dictionary containing Vinted API response
     
@@ -218,70 +471,74 @@ def vinted_api_to_df(json_data):
     
     # Extract items array
     items = data.get('items', [])
+    if not items:
+        return pd.DataFrame()
     
-    # List to store flattened item data
-    flattened_items = []
-    
-    for item in items:
-        flattened_item = {
-            'id': item.get('id'),
-            'title': item.get('title'),
-            'price_amount': item.get('price', {}).get('amount'),
-            'price_currency': item.get('price', {}).get('currency_code'),
-            'is_visible': item.get('is_visible'),
-            'brand_title': item.get('brand_title'),
-            'path': item.get('path'),
-            'url': item.get('url'),
-            'promoted': item.get('promoted'),
-            'favourite_count': item.get('favourite_count'),
-            'is_favourite': item.get('is_favourite'),
-            'service_fee_amount': item.get('service_fee', {}).get('amount'),
-            'service_fee_currency': item.get('service_fee', {}).get('currency_code'),
-            'total_item_price_amount': item.get('total_item_price', {}).get('amount'),
-            'total_item_price_currency': item.get('total_item_price', {}).get('currency_code'),
-            'view_count': item.get('view_count'),
-            'size_title': item.get('size_title'),
-            'content_source': item.get('content_source'),
-            'status': item.get('status'),
-            
-            # User information
-            'user_id': item.get('user', {}).get('id'),
-            'user_login': item.get('user', {}).get('login'),
-            'user_profile_url': item.get('user', {}).get('profile_url'),
-            'user_business': item.get('user', {}).get('business'),
-            
-            # Main photo information
-            'photo_id': item.get('photo', {}).get('id') if item.get('photo') else None,
-            'photo_width': item.get('photo', {}).get('width') if item.get('photo') else None,
-            'photo_height': item.get('photo', {}).get('height') if item.get('photo') else None,
-            'photo_url': item.get('photo', {}).get('url') if item.get('photo') else None,
-            'photo_dominant_color': item.get('photo', {}).get('dominant_color') if item.get('photo') else None,
-            'photo_is_main': item.get('photo', {}).get('is_main') if item.get('photo') else None,
-            
-            # Item box information
-            'item_box_first_line': item.get('item_box', {}).get('first_line'),
-            'item_box_second_line': item.get('item_box', {}).get('second_line'),
-            'item_box_accessibility_label': item.get('item_box', {}).get('accessibility_label'),
-            'item_box_item_id': item.get('item_box', {}).get('item_id'),
-            
-            # Search tracking
-            'search_score': item.get('search_tracking_params', {}).get('score'),
-        }
-        
-        flattened_items.append(flattened_item)
-    
-    # Create DataFrame
-    df = pd.DataFrame(flattened_items)
-    
-    # Convert numeric columns to appropriate types
-    numeric_columns = ['price_amount', 'service_fee_amount', 'total_item_price_amount', 
-                      'favourite_count', 'view_count', 'photo_width', 'photo_height', 'search_score']
+    # Resolve each nested object once per item, then fill every column buffer
+    # with a tight comprehension over the resolved objects
+    nested = {parent: [item.get(parent) or {} for item in items]
+              for parent in dict.fromkeys(p for _, p, _ in VINTED_ITEM_SCHEMA if p is not None)}
+    columns = {}
+    for name, parent, key in VINTED_ITEM_SCHEMA:
+        source = items if parent is None else nested[parent]
+        columns[name] = [obj.get(key) for obj in source]
     
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Create typed columns directly from the buffers
+    return pd.DataFrame({
+        name: (pd.to_numeric(values, errors='coerce') if name in VINTED_NUMERIC_COLUMNS else values)
+        for name, values in columns.items()
+    })
+
+_identity_store = None
+
+def get_identity_store() -> IdentityStore:
+    """Saved warmed identities (cookies, headers, browser storage_state)."""
+    global _identity_store
+    if _identity_store is None:
+        _identity_store = IdentityStore(IDENTITY_DIR)
+    return _identity_store
+
+def _identity_name(proxy) -> str:
+    # Cookies may be bound to the exit IP, so identities are kept per proxy
+    return f"requests-{proxy or 'direct'}"
+
+def hydrate_from_store(session, proxy=None) -> bool:
+    """Load a saved warmed identity into the session; False when none is fresh."""
+    identity = get_identity_store().load(_identity_name(proxy or _session_proxy(session)))
+    if identity is None:
+        return False
+    hydrate_session(session, identity)
+    release_curl_client(session)
+    age = time.time() - identity['saved_at']
+    print(f"Reusing saved identity ({len(identity['cookies'])} cookies, {age / 60:.0f} min old)")
+    return True
+
+def save_session_identity(session) -> None:
+    headers = {k: v for k, v in session.headers.items() if k.lower() not in _VOLATILE_HEADERS}
+    proxy = _session_proxy(session)
+    get_identity_store().save(_identity_name(proxy), cookies=session_cookies(session), headers=headers, proxy=proxy)
+
+def drop_session_identity(session) -> None:
+    """Forget the saved identity of a session that got blocked or logged out."""
+    get_identity_store().delete(_identity_name(_session_proxy(session)))
+
+def apply_session_proxy(session, proxy) -> None:
+    """Route the session through proxy (no-op for a direct connection)."""
+    if not proxy:
+        print("Using direct connection (local IP)")
+        return
+    session.proxies.update({'http': proxy, 'https': proxy})
     
-    return df
+    # Handle SSL verification based on session type
+    if hasattr(session, 'cloudflareChallenge'):
+        # This is a cloudscraper session - don't modify SSL settings
+        print(f"Using proxy with cloudscraper: {proxy}")
+    else:
+        # This is a regular requests session - disable SSL verification
+        session.verify = False
+        import urllib3
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        print(f"Using proxy with regular session: {proxy}")
 
 def create_new_session():
     """
@@ -320,38 +577,38 @@ def create_new_session():
         "pragma": "no-cache"
     })
     
+    # Identities are kept per exit IP: pick the proxy before loading or saving one
+    proxy = get_working_proxy()
+    apply_session_proxy(session, proxy)
+    
+    # Reuse a saved warmed identity instead of simulating a browser session
+    if hydrate_from_store(session, proxy):
+        return session
+    
     # Simulate browser session for the new session
     if not simulate_browser_session(session):
         print("Failed to simulate browser session for new session")
         return None
+    save_session_identity(session)
         
     return session
 
 def handle_rate_limiting(session, retry_count=0, max_retries=3, response=None):
     """
-    Handle rate limiting by implementing exponential backoff
+    Handle rate limiting by waiting out the shared limiter's throttle window
+    (Retry-After aware, doubling cooldown otherwise), then refreshing cookies
     """
     if retry_count >= max_retries:
         print("Max retries reached for rate limiting")
         return False
     
-    wait_time = 60 * (2 ** retry_count)  # Exponential backoff default
-    # Use Retry-After header if present
-    try:
-        if response is not None:
-            ra = response.headers.get('Retry-After')
-            if ra:
-                if re.fullmatch(r"\d+", ra):
-                    wait_time = max(wait_time, int(ra))
-                else:
-                    # HTTP-date format
-                    from email.utils import parsedate_to_datetime
-                    ra_dt = parsedate_to_datetime(ra)
-                    wait_time = max(wait_time, int((ra_dt - datetime.utcnow()).total_seconds()))
-    except Exception:
-        pass
-    print(f"Rate limited. Waiting {wait_time} seconds before retry {retry_count + 1}/{max_retries}...")
-    time.sleep(wait_time)
+    identity = _limiter_identity(session)
+    if response is None:
+        # No fresh 429 was reported to the limiter: escalate the cooldown
+        rate_limiter.on_throttle(VINTED_CATALOG_ENDPOINT, identity)
+    wait_time = rate_limiter.state(VINTED_CATALOG_ENDPOINT, identity)['blocked_for']
+    print(f"Rate limited. Waiting {wait_time:.0f} seconds before retry {retry_count + 1}/{max_retries}...")
+    rate_limiter.wait_ready(VINTED_CATALOG_ENDPOINT, identity)
     
     # Refresh cookies after waiting
     if refresh_session_cookies(session):
@@ -371,11 +628,11 @@ def test_vinted_connection():
 
     # Final fallback: try Playwright session (browser-context)
     try:
-        pw = get_playwright_client(get_working_proxy())
+        pw = get_playwright_client()
         if pw is not None:
             # Use cookie-seeded requests session to test API endpoint
             sess = pw.get_cookies_and_ua_session()
-            r = sess.get("https://www.vinted.fr/api/v2/catalog/items?page=1&per_page=1", timeout=30)
+            r = sess.get(f"{VINTED_BASE_URL}/api/v2/catalog/items?page=1&per_page=1", timeout=30)
             if r.status_code == 200:
                 print("✅ Playwright context can access Vinted")
                 return True
@@ -394,23 +651,23 @@ def simulate_browser_session(session, cat_id: int | None = None, brand_id: int |
         print("Simulating browser session...")
         
         # Step 1: Visit main page
-        time.sleep(random.uniform(2, 4))
-        main_response = session.get("https://www.vinted.fr/", timeout=30)
+        metered_sleep(random.uniform(2, 4), 'vinted', 'warmup', 'dwell')
+        main_response = session.get(f"{VINTED_BASE_URL}/", timeout=30)
         if main_response.status_code != 200:
             print(f"Failed to access main page: {main_response.status_code}")
             return False
             
         # Step 2: Visit search page to get search tokens
-        time.sleep(random.uniform(1, 3))
-        search_response = session.get("https://www.vinted.fr/catalog", timeout=30)
+        metered_sleep(random.uniform(1, 3), 'vinted', 'warmup', 'dwell')
+        search_response = session.get(f"{VINTED_BASE_URL}/catalog", timeout=30)
         if search_response.status_code != 200:
             print(f"Failed to access search page: {search_response.status_code}")
             return False
             
         # Step 3: Visit a specific category/brand page to get category-specific tokens
-        time.sleep(random.uniform(1, 3))
+        metered_sleep(random.uniform(1, 3), 'vinted', 'warmup', 'dwell')
         target_cat = 221 if cat_id is None else cat_id
-        url = f"https://www.vinted.fr/catalog?catalog[]={target_cat}"
+        url = f"{VINTED_BASE_URL}/catalog?catalog[]={target_cat}"
         if brand_id is not None:
             url += f"&brand_ids[]={brand_id}"
         category_response = session.get(url, timeout=30)
@@ -419,8 +676,8 @@ def simulate_browser_session(session, cat_id: int | None = None, brand_id: int |
             return False
             
         # Step 4: Visit the API endpoint directly to get API tokens
-        time.sleep(random.uniform(1, 2))
-        api_test_response = session.get("https://www.vinted.fr/api/v2/catalog/items?page=1&per_page=20", timeout=30)
+        metered_sleep(random.uniform(1, 2), 'vinted', 'warmup', 'dwell')
+        api_test_response = session.get(f"{VINTED_BASE_URL}/api/v2/catalog/items?page=1&per_page=20", timeout=30)
         if api_test_response.status_code != 200:
             print(f"Failed to access API endpoint: {api_test_response.status_code}")
             # Don't fail completely, just warn
@@ -439,10 +696,10 @@ def refresh_session_cookies(session):
     """
     try:
         # Add random delay
-        time.sleep(random.uniform(2, 5))
+        metered_sleep(random.uniform(2, 5), 'vinted', 'warmup', 'dwell')
         
         # Visit main page
-        main_response = session.get("https://www.vinted.fr/", timeout=30)
+        main_response = session.get(f"{VINTED_BASE_URL}/", timeout=30)
         if main_response.status_code != 200:
             print(f"Failed to access main page: {main_response.status_code}")
             # Try with different approach
@@ -455,7 +712,7 @@ def refresh_session_cookies(session):
                     "sec-fetch-site": "none",
                     "sec-fetch-user": "?1"
                 })
-                main_response = session.get("https://www.vinted.fr/", timeout=30)
+                main_response = session.get(f"{VINTED_BASE_URL}/", timeout=30)
                 if main_response.status_code != 200:
                     print(f"Still failed to access main page: {main_response.status_code}")
                     return False
@@ -464,15 +721,17 @@ def refresh_session_cookies(session):
                 return False
             
         # Add delay between requests
-        time.sleep(random.uniform(1, 3))
+        metered_sleep(random.uniform(1, 3), 'vinted', 'warmup', 'dwell')
             
         # Visit catalog page to get additional cookies
-        catalog_response = session.get("https://www.vinted.fr/catalog", timeout=30)
+        catalog_response = session.get(f"{VINTED_BASE_URL}/catalog", timeout=30)
         if catalog_response.status_code != 200:
             print(f"Failed to access catalog page: {catalog_response.status_code}")
             # Don't fail completely, just warn
             print("Warning: Could not access catalog page, continuing anyway")
             
+        # Pooled curl clients hold their own cookie jar; re-seed on next use
+        release_curl_client(session)
         print("Session cookies refreshed successfully")
         return True
         
@@ -480,36 +739,232 @@ def refresh_session_cookies(session):
         print(f"Error refreshing cookies: {e}")
         return False
 
+# Long-lived curl-cffi clients, one per (requests session, proxy) identity.
+# Reusing the curl handle keeps connections alive and lets libcurl resume
+# TLS sessions instead of paying a full handshake on every catalog page.
+_curl_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_curl_clients_lock = threading.Lock()
+# Headers that legitimately change per request; everything else is copied
+# once when the pooled client is created.
+_VOLATILE_HEADERS = ('referer', 'origin', 'x-anon-id')
+
+def _session_proxy(session):
+    proxies = getattr(session, 'proxies', None) or {}
+    return proxies.get('https') or proxies.get('http')
+
+def get_curl_client(session):
+    """Return the pooled curl-cffi client for this session/proxy identity."""
+    proxy = _session_proxy(session)
+    with _curl_clients_lock:
+        per_session = _curl_clients.setdefault(session, {})
+        client = per_session.get(proxy)
+        if client is None:
+            client = _curl_requests().Session(
+                impersonate="chrome",
+                headers={k: v for k, v in session.headers.items() if k.lower() not in _VOLATILE_HEADERS},
+                cookies={c.name: c.value for c in session.cookies},
+                proxies={'http': proxy, 'https': proxy} if proxy else None,
+                verify=getattr(session, 'verify', True),
+            )
+            per_session[proxy] = client
+    return client
+
+def release_curl_client(session) -> None:
+    """Drop pooled clients for a session whose identity (headers/cookies) changed."""
+    with _curl_clients_lock:
+        per_session = _curl_clients.pop(session, None) or {}
+    for client in per_session.values():
+        try:
+            client.close()
+        except Exception:
+            pass
+
+def close_curl_clients() -> None:
+    """Shutdown hook: close every pooled curl-cffi client."""
+    with _curl_clients_lock:
+        pools = list(_curl_clients.values())
+        _curl_clients.clear()
+    for per_session in pools:
+        for client in per_session.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+
+atexit.register(close_curl_clients)
+
 def _requests_like_get(session, url, params=None, timeout=30):
-    if _CURL_AVAILABLE:
+    if _curl_requests() is not None:
         try:
-            # Use Chromium JA3/tls fingerprint; http2=True defaults to h2
-            with curl_requests.Session(impersonate="chrome", http2=True) as s:
-                s.headers.update(session.headers)
-                if getattr(session, 'proxies', None):
-                    s.proxies.update(session.proxies)
-                resp = s.get(url, params=params, timeout=timeout)
-                class _R:
-                    pass
-                r = _R()
-                r.status_code = resp.status_code
-                r.headers = resp.headers
-                r.text = resp.text
-                def _json():
-                    try:
-                        return resp.json()
-                    except Exception:
-                        return {}
-                r.json = _json
-                r.request = type('rq', (), { 'url': resp.url, 'method': 'GET', 'headers': s.headers })
-                return r
+            # Use Chromium JA3/tls fingerprint; chrome impersonation negotiates h2
+            s = get_curl_client(session)
+            headers = {k: session.headers[k] for k in _VOLATILE_HEADERS if k in session.headers}
+            merged_params = {**(getattr(session, 'params', None) or {}), **(params or {})}
+            resp = s.get(url, params=merged_params, headers=headers, timeout=timeout)
+            class _R:
+                pass
+            r = _R()
+            r.status_code = resp.status_code
+            r.headers = resp.headers
+            r.text = resp.text
+            r.content = resp.content
+            def _json():
+                try:
+                    return resp.json()
+                except Exception:
+                    return {}
+            r.json = _json
+            r.request = type('rq', (), { 'url': resp.url, 'method': 'GET', 'headers': {**s.headers, **headers} })
+            return r
         except Exception:
             pass
     return session.get(url, params=params, timeout=timeout)
 
-def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True, proxy=None, order: str | None = None, save_raw: bool = True):    
+def build_catalog_query(page_nb, cat_id, brand_id, order: str | None = None, per_page: int = 96, shard: dict | None = None):
+    """Build the catalog querystring and matching referer for one page.
+    A shard's price_from / price_to / status_ids narrow the query."""
+    current_timestamp = int(datetime.today().timestamp())
+    querystring = {
+        "page": str(page_nb),
+        "per_page": str(per_page),
+        "time": str(current_timestamp),
+        "search_text": "",
+        "catalog_ids": str(cat_id),
+        "order": (order or "relevance"),
+        "catalog_from": "0",
+        "size_ids": "",
+        "brand_ids": str(brand_id),
+        "status_ids": "",
+        "color_ids": "",
+        "material_ids": ""
+    }
+    querystring.update({k: str(v) for k, v in (shard or {}).items() if v is not None})
+    
+    # Set referer based on page number (use specific catalog/brand page even for first page)
+    base_ref = f'{VINTED_BASE_URL}/catalog?time={current_timestamp}&catalog[]={cat_id}&catalog_from=0&brand_ids[]={brand_id}'
+    referer = base_ref if page_nb == 1 else f'{base_ref}&page={page_nb-1}'
+    return querystring, referer
+
+def vinted_category_count(brand_id, cat_id, session, order: str | None = None, shard: dict | None = None) -> int | None:
+    """Items listed for one brand/category (or shard of it), from a count-only (one-item) catalog request."""
+    querystring, referer = build_catalog_query(1, cat_id, brand_id, order=order,
+                                               per_page=vinted_query_profile('count-only')['per_page'], shard=shard)
+    session.headers.update({"referer": referer, "origin": VINTED_BASE_URL})
+    identity = _limiter_identity(session)
+    rate_limiter.acquire(VINTED_CATALOG_ENDPOINT, identity)
+    started = time.perf_counter()
+    try:
+        response = _requests_like_get(session, CATALOG_API_URL, params=querystring, timeout=30)
+    except Exception as e:
+        rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, identity)
+        observe_request('vinted', 'catalog', identity, None, time.perf_counter() - started)
+        print(f"Count request failed for category {cat_id}: {e}")
+        return None
+    rate_limiter.feedback(VINTED_CATALOG_ENDPOINT, identity, response.status_code, response.headers)
+    observe_request('vinted', 'catalog', identity, response.status_code, time.perf_counter() - started,
+                    len(response.content or b''), query_profile='count-only')
+    if response.status_code != 200:
+        return None
+    try:
+        return int(response.json()['pagination']['total_entries'])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def split_vinted_shard(shard: dict) -> tuple[list[dict], bool]:
+    """Sub-shards covering a shard, and whether their counts add up to its count.
+
+    Price ranges are bisected first (in log space, as listings cluster at low
+    prices, on cent boundaries); a single-price shard is split by status.
+    Returns ([], False) when nothing is left to split on.
+    """
+    lo = float(shard.get('price_from') or 0)
+    hi = shard.get('price_to')
+    top = float(hi) if hi is not None else max(VINTED_SHARD_MAX_PRICE, lo * 4)
+    if hi is None or round(top - lo, 2) >= 0.01:
+        mid = (lo + top) / 2 if top <= 2 * max(lo, 1.0) else math.sqrt(max(lo, 1.0) * top)
+        mid = min(max(round(mid, 2), lo), round(top - 0.01, 2))
+        return [{**shard, 'price_from': lo, 'price_to': mid},
+                {**shard, 'price_from': round(mid + 0.01, 2), 'price_to': hi}], True
+    if 'status_ids' not in shard:
+        return [{**shard, 'status_ids': s} for s in VINTED_STATUS_IDS], True
+    return [], False
+
+def plan_vinted_shards(brand_id, cat_id, session, total: int | None = None, order: str | None = None, per_page: int = 96) -> list[tuple[dict, int]]:
+    """Split a brand/category query over the page cap into shards that each fit under it.
+
+    Counts come from count-only requests (pagination totals); only shards
+    over the cap are split again, and when the parts of a split add up to
+    the whole, the last part's count is derived instead of requested.
+    Returns [(shard, item_count), ...] in price order.
+    """
+    cap = VINTED_PAGE_CAP * per_page
+    shards: list[tuple[dict, int]] = []
+    count_requests = 0
+    pending: list[tuple[dict, int | None]] = [({'price_from': 0, 'price_to': None}, total)]
+    while pending:
+        shard, count = pending.pop()
+        if count is None:
+            count = vinted_category_count(brand_id, cat_id, session, order=order, shard=shard)
+            count_requests += 1
+            if count is None:
+                print(f"Could not count shard {shard} of category {cat_id}, crawling it up to the page cap")
+                shards.append((shard, cap))
+                continue
+        if count == 0:
+            continue
+        if count <= cap:
+            shards.append((shard, count))
+            continue
+        children, exhaustive = split_vinted_shard(shard)
+        if not children:
+            print(f"Shard {shard} of category {cat_id} still has {count} items; keeping the first {cap}")
+            shards.append((shard, count))
+            continue
+        counts: list[int | None] = [None] * len(children)
+        if exhaustive:
+            for k, child in enumerate(children[:-1]):
+                counts[k] = vinted_category_count(brand_id, cat_id, session, order=order, shard=child)
+                count_requests += 1
+            if None not in counts[:-1]:
+                rest = count - sum(counts[:-1])
+                # Listings come and go between requests: count a non-positive remainder for real
+                counts[-1] = rest if rest > 0 else None
+        pending.extend(reversed(list(zip(children, counts))))
+    print(f"Category {cat_id}: {len(shards)} shards, {sum(c for _, c in shards)} items "
+          f"({count_requests} count requests)")
+    return shards
+
+def catalog_page_to_df(data, cat_id):
+    """Convert one catalog API payload to a DataFrame tagged with its category.
+    The query's pagination total_entries is kept in df.attrs."""
+    started = time.perf_counter()
+    with profiler.stage('vinted_api_to_df'):
+        df = vinted_api_to_df(data)
+    df['category_id'] = cat_id
+    df['category_name'] = cat_name_finder(cat_id)
+    try:
+        df.attrs['total_entries'] = int(data['pagination']['total_entries'])
+    except (KeyError, TypeError, ValueError):
+        pass
+    observe_parse('vinted', 'catalog', len(df), time.perf_counter() - started)
+    return df
+
+def is_saturated(df: pd.DataFrame, query_profile: str | None = None) -> bool:
+    """True when a first page reports more items than the page cap lets a crawl reach."""
+    total = df.attrs.get('total_entries') if df is not None else None
+    return total is not None and total > VINTED_PAGE_CAP * vinted_query_profile(query_profile)['per_page']
+
+def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True, proxy=None, order: str | None = None, save_raw: bool = True, query_profile: str | None = None, shard: dict | None = None):    
+    query_profile = query_profile or VINTED_QUERY_PROFILE
+    profile = vinted_query_profile(query_profile)
+    save_raw = save_raw and profile['archive_raw']
+    # The Playwright client only builds unfiltered catalog queries
+    use_playwright = use_playwright and not shard
+    # Configure proxy if needed
+    proxy = get_working_proxy()
     # Create a session if not provided
-    if session is None:
+    new_session = session is None
+    if new_session:
         # Try to use cloudscraper first, fallback to regular session
         try:
             session = cloudscraper.create_scraper(
@@ -540,101 +995,90 @@ def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True,
             "cache-control": "no-cache",
             "pragma": "no-cache"
         })
-        
-        # Add random delay before first request
-        time.sleep(random.uniform(1, 3))
-        
-        # Simulate a real browser session
+    apply_session_proxy(session, proxy)
+    
+    # Simulate a real browser session, unless a saved warmed identity is available for this proxy
+    if new_session and not hydrate_from_store(session, proxy):
         if not simulate_browser_session(session, cat_id=cat_id, brand_id=brand_id):
             return pd.DataFrame(), False
-
-    # Configure proxy if needed
-    proxy = get_working_proxy()
-    if proxy:
-        proxies = {'http': proxy, 'https': proxy}
-        session.proxies.update(proxies)
-        
-        # Handle SSL verification based on session type
-        if hasattr(session, 'cloudflareChallenge'):
-            # This is a cloudscraper session - don't modify SSL settings
-            print(f"Using proxy with cloudscraper: {proxy}")
-        else:
-            # This is a regular requests session - disable SSL verification
-            session.verify = False
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            print(f"Using proxy with regular session: {proxy}")
-    else:
-        print("Using direct connection (local IP)")
+        save_session_identity(session)
     
-    url = "https://www.vinted.fr/api/v2/catalog/items"
+    url = CATALOG_API_URL
+    querystring, referer = build_catalog_query(page_nb, cat_id, brand_id, order=order, per_page=profile['per_page'], shard=shard)
     
-    # Build query parameters
-    current_timestamp = int(datetime.today().timestamp())
-    querystring = {
-        "page": str(page_nb),
-        "per_page": "96",
-        "time": str(current_timestamp),
-        "search_text": "",
-        "catalog_ids": str(cat_id),
-        "order": (order or "relevance"),
-        "catalog_from": "0",
-        "size_ids": "",
-        "brand_ids": str(brand_id),
-        "status_ids": "",
-        "color_ids": "",
-        "material_ids": ""
-    }
-    
-    # Set referer based on page number (use specific catalog/brand page even for first page)
-    base_ref = f'https://www.vinted.fr/catalog?time={current_timestamp}&catalog[]={cat_id}&catalog_from=0&brand_ids[]={brand_id}'
-    referer = base_ref if page_nb == 1 else f'{base_ref}&page={page_nb-1}'
-    
-    # Update session headers for this request
     # Update session headers for this request and add Origin
     session.headers.update({
         "referer": referer,
-        "origin": "https://www.vinted.fr"
+        "origin": VINTED_BASE_URL
     })
     
     # Handle anon_id cookie carefully to avoid conflicts
     ensure_anon_id(session)
     
+    def paced_get():
+        # Every catalog request waits for the shared limiter and reports back
+        identity = _limiter_identity(session)
+        rate_limiter.acquire(VINTED_CATALOG_ENDPOINT, identity)
+        started = time.perf_counter()
+        try:
+            r = session.get(url, params=querystring, timeout=30)
+        except Exception:
+            rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, identity)
+            observe_request('vinted', 'catalog', identity, None, time.perf_counter() - started)
+            raise
+        rate_limiter.feedback(VINTED_CATALOG_ENDPOINT, identity, r.status_code, r.headers)
+        observe_request('vinted', 'catalog', identity, r.status_code, time.perf_counter() - started, len(r.content or b''),
+                        query_profile=query_profile)
+        return r
+    
     # Make the API request with retry logic
     max_retries = 3
     response = None
     
     for retry in range(max_retries):
         try:
-            if use_playwright and PlaywrightVintedClient is not None:
+            if use_playwright and _playwright_client_cls() is not None:
                 for attempt_pw in range(2):
                     try:
-                        pw = get_playwright_client(proxy)
+                        pw = get_playwright_client()
                         if pw is None:
                             break
-                        data = pw.fetch_catalog_items(page_nb, cat_id, brand_id, per_page=96)
+                        rate_limiter.acquire(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
+                        started = time.perf_counter()
+                        data = pw.fetch_catalog_items(page_nb, cat_id, brand_id, per_page=profile['per_page'])
+                        playwright_feedback([data], time.perf_counter() - started)
                         if isinstance(data, dict) and data.get('items') is not None:
-                            df = vinted_api_to_df(data)
-                            df['category_id'] = cat_id
-                            df['category_name'] = cat_name_finder(cat_id)
-                            return df, True
+                            return catalog_page_to_df(data, cat_id), True
                         else:
                             print(f"Playwright fetch failed or blocked (attempt {attempt_pw+1}): {str(data)[:200]}")
                     except Exception as e:
+                        rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
                         print(f"Playwright error (attempt {attempt_pw+1}): {e}")
-                    # Reset playwright and retry once on error/empty
+                    # The pool recycles the failing context; retry once on error/empty
                     if attempt_pw == 0:
-                        reset_playwright_client(proxy)
-                        time.sleep(random.uniform(1, 2))
+                        count_retry('vinted', 'catalog', 'playwright')
                         continue
                     break
                 # fall through to requests mode
+                count_playwright_fallback('vinted', 'failed')
+            identity = _limiter_identity(session)
+            rate_limiter.acquire(VINTED_CATALOG_ENDPOINT, identity)
+            started = time.perf_counter()
             response = _requests_like_get(session, url, params=querystring, timeout=30)
+            elapsed = time.perf_counter() - started
+            rate_limiter.feedback(VINTED_CATALOG_ENDPOINT, identity, response.status_code, response.headers)
+            report_proxy_result(_session_proxy(session), response.status_code != 403, elapsed)
+            observe_request('vinted', 'catalog', identity, response.status_code, elapsed, len(response.content or b''),
+                            query_profile=query_profile)
             break  # Success, exit retry loop
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            # Exponential backoff through the limiter's error window
+            rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
+            report_proxy_result(_session_proxy(session), False)
+            observe_request('vinted', 'catalog', _limiter_identity(session), None)
             if retry < max_retries - 1:
                 print(f"Request failed (attempt {retry + 1}/{max_retries}): {e}")
-                time.sleep(2 ** retry)  # Exponential backoff
+                count_retry('vinted', 'catalog', 'transport')
                 continue
             else:
                 print(f"Request failed after {max_retries} attempts: {e}")
@@ -645,23 +1089,26 @@ def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True,
         print(f"403 Forbidden - Access denied. Response: {response.text[:200]}")
         log_response("403", response, note="Blocked at catalog endpoint")
         
-        # Invalidate proxy cache since we got blocked
-        invalidate_proxy_cache()
+        # Ban the blocked proxy and forget its identity; the pool hands out the next-best one
+        drop_session_identity(session)
+        invalidate_proxy_cache(_session_proxy(session))
         
         # Try proxy rotation first
         print("Trying proxy rotation...")
+        count_retry('vinted', 'catalog', 'status_403')
         new_proxy = get_working_proxy(force_test=True)
         if new_proxy:
             print(f"Switching to new proxy: {new_proxy}")
+            count_proxy_switch('vinted')
             session.proxies.update({'http': new_proxy, 'https': new_proxy})
-            response = session.get(url, params=querystring, timeout=30)
+            response = paced_get()
             if response.status_code == 200:
                 print("Proxy rotation successful")
             else:
                 print("Proxy rotation failed, trying anti-blocking measures...")
                 if handle_persistent_blocking(session):
                     print("Applied anti-blocking measures, retrying...")
-                    response = session.get(url, params=querystring, timeout=30)
+                    response = paced_get()
                     if response.status_code == 403:
                         print("Still blocked after all measures")
                         return pd.DataFrame(), False
@@ -672,7 +1119,7 @@ def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True,
             print("No new proxy available, trying anti-blocking measures...")
             if handle_persistent_blocking(session):
                 print("Applied anti-blocking measures, retrying...")
-                response = session.get(url, params=querystring, timeout=30)
+                response = paced_get()
                 if response.status_code == 403:
                     print("Still blocked after anti-blocking measures")
                     return pd.DataFrame(), False
@@ -682,17 +1129,26 @@ def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True,
     elif response.status_code == 429:
         print(f"429 Too Many Requests - Rate limited.")
         log_response("429", response, note="Rate limited at catalog endpoint")
-        if handle_rate_limiting(session, response=response):
-            return pd.DataFrame(), True  # Try again
-        else:
+        # Wait out the throttle window and fetch this page again: an empty page
+        # would read as the end of the category to every caller
+        for retry in range(max_retries):
+            count_retry('vinted', 'catalog', 'status_429')
+            if not handle_rate_limiting(session, response=response):
+                return pd.DataFrame(), False
+            response = paced_get()
+            if response.status_code != 429:
+                break
+        if response.status_code != 200:
+            print(f"HTTP {response.status_code} after waiting out the rate limit")
             return pd.DataFrame(), False
     elif response.status_code == 401:
         print(f"401 Unauthorized - Authentication required. Response: {response.text[:200]}")
         # Try to refresh the session and retry
         print("Attempting to refresh session...")
+        drop_session_identity(session)
         session = create_new_session()
         if session:
-            response = session.get(url, params=querystring, timeout=30)
+            response = paced_get()
             if response.status_code == 401:
                 print("Still getting 401 after session refresh")
                 return pd.DataFrame(), False
@@ -703,59 +1159,412 @@ def cat_api_caller(page_nb, cat_id, brand_id, session=None, use_playwright=True,
         return pd.DataFrame(), False
         
     # Parse JSON response
-    data = response.json()
+    with profiler.stage('json_decode'):
+        data = response.json()
     if save_raw:
-        try:
-            save_raw_json(data, brand_id, cat_id, page_nb)
-        except Exception:
-            pass
+        save_raw_json(data, brand_id, cat_id, page_nb, raw=response.content)
     
     if not data.get('items') or len(data['items']) == 0:
         print('No more items')
         return pd.DataFrame(), False
     
     # Convert to DataFrame
-    df = vinted_api_to_df(data)
-    df['category_id'] = cat_id
-    df['category_name'] = cat_name_finder(cat_id)
-    
-    return df, True
+    return catalog_page_to_df(data, cat_id), True
 
-def run_brand_category_collection(brand_id: int, category_ids: list[int], pages: int = 10, mode: str = 'delta', use_playwright: bool = True, order: str | None = None):
+def _new_rows(seen: SeenIndex, df: pd.DataFrame) -> pd.DataFrame:
+    with profiler.stage('dedup'):
+        ids = _page_ids(df)
+        valid = ids.notna().to_numpy()
+        keep = ~valid
+        keep[valid] = seen.add(ids[valid].astype('int64').to_numpy())
+        return df if keep.all() else df[keep]
+
+class CategoryDeltaState:
+    """Delta-crawl bookkeeping for one (brand, category) pair.
+
+    Shared by the sequential and the asyncio crawlers so both stop on the
+    same page and persist the same last-seen id. In delta mode a crawl also
+    stops once DELTA_KNOWN_RATIO of a page is in the brand's seen index
+    (ids from earlier runs only), so a deleted or re-ranked last-seen item
+    no longer costs the full page budget.
+    """
+    def __init__(self, brand_id: int, cat_id: int, mode: str = 'delta', seen: SeenIndex | None = None):
+        self.brand_id = brand_id
+        self.cat_id = cat_id
+        self.mode = mode
+        self.last_seen = read_last_seen(brand_id, cat_id) if mode == 'delta' else None
+        self.new_top_id = None
+        self.seen = seen if seen is not None else get_seen_index(brand_id)
+
+    def observe(self, page: int, df: pd.DataFrame) -> bool:
+        """Record a collected page; return True when the crawl should stop."""
+        if page == 1:
+            try:
+                self.new_top_id = int(df['id'].iloc[0])
+            except Exception:
+                self.new_top_id = None
+        if self.mode != 'delta':
+            return False
+        try:
+            ids = _page_ids(df).dropna().astype('int64').to_numpy()
+        except Exception:
+            return False
+        if self.last_seen is not None and (ids == int(self.last_seen)).any():
+            print("Reached last-seen item, stopping delta crawl for this category")
+            return True
+        if len(ids) and self.seen.stored:
+            known = float(self.seen.contains(ids, include_run=False).mean())
+            if known >= DELTA_KNOWN_RATIO:
+                print(f"{known:.0%} of page {page} already collected, stopping delta crawl for this category")
+                return True
+        return False
+
+    def new_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Drop rows already collected earlier in this run (other pages or categories).
+
+        Items stored by earlier runs are kept; the stored index only drives
+        the delta stop in observe().
+        """
+        return _new_rows(self.seen, df)
+
+    def commit(self) -> None:
+        if self.mode == 'delta' and self.new_top_id is not None:
+            write_last_seen(self.brand_id, self.cat_id, self.new_top_id)
+
+def run_brand_category_collection(brand_id: int, category_ids: list[int], pages: int = VINTED_PAGE_CAP, mode: str = 'delta', use_playwright: bool = True, order: str | None = None, concurrency: int = 1, per_host_concurrency: int | None = None, query_profile: str | None = None):
     session = create_robust_session()
     if session is None:
         print("Failed to create a working session. Exiting.")
         return pd.DataFrame()
-    full_df = pd.DataFrame()
+    if concurrency > 1:
+        return asyncio.run(run_brand_category_collection_async(
+            brand_id, category_ids, session, pages=pages, mode=mode, order=order,
+            concurrency=concurrency, per_host_concurrency=per_host_concurrency,
+            use_playwright=use_playwright, query_profile=query_profile))
+    results = ResultAccumulator()
     for cat_id in category_ids:
         print(f"Collecting brand {brand_id}, category {cat_id} in {mode} mode")
-        last_seen = read_last_seen(brand_id, cat_id) if mode == 'delta' else None
-        new_top_id = None
-        stop = False
-        for page in range(1, pages + 1):
-            df, cont = cat_api_caller(page, cat_id, brand_id, session=session, use_playwright=use_playwright, order=order)
+        delta = CategoryDeltaState(brand_id, cat_id, mode)
+        for page, df, cont in iter_category_pages(brand_id, cat_id, pages, session, use_playwright=use_playwright, order=order, query_profile=query_profile):
             if df is None or len(df) == 0:
                 print("No data, stopping")
                 break
-            if page == 1:
-                try:
-                    new_top_id = int(df['id'].iloc[0])
-                except Exception:
-                    new_top_id = None
-            if last_seen is not None:
-                try:
-                    if int(last_seen) in set(df['id'].astype(int).tolist()):
-                        print("Reached last-seen item, stopping delta crawl for this category")
-                        stop = True
-                except Exception:
-                    pass
-            full_df = pd.concat([full_df, df])
+            stop = delta.observe(page, df)
+            results.add(delta.new_rows(df))
+            if page == 1 and mode == 'full' and is_saturated(df, query_profile):
+                # More listings than the page cap reaches: crawl price shards instead
+                shards = plan_vinted_shards(brand_id, cat_id, session, total=df.attrs['total_entries'], order=order,
+                                            per_page=vinted_query_profile(query_profile)['per_page'])
+                for _, _, shard_df, _ in iter_shard_pages(brand_id, cat_id, shards, session, pages, order=order, query_profile=query_profile):
+                    # The seen index drops listings already collected from page 1 or another shard
+                    results.add(delta.new_rows(shard_df))
+                break
             if stop or not cont:
                 break
-            time.sleep(random.uniform(0.4, 1.2))
-        if mode == 'delta' and new_top_id is not None:
-            write_last_seen(brand_id, cat_id, new_top_id)
-    return full_df
+        delta.commit()
+    flush_seen_index(brand_id)
+    return results.to_frame()
+
+def fetch_shard_page(page, cat_id, brand_id, session, shard: dict, order: str | None = None, query_profile: str | None = None, attempts: int = 3):
+    """One shard page through cat_api_caller, retried with limiter backoff.
+
+    The plan says how many pages a shard has, so an empty page inside it is
+    a failure (network error, throttling that outlasted cat_api_caller's
+    own retries), not the end of the shard.
+    """
+    for attempt in range(attempts):
+        df, cont = cat_api_caller(page, cat_id, brand_id, session=session, use_playwright=False, order=order,
+                                  query_profile=query_profile, shard=shard)
+        if df is not None and len(df) > 0:
+            return df, cont
+        if attempt < attempts - 1:
+            count_retry('vinted', 'catalog', 'empty_shard_page')
+            rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
+    return df, cont
+
+def iter_shard_pages(brand_id: int, cat_id: int, shards: list[tuple[dict, int]], session, pages: int = VINTED_PAGE_CAP, order: str | None = None, query_profile: str | None = None):
+    """Yield (shard index, page_nb, df, continuation) for every page of planned shards.
+
+    Page counts come from the plan, so a shard stops on its last page
+    instead of requesting an empty one. Shards go through the requests path.
+    """
+    per_page = vinted_query_profile(query_profile)['per_page']
+    for k, (shard, count) in enumerate(shards):
+        last_page = min(pages, VINTED_PAGE_CAP, math.ceil(count / per_page))
+        for page in range(1, last_page + 1):
+            df, cont = fetch_shard_page(page, cat_id, brand_id, session, shard, order=order, query_profile=query_profile)
+            if df is None or len(df) == 0:
+                print(f"No items on page {page} of shard {shard} after retries, moving on")
+                break
+            yield k, page, df, cont
+            if not cont or len(df) < per_page:
+                break
+
+def iter_category_pages(brand_id: int, cat_id: int, pages: int, session, use_playwright: bool = True, order: str | None = None, batch_size: int | None = None, query_profile: str | None = None):
+    """Yield (page_nb, df, continuation) for pages 1..pages of one category, in order.
+
+    On the Playwright path pages are fetched batch_size at a time with one
+    in-page round-trip per batch (no navigation per page); a page the browser
+    could not get is retried through cat_api_caller's requests path.
+    Stopping the iteration early wastes at most the rest of the current batch.
+    """
+    pool = None
+    profile = vinted_query_profile(query_profile)
+    if use_playwright and order in (None, 'relevance'):
+        pool = get_playwright_client()
+    batch_size = max(1, batch_size or PLAYWRIGHT_BATCH_PAGES)
+    page = 1
+    while page <= pages:
+        if pool is None:
+            df, cont = cat_api_caller(page, cat_id, brand_id, session=session, use_playwright=use_playwright, order=order,
+                                      query_profile=query_profile)
+            yield page, df, cont
+            page += 1
+        else:
+            window = list(range(page, min(pages, page + batch_size - 1) + 1))
+            # One limiter token per page in the batch
+            rate_limiter.acquire(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY, cost=len(window))
+            try:
+                started = time.perf_counter()
+                batch = pool.fetch_catalog_items_batch([(cat_id, brand_id, p) for p in window], parallelism=batch_size)
+                playwright_feedback(batch, time.perf_counter() - started)
+            except Exception as e:
+                rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
+                print(f"Playwright batch error: {e}")
+                batch = [None] * len(window)
+            for page_nb, data in zip(window, batch):
+                if isinstance(data, dict) and data.get('items') is not None:
+                    if profile['archive_raw']:
+                        save_raw_json(data, brand_id, cat_id, page_nb)
+                    if len(data['items']) == 0:
+                        print('No more items')
+                        yield page_nb, pd.DataFrame(), False
+                        return
+                    yield page_nb, catalog_page_to_df(data, cat_id), True
+                else:
+                    print(f"Playwright fetch failed or blocked for page {page_nb}: {str(data)[:200]}")
+                    count_playwright_fallback('vinted', 'batch_page')
+                    df, cont = cat_api_caller(page_nb, cat_id, brand_id, session=session, use_playwright=False, order=order,
+                                              query_profile=query_profile)
+                    yield page_nb, df, cont
+                    if df is None or len(df) == 0 or not cont:
+                        return
+            page = window[-1] + 1
+
+class CrawlLimits:
+    """Global and per-host concurrency caps for the asyncio crawler."""
+    def __init__(self, concurrency: int, per_host_concurrency: int | None = None):
+        self._global = asyncio.Semaphore(max(1, concurrency))
+        self._per_host_limit = max(1, per_host_concurrency or concurrency)
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str):
+        host = urlsplit(url).netloc
+        host_sem = self._hosts.setdefault(host, asyncio.Semaphore(self._per_host_limit))
+        async with self._global:
+            async with host_sem:
+                yield
+
+def _open_async_client(session, concurrency: int):
+    """Open a curl-cffi AsyncSession seeded from a warmed requests session."""
+    curl_requests = _curl_requests()
+    if curl_requests is None:
+        return None
+    try:
+        return curl_requests.AsyncSession(
+            impersonate="chrome",
+            max_clients=max(1, concurrency),
+            headers=dict(session.headers),
+            cookies={c.name: c.value for c in session.cookies},
+            proxies=dict(getattr(session, 'proxies', None) or {}),
+            verify=getattr(session, 'verify', True),
+        )
+    except Exception as e:
+        print(f"curl-cffi AsyncSession unavailable, using threaded requests: {e}")
+        return None
+
+async def async_cat_api_caller(client, limits: CrawlLimits, session, page_nb, cat_id, brand_id, order: str | None = None, save_raw: bool = True, fallback_lock: asyncio.Lock | None = None, pw_pool=None, query_profile: str | None = None, shard: dict | None = None):
+    """Asyncio counterpart of cat_api_caller.
+
+    With a Playwright pool, the page is first fetched through a leased
+    browser context (pool calls block, so they run in worker threads).
+    Otherwise, or when the browser fetch fails, the requests path is used:
+    200 and 429 responses are handled in-loop; any other status falls back
+    to the sequential cat_api_caller in a worker thread, one at a time, so
+    its proxy rotation / session refresh logic still applies.
+    """
+    query_profile = query_profile or VINTED_QUERY_PROFILE
+    profile = vinted_query_profile(query_profile)
+    save_raw = save_raw and profile['archive_raw']
+    if pw_pool is not None and order in (None, 'relevance') and not shard:
+        try:
+            await rate_limiter.acquire_async(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
+            async with limits.slot(CATALOG_API_URL):
+                started = time.perf_counter()
+                data = await asyncio.to_thread(pw_pool.fetch_catalog_items, page_nb, cat_id, brand_id, profile['per_page'])
+            playwright_feedback([data], time.perf_counter() - started)
+            if isinstance(data, dict) and data.get('items') is not None:
+                if save_raw:
+                    save_raw_json(data, brand_id, cat_id, page_nb)
+                if len(data['items']) == 0:
+                    print('No more items')
+                    return pd.DataFrame(), False
+                return catalog_page_to_df(data, cat_id), True
+            print(f"Playwright fetch failed or blocked: {str(data)[:200]}")
+        except Exception as e:
+            rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, PLAYWRIGHT_IDENTITY)
+            print(f"Playwright error: {e}")
+        count_playwright_fallback('vinted', 'failed')
+    querystring, referer = build_catalog_query(page_nb, cat_id, brand_id, order=order, per_page=profile['per_page'], shard=shard)
+    params = {**(getattr(session, 'params', None) or {}), **querystring}
+    headers = {"referer": referer, "origin": VINTED_BASE_URL}
+    anon = session.cookies.get("anon_id") if hasattr(session, 'cookies') else None
+    if anon:
+        headers["x-anon-id"] = anon
+
+    max_retries = 3
+    response = None
+    identity = _limiter_identity(session)
+    for retry in range(max_retries):
+        try:
+            await rate_limiter.acquire_async(VINTED_CATALOG_ENDPOINT, identity)
+            started = time.perf_counter()
+            async with limits.slot(CATALOG_API_URL):
+                if client is not None:
+                    response = await client.get(CATALOG_API_URL, params=params, headers=headers, timeout=30)
+                else:
+                    response = await asyncio.to_thread(
+                        session.get, CATALOG_API_URL, params=querystring,
+                        headers=headers, timeout=30)
+        except Exception as e:
+            # Backoff happens in the next acquire_async
+            rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, identity)
+            observe_request('vinted', 'catalog', identity, None)
+            if retry < max_retries - 1:
+                print(f"Request failed (attempt {retry + 1}/{max_retries}): {e}")
+                count_retry('vinted', 'catalog', 'transport')
+                continue
+            print(f"Request failed after {max_retries} attempts: {e}")
+            return pd.DataFrame(), False
+        rate_limiter.feedback(VINTED_CATALOG_ENDPOINT, identity, response.status_code, response.headers)
+        observe_request('vinted', 'catalog', identity, response.status_code, time.perf_counter() - started,
+                        len(response.content or b''), query_profile=query_profile)
+        if response.status_code == 429 and retry < max_retries - 1:
+            count_retry('vinted', 'catalog', 'status_429')
+            log_response("429", response, note="Rate limited at catalog endpoint (async)")
+            wait_time = rate_limiter.state(VINTED_CATALOG_ENDPOINT, identity)['blocked_for']
+            print(f"429 on category {cat_id} page {page_nb}. Waiting {wait_time:.0f} seconds...")
+            continue
+        break
+
+    if response.status_code != 200:
+        print(f"HTTP {response.status_code} on category {cat_id} page {page_nb}, falling back to sequential caller")
+        count_retry('vinted', 'catalog', f"status_{response.status_code}")
+        lock = fallback_lock or asyncio.Lock()
+        async with lock:
+            return await asyncio.to_thread(
+                cat_api_caller, page_nb, cat_id, brand_id, session=session,
+                use_playwright=False, order=order, save_raw=save_raw, query_profile=query_profile, shard=shard)
+
+    try:
+        with profiler.stage('json_decode'):
+            data = response.json()
+    except Exception:
+        data = {}
+    if save_raw:
+        save_raw_json(data, brand_id, cat_id, page_nb, raw=response.content)
+    if not data.get('items') or len(data['items']) == 0:
+        print('No more items')
+        return pd.DataFrame(), False
+    return catalog_page_to_df(data, cat_id), True
+
+async def _fetch_shard_page_async(client, limits: CrawlLimits, session, page_nb, cat_id, brand_id, shard: dict, order: str | None, fallback_lock: asyncio.Lock, query_profile: str | None = None, attempts: int = 3):
+    """Asyncio counterpart of fetch_shard_page."""
+    for attempt in range(attempts):
+        df, cont = await async_cat_api_caller(client, limits, session, page_nb, cat_id, brand_id, order=order,
+                                              fallback_lock=fallback_lock, query_profile=query_profile, shard=shard)
+        if df is not None and len(df) > 0:
+            return df, cont
+        if attempt < attempts - 1:
+            count_retry('vinted', 'catalog', 'empty_shard_page')
+            rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
+    return df, cont
+
+async def _crawl_category_async(client, limits: CrawlLimits, session, brand_id: int, cat_id: int, pages: int, mode: str, order: str | None, fallback_lock: asyncio.Lock, pw_pool=None, query_profile: str | None = None) -> list[pd.DataFrame]:
+    """Pages of one category in crawl order, not yet deduplicated.
+
+    The caller dedups after all categories finish, so which category keeps
+    a shared item does not depend on which one fetched it first.
+    """
+    print(f"Collecting brand {brand_id}, category {cat_id} in {mode} mode")
+    delta = CategoryDeltaState(brand_id, cat_id, mode)
+    chunks: list[pd.DataFrame] = []
+    for page in range(1, pages + 1):
+        df, cont = await async_cat_api_caller(client, limits, session, page, cat_id, brand_id, order=order, fallback_lock=fallback_lock, pw_pool=pw_pool, query_profile=query_profile)
+        if df is None or len(df) == 0:
+            print(f"No data for category {cat_id}, stopping")
+            break
+        stop = delta.observe(page, df)
+        chunks.append(df)
+        if page == 1 and mode == 'full' and is_saturated(df, query_profile):
+            per_page = vinted_query_profile(query_profile)['per_page']
+            shards = await asyncio.to_thread(plan_vinted_shards, brand_id, cat_id, session, df.attrs['total_entries'],
+                                             order, per_page)
+            # The plan fixes each shard's page count, so all shard pages go
+            # through the limits at once; gather keeps them in plan order
+            jobs = [(shard, shard_page) for shard, count in shards
+                    for shard_page in range(1, min(pages, VINTED_PAGE_CAP, math.ceil(count / per_page)) + 1)]
+            results = await asyncio.gather(*[
+                _fetch_shard_page_async(client, limits, session, shard_page, cat_id, brand_id, shard, order, fallback_lock, query_profile)
+                for shard, shard_page in jobs
+            ])
+            for (shard, shard_page), (shard_df, _) in zip(jobs, results):
+                if shard_df is None or len(shard_df) == 0:
+                    print(f"No items on page {shard_page} of shard {shard} after retries, moving on")
+                    continue
+                chunks.append(shard_df)
+            break
+        if stop or not cont:
+            break
+    delta.commit()
+    return chunks
+
+async def run_brand_category_collection_async(brand_id: int, category_ids: list[int], session, pages: int = VINTED_PAGE_CAP, mode: str = 'delta', order: str | None = None, concurrency: int = 8, per_host_concurrency: int | None = None, use_playwright: bool = False, query_profile: str | None = None) -> pd.DataFrame:
+    """Crawl many categories at once under global/per-host concurrency caps.
+
+    Pages within a category stay sequential so delta mode stops exactly where
+    the sequential crawler would. Dedup runs after all categories finish, in
+    category_ids order, so the returned frame matches
+    run_brand_category_collection whatever order the pages arrived in.
+    With use_playwright, browser fetches are spread over the shared
+    Playwright pool's contexts.
+    """
+    limits = CrawlLimits(concurrency, per_host_concurrency)
+    fallback_lock = asyncio.Lock()
+    client = _open_async_client(session, concurrency)
+    pw_pool = None
+    if use_playwright:
+        proxy = get_working_proxy()
+        pw_pool = await asyncio.to_thread(get_playwright_pool, [proxy] if proxy else None, min(concurrency, PLAYWRIGHT_CONTEXTS))
+    try:
+        results = await asyncio.gather(*[
+            _crawl_category_async(client, limits, session, brand_id, cat_id, pages, mode, order, fallback_lock, pw_pool, query_profile)
+            for cat_id in category_ids
+        ], return_exceptions=True)
+    finally:
+        if client is not None:
+            await client.close()
+    seen = get_seen_index(brand_id)
+    accumulator = ResultAccumulator()
+    for cat_id, res in zip(category_ids, results):
+        if isinstance(res, BaseException):
+            print(f"Category {cat_id} failed: {res}")
+            continue
+        for df in res:
+            accumulator.add(_new_rows(seen, df))
+    flush_seen_index(brand_id)
+    return accumulator.to_frame()
 
 def parse_category_list_arg(cats_arg: str) -> list[int]:
     """Parse comma-separated category IDs or the keyword 'all'.
@@ -763,17 +1572,7 @@ def parse_category_list_arg(cats_arg: str) -> list[int]:
     if not cats_arg:
         return []
     if cats_arg.strip().lower() == 'all':
-        try:
-            return sorted(list(pd.Series(vinted_taxonomy['category_id']).dropna().astype(int).unique()))
-        except Exception:
-            # Fallback: try coercing via float then int
-            vals = []
-            for x in pd.Series(vinted_taxonomy['category_id']).dropna().tolist():
-                try:
-                    vals.append(int(float(x)))
-                except Exception:
-                    continue
-            return sorted(list(set(vals)))
+        return [cid for cid in get_vinted_taxonomy().ids() if isinstance(cid, int)]
     result: list[int] = []
     for tok in cats_arg.split(','):
         t = tok.strip()
@@ -787,32 +1586,72 @@ def parse_category_list_arg(cats_arg: str) -> list[int]:
             continue
     return result
 
+def vinted_shard_checkpoint(entries: list[dict], cat_id) -> dict | None:
+    """Shard state of a category from its checkpoint entries; None when it was not saturated.
+
+    Returns {'total': page-1 total_entries, 'plan': [(shard, count), ...] or None
+    when the plan was not saved yet, 'next': (shard index, page) to resume at}.
+    """
+    state = None
+    for entry in entries:
+        if entry.get('category_id') != cat_id:
+            continue
+        if entry.get('saturated_total') is not None:
+            state = {'total': entry['saturated_total'], 'plan': None, 'next': (0, 1)}
+        elif state is None:
+            continue
+        elif entry.get('shard_plan') is not None:
+            state['plan'] = [(shard, count) for shard, count in entry['shard_plan']]
+            state['next'] = (0, 1)
+        elif isinstance(entry.get('shard'), dict) and state['plan']:
+            shards = [shard for shard, _ in state['plan']]
+            if entry['shard'] in shards:
+                state['next'] = (shards.index(entry['shard']), entry['page_nb'] + 1)
+    return state
+
 def full_vinted_cat_api_caller(brand_id, start_id=None, total_page_nb=None, auto_resume=True):
     """
     Main function to collect Vinted data with automatic resumption
     """
+    # Append-only page checkpoints (one segment per page + manifest)
+    store = CheckpointStore(RAW_DATA_DIR / f"{brand_id}_checkpoint")
+    start_page = 1
+    start_shards = None
+    
     # Auto-detect last position if not specified
     if auto_resume and start_id is None and total_page_nb is None:
-        detected_cat_id, detected_cat_name, detected_pages = detect_last_position(brand_id)
-        if detected_cat_id is not None:
-            print(f"Auto-resuming from category {detected_cat_id} ({detected_cat_name})")
-            start_id = detected_cat_id
-            
-            # Get the total page number from the latest file
-            import glob
-            import os
-            pattern = f"../data/vinted_tests/raw_data/{brand_id}_*.csv"
-            files = glob.glob(pattern)
-            if files:
-                latest_file = max(files, key=os.path.getctime)
-                filename = os.path.basename(latest_file)
-                try:
-                    total_page_nb = int(filename.split('_')[1].split('.')[0])
-                    print(f"Resuming from total page {total_page_nb}")
-                except:
-                    total_page_nb = detected_pages
+        last = store.last()
+        if last is not None:
+            start_id = last['category_id']
+            start_page = last['page_nb'] + 1
+            total_page_nb = last['pages_collected']
+            # Interrupted in (or right before) the shards of a saturated category
+            start_shards = vinted_shard_checkpoint(store.entries(), start_id)
+            if start_shards is not None:
+                k, page = start_shards['next']
+                print(f"Auto-resuming from checkpoint: category {start_id}, "
+                      + (f"shard {k} page {page}" if start_shards['plan'] else "planning its shards"))
             else:
-                total_page_nb = detected_pages
+                print(f"Auto-resuming from checkpoint: category {start_id}, page {start_page}")
+        else:
+            detected_cat_id, detected_cat_name, detected_pages = detect_last_position(brand_id)
+            if detected_cat_id is not None:
+                print(f"Auto-resuming from category {detected_cat_id} ({detected_cat_name})")
+                start_id = detected_cat_id
+                
+                # Get the total page number from the latest file
+                pattern = f"../data/vinted_tests/raw_data/{brand_id}_*.csv"
+                files = glob.glob(pattern)
+                if files:
+                    latest_file = max(files, key=os.path.getctime)
+                    filename = os.path.basename(latest_file)
+                    try:
+                        total_page_nb = int(filename.split('_')[1].split('.')[0])
+                        print(f"Resuming from total page {total_page_nb}")
+                    except:
+                        total_page_nb = detected_pages
+                else:
+                    total_page_nb = detected_pages
     
     # Create robust session
     session = create_robust_session()
@@ -822,15 +1661,24 @@ def full_vinted_cat_api_caller(brand_id, start_id=None, total_page_nb=None, auto
     
     # Initialize data
     if start_id == None:
-        full_df = pd.DataFrame()
+        store.start_fresh()
+        results = ResultAccumulator()
         pages_collected = 0
+    elif store.last() is not None:
+        # Replay checkpoint segments instead of reloading one big snapshot
+        results = ResultAccumulator(store.load())
+        pages_collected = store.last()['pages_collected']
+        print(f"Replayed {len(store)} checkpoint pages: {len(results)} items")
     else: 
         try:
-            full_df = pd.read_csv(f'../data/vinted_tests/raw_data/{brand_id}_{total_page_nb}.csv')
+            legacy_df = pd.read_csv(f'../data/vinted_tests/raw_data/{brand_id}_{total_page_nb}.csv')
+            results = ResultAccumulator(legacy_df)
             pages_collected = total_page_nb
-            print(f"Loaded existing data: {len(full_df)} items")
+            # Seed the checkpoint so later resumes don't need the legacy snapshot
+            store.append(legacy_df, category_id=int(start_id), page_nb=0, pages_collected=pages_collected)
+            print(f"Loaded existing data: {len(results)} items")
         except FileNotFoundError:
-            full_df = pd.DataFrame()
+            results = ResultAccumulator()
             pages_collected = 0
             print("No existing data found, starting fresh")
     
@@ -839,7 +1687,38 @@ def full_vinted_cat_api_caller(brand_id, start_id=None, total_page_nb=None, auto
     session_failures = 0
     max_session_failures = 5
     
+    def fetch_page(page_num, cat_id, shard=None):
+        """One catalog page (or shard page) through the retry / session-rotation path.
+        Returns (None, False) once new sessions keep failing."""
+        nonlocal session, consecutive_failures, session_failures
+        for retry in range(3):
+            temp_df, continuation = cat_api_caller(page_num, cat_id, brand_id, session, shard=shard)
+            if continuation and len(temp_df) > 0:
+                consecutive_failures = 0  # Reset failure counter
+                return temp_df, continuation
+            consecutive_failures += 1
+            print(f"Failed to get data for page {page_num} (attempt {retry + 1}/3)")
+            
+            # Failure backoff is enforced by the shared limiter on the next request
+            if retry < 2:  # Not the last retry
+                rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
+            elif consecutive_failures >= max_consecutive_failures:
+                print(f"Too many consecutive failures ({consecutive_failures}), creating new session...")
+                session = create_robust_session()
+                if session is None:
+                    session_failures += 1
+                    if session_failures >= max_session_failures:
+                        print("Too many session failures, stopping collection")
+                        return None, False
+                consecutive_failures = 0
+                # Likely blocked: cool down (doubling) before the new session is used
+                rate_limiter.on_throttle(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
+            else:
+                rate_limiter.on_error(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
+        return temp_df, continuation
+    
     # Track categories for better logging
+    vinted_taxonomy = get_vinted_taxonomy().frame
     total_categories = len(vinted_taxonomy)
     processed_categories = 0
     
@@ -858,65 +1737,88 @@ def full_vinted_cat_api_caller(brand_id, start_id=None, total_page_nb=None, auto
         category_success = False
         category_pages = 0
         
-        # Try to collect pages for this category
-        for page_num in range(1, 11):  # Max 10 pages per category
+        # Try to collect pages for this category (resume mid-category from the checkpoint)
+        first_page, start_page = start_page, 1
+        # Set when page 1 reports more listings than the page cap reaches (or the checkpoint says so)
+        shard_state, start_shards = start_shards, None
+        resumed_shards = shard_state is not None
+        for page_num in range(first_page if shard_state is None else VINTED_PAGE_CAP + 1, VINTED_PAGE_CAP + 1):
             print(f"Collecting Page {page_num} of {row['category_name']}")
-            
-            # Try the request with retries
-            for retry in range(3):
-                temp_df, continuation = cat_api_caller(page_num, row['category_id'], brand_id, session)
-                
-                if continuation and len(temp_df) > 0:
-                    full_df = pd.concat([full_df, temp_df])
-                    pages_collected += 1
-                    category_pages += 1
-                    
-                    # Save progress
-                    full_df.to_csv(f'../data/vinted_tests/raw_data/{brand_id}_{pages_collected}.csv')
-                    
-                    consecutive_failures = 0  # Reset failure counter
-                    category_success = True
-                    print(f"Successfully collected {len(temp_df)} items from page {page_num}")
-                    break
-                else:
-                    consecutive_failures += 1
-                    print(f"Failed to get data for page {page_num} (attempt {retry + 1}/3)")
-                    
-                    if retry < 2:  # Not the last retry
-                        time.sleep(random.uniform(5, 10))
-                    else:  # Last retry failed
-                        if consecutive_failures >= max_consecutive_failures:
-                            print(f"Too many consecutive failures ({consecutive_failures}), creating new session...")
-                            session = create_robust_session()
-                            if session is None:
-                                session_failures += 1
-                                if session_failures >= max_session_failures:
-                                    print("Too many session failures, stopping collection")
-                                    return full_df
-                            consecutive_failures = 0
-                            time.sleep(random.uniform(30, 60))
-                        else:
-                            time.sleep(random.uniform(15, 30))
+            temp_df, continuation = fetch_page(page_num, row['category_id'])
+            if temp_df is None:
+                return results.to_frame()
+            if continuation and len(temp_df) > 0:
+                results.add(temp_df)
+                pages_collected += 1
+                category_pages += 1
+                category_success = True
+                print(f"Successfully collected {len(temp_df)} items from page {page_num}")
+                meta = {}
+                if page_num == 1 and is_saturated(temp_df):
+                    # Saved with the page, so a resume goes on to the shards rather than pages 2..cap
+                    meta['saturated_total'] = temp_df.attrs['total_entries']
+                    shard_state = {'total': meta['saturated_total'], 'plan': None, 'next': (0, 1)}
+                # Save progress: write only this page as a new segment
+                store.append(temp_df, category_id=int(row['category_id']), page_nb=page_num, pages_collected=pages_collected, **meta)
             
             # If we got no items, we've reached the end for this category
             if not continuation:
                 print(f"No more items for {row['category_name']}")
                 break
+            if shard_state is not None:
+                break
+        
+        if shard_state is not None:
+            # Crawl the category again as price shards, each under the page cap
+            print(f"{row['category_name']} lists {shard_state['total']} items, beyond the {VINTED_PAGE_CAP}-page cap: sharding")
+            per_page = vinted_query_profile()['per_page']
+            shards = shard_state['plan']
+            if shards is None:
+                shards = plan_vinted_shards(brand_id, row['category_id'], session, total=shard_state['total'], per_page=per_page)
+                # The plan is checkpointed: fresh counts on resume could move the price boundaries
+                store.append(pd.DataFrame(), category_id=int(row['category_id']), page_nb=0, pages_collected=pages_collected,
+                             shard_plan=[[shard, count] for shard, count in shards])
+            # Listings already collected for this category: page 1, or the replayed shards when resuming
+            collected = results.to_frame() if resumed_shards else temp_df
+            if resumed_shards and 'category_id' in collected:
+                collected = collected[collected['category_id'] == row['category_id']]
+            seen_ids = set(_page_ids(collected).dropna().astype('int64')) if 'id' in collected else set()
+            first_k, first_shard_page = shard_state['next']
+            for k, (shard, count) in enumerate(shards):
+                if k < first_k:
+                    continue
+                shard_start = first_shard_page if k == first_k else 1
+                for shard_page in range(shard_start, min(VINTED_PAGE_CAP, math.ceil(count / per_page)) + 1):
+                    shard_df, continuation = fetch_page(shard_page, row['category_id'], shard=shard)
+                    if shard_df is None:
+                        return results.to_frame()
+                    if len(shard_df) == 0:
+                        print(f"No items on page {shard_page} of shard {shard} after retries, moving on")
+                        break
+                    # Drop listings already collected from page 1 or an earlier shard
+                    ids = _page_ids(shard_df)
+                    fresh = ~ids.isin(seen_ids)
+                    seen_ids.update(ids.dropna().astype('int64'))
+                    shard_df = shard_df[fresh.to_numpy()]
+                    results.add(shard_df)
+                    pages_collected += 1
+                    category_pages += 1
+                    store.append(shard_df, category_id=int(row['category_id']), page_nb=shard_page, shard=shard, pages_collected=pages_collected)
+                    category_success = True
+                    if not continuation or len(ids) < per_page:
+                        break
         
         if category_success:
             print(f"✅ Completed {row['category_name']} ({category_pages} pages)\n")
         else:
             print(f"❌ Failed to collect data for {row['category_name']} (no items found)\n")
-            
-        # Add delay between categories to avoid rate limiting
-        time.sleep(random.uniform(2, 5))
     
     print(f"\n🎯 Collection Summary:")
     print(f"Total categories processed: {processed_categories}/{total_categories}")
-    print(f"Total items collected: {len(full_df)}")
+    print(f"Total items collected: {len(results)}")
     print(f"Total pages collected: {pages_collected}")
             
-    return full_df
+    return results.to_frame()
 
 def handle_persistent_blocking(session):
     """
@@ -968,6 +1870,7 @@ def change_session_identity(session):
     
     # Clear cookies and start fresh
     session.cookies.clear()
+    release_curl_client(session)
     return True
 
 def change_request_pattern(session):
@@ -977,14 +1880,15 @@ def change_request_pattern(session):
         "accept-encoding": "gzip, deflate, br",
         "accept": "application/json, text/plain, */*",
         "connection": "keep-alive",
-        "host": "www.vinted.fr"
+        "host": urlsplit(VINTED_BASE_URL).netloc
     })
+    release_curl_client(session)
     return True
 
 def add_randomization(session):
     """Add randomization to avoid detection"""
-    # Add random delay
-    time.sleep(random.uniform(10, 20))
+    # Pause this identity: the next catalog request waits out the cooldown
+    rate_limiter.on_throttle(VINTED_CATALOG_ENDPOINT, _limiter_identity(session))
     
     # Add random headers
     random_headers = {
@@ -992,6 +1896,7 @@ def add_randomization(session):
         "x-forwarded-for": f"{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}"
     }
     session.headers.update(random_headers)
+    release_curl_client(session)
     return True
 
 def detect_last_position(brand_id):
@@ -1107,9 +2012,15 @@ def create_robust_session(max_attempts=5):
                     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
                     print(f"Using proxy with regular session: {proxy}")
             
+            # A saved warmed identity for this proxy skips the warm-up request
+            if attempt == 0 and hydrate_from_store(session, proxy):
+                print("Session created from saved identity")
+                return session
+            
             # Test the session
             if test_session(session):
                 print(f"Session created successfully on attempt {attempt + 1}")
+                save_session_identity(session)
                 return session
             else:
                 print(f"Session test failed on attempt {attempt + 1}")
@@ -1125,91 +2036,61 @@ def test_session(session):
     Test if a session can access Vinted
     """
     try:
-        response = session.get("https://www.vinted.fr/", timeout=30)
+        response = session.get(f"{VINTED_BASE_URL}/", timeout=30)
         return response.status_code == 200
     except:
         return False
 
 def test_proxy_connection(proxy):
     """
-    Test if the proxy connection is working using neutral endpoints.
+    Test if the proxy connection is working using a neutral no-content endpoint.
     """
-    try:
-        proxies = {'http': proxy, 'https': proxy}
-        session = requests.Session()
-        session.proxies.update(proxies)
-        session.verify = False
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-        # Fast no-content test
-        r1 = session.get("https://www.google.com/generate_204", timeout=10)
-        if r1.status_code not in (204, 200):
-            return False
-        # Check a JSON echo endpoint
-        r2 = session.get("https://httpbin.org/ip", timeout=10)
-        if r2.status_code != 200:
-            return False
-        return True
-    except Exception:
-        return False
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    ok, _ = check_proxy(proxy)
+    return ok
 
-# Global cache for working proxy
-_working_proxy_cache = None
-_proxy_cache_time = 0
-PROXY_CACHE_DURATION = 300  # 5 minutes
+PROXY_SOURCES = [
+    # Plain host:port per line
+    "https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt",
+    "https://raw.githubusercontent.com/roosterkid/openproxylist/main/HTTPS_RAW.txt",
+    "https://raw.githubusercontent.com/clarketm/proxy-list/master/proxy-list-raw.txt",
+]
+PROXY_POOL_PATH = STATE_DIR / 'proxy_pool.json'
 
 def _fetch_free_proxies() -> list[str]:
     """
-    Fetch a list of fresh free HTTP proxies from public sources.
-    Returns a list like ["host:port", ...].
+    Fetch a list of fresh free HTTP proxies from public sources (concurrently).
+    Returns a list like ["http://host:port", ...].
     """
-    sources = [
-        # Plain host:port per line
-        "https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt",
-        "https://raw.githubusercontent.com/roosterkid/openproxylist/main/HTTPS_RAW.txt",
-        "https://raw.githubusercontent.com/clarketm/proxy-list/master/proxy-list-raw.txt",
-    ]
-    results: list[str] = []
-    for url in sources:
-        try:
-            resp = requests.get(url, timeout=10)
-            if resp.status_code == 200 and resp.text:
-                for line in resp.text.splitlines():
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    if '://' in line:
-                        # Normalize http://host:port → host:port
-                        try:
-                            line = line.split('://', 1)[1]
-                        except Exception:
-                            continue
-                    # Filter out auth-bearing proxies (paid)
-                    if '@' in line:
-                        continue
-                    # Basic format host:port
-                    if ':' in line and line.count(':') == 1:
-                        results.append(line)
-        except Exception:
-            continue
-    # Deduplicate while preserving order
-    seen = set()
-    uniq: list[str] = []
-    for p in results:
-        if p not in seen:
-            seen.add(p)
-            uniq.append(p)
-    return uniq[:500]
-
-def invalidate_proxy_cache():
+    return fetch_proxy_lists(PROXY_SOURCES)
+
+_proxy_pool = None
+_proxy_pool_lock = threading.Lock()
+
+def get_proxy_pool() -> ProxyPool:
+    """Shared scored proxy pool, loaded from disk on first use."""
+    global _proxy_pool
+    with _proxy_pool_lock:
+        if _proxy_pool is None:
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            _proxy_pool = ProxyPool(PROXY_POOL_PATH, _fetch_free_proxies, checker=check_proxy)
+            atexit.register(_proxy_pool.save)
+        return _proxy_pool
+
+def report_proxy_result(proxy, ok: bool, latency: float | None = None) -> None:
+    """Feed a real request outcome into the proxy's EWMA score."""
+    if proxy:
+        get_proxy_pool().report(proxy, ok, latency)
+
+def invalidate_proxy_cache(proxy: str | None = None):
     """
-    Invalidate the proxy cache to force a new proxy test
+    Ban a blocked proxy (the last one handed out by default) so the next
+    get_working_proxy() returns the next-best one immediately
     """
-    global _working_proxy_cache, _proxy_cache_time
-    _working_proxy_cache = None
-    _proxy_cache_time = 0
-    print("Proxy cache invalidated")
+    get_proxy_pool().ban(proxy)
+    print(f"Proxy banned: {proxy or 'last handed out'}")
 
 def test_direct_connection():
     # Disabled: proxy-only mode
@@ -1217,48 +2098,42 @@ def test_direct_connection():
 
 def get_working_proxy(force_test=False):
     """
-    Get a working free proxy with caching. Paid proxies and auth-based endpoints are ignored.
+    Best-ranked working free proxy from the pool. Paid proxies and auth-based endpoints are ignored.
+    With force_test, the current best is re-checked before being returned.
     """
-    global _working_proxy_cache, _proxy_cache_time
-    current_time = time.time()
-
-    # Return cached proxy if it's still valid
-    if not force_test and _working_proxy_cache and (current_time - _proxy_cache_time) < PROXY_CACHE_DURATION:
-        print(f"Using cached working proxy: {_working_proxy_cache}")
-        return _working_proxy_cache
-
-    candidates = _fetch_free_proxies()
-    if not candidates:
-        print("❌ Could not fetch free proxies.")
+    if not VINTED_USE_PROXIES:
         return None
-
-    # Try a handful quickly
-    max_to_try = 20
-    for raw in candidates[:max_to_try]:
-        proxy = raw if raw.startswith('http') else f"http://{raw}"
-        print(f"Testing free proxy: {proxy}")
-        if test_proxy_connection(proxy):
-            _working_proxy_cache = proxy
-            _proxy_cache_time = current_time
-            print(f"Cached working proxy: {proxy}")
-            return proxy
-
-    print("❌ No working free proxies found right now")
-    _working_proxy_cache = None
-    return None
-
+    pool = get_proxy_pool()
+    proxy = pool.best()
+    while force_test and proxy:
+        ok, elapsed = check_proxy(proxy)
+        pool.report(proxy, ok, elapsed, ban=not ok)
+        if ok:
+            break
+        proxy = pool.best()
+    if proxy is None:
+        print("❌ No working free proxies found right now")
+    return proxy
     
     
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Vinted brand/category collector')
     parser.add_argument('--brand', type=int, help='Brand ID (required for targeted run)')
     parser.add_argument('--cats', type=str, help='Comma-separated category IDs or "all"')
-    parser.add_argument('--pages', type=int, default=10, help='Max pages per category')
+    parser.add_argument('--pages', type=int, default=VINTED_PAGE_CAP, help='Max pages per category (per price shard in full mode)')
     parser.add_argument('--mode', type=str, default='delta', choices=['delta', 'full'], help='Collection mode')
     parser.add_argument('--use-playwright', action='store_true', help='Use Playwright fetch path')
     parser.add_argument('--order', type=str, default=None, help='Order param (e.g., newest_first)')
     parser.add_argument('--auto', action='store_true', help='Run legacy auto-resume over full taxonomy')
+    parser.add_argument('--concurrency', type=int, default=1, help='Concurrent catalog requests (asyncio engine when > 1)')
+    parser.add_argument('--per-host-concurrency', type=int, default=None,
+                        help='Cap on concurrent requests per host (defaults to --concurrency)')
+    parser.add_argument('--query-profile', choices=['listing-lean', 'full'], default=VINTED_QUERY_PROFILE,
+                        help='listing-lean skips the raw response archive')
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    if args.profile:
+        profiler.start(cprofile=args.cprofile)
 
     if not test_vinted_connection():
         print("Cannot connect directly via basic checks; proceeding with Playwright if available...")
@@ -1275,8 +2150,11 @@ if __name__ == '__main__':
             print('Please provide --brand and --cats (comma-separated) or use --auto')
             exit(1)
         cats = parse_category_list_arg(args.cats)
-        df = run_brand_category_collection(args.brand, cats, pages=args.pages, mode=args.mode, use_playwright=args.use_playwright or True, order=args.order)
+        df = run_brand_category_collection(args.brand, cats, pages=args.pages, mode=args.mode, use_playwright=args.use_playwright or True, order=args.order, concurrency=args.concurrency, per_host_concurrency=args.per_host_concurrency, query_profile=args.query_profile)
         print(f"Completed targeted run. Total items collected: {len(df)}")
+    print_time_breakdown()
+    write_run_metrics('vinted', LOGS_DIR / 'metrics')
+    profiler.finish(LOGS_DIR / 'profile', 'vinted')
 
 
 
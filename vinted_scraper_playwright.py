@@ -1,5 +1,11 @@
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+import asyncio
+import concurrent.futures
+import contextlib
 import json
+import queue
+import threading
 import time
 import os
 import random
@@ -9,31 +15,132 @@ from pathlib import Path
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
-VINTED_URL = "https://www.vinted.fr/"
-API_TEST = "https://www.vinted.fr/api/v2/catalog/items?page=1&per_page=10"
+# VINTED_BASE_URL points every request at another host (e.g. mock_marketplace.py)
+VINTED_URL = os.getenv('VINTED_BASE_URL', 'https://www.vinted.fr').rstrip('/') + '/'
+API_TEST = f"{VINTED_URL}api/v2/catalog/items?page=1&per_page=10"
 
 BRIGHT_PROXY = os.getenv('VINTED_PROXY_HTTPS') or os.getenv('VINTED_PROXY_HTTP')
 
 
+def build_proxy_conf(proxy: str | None) -> dict | None:
+    """Playwright proxy settings from a 'user:pass@host:port' style proxy URL."""
+    if not proxy:
+        return None
+    raw = proxy
+    if raw.startswith('http://'):
+        raw = raw[len('http://'):]
+    user = None
+    password = None
+    if '@' in raw:
+        creds, host = raw.split('@', 1)
+        if ':' in creds:
+            user, password = creds.split(':', 1)
+        proxy_server = 'http://' + host
+    else:
+        proxy_server = 'http://' + raw
+    proxy_conf = {"server": proxy_server}
+    if user:
+        proxy_conf.update({"username": user, "password": password})
+    return proxy_conf
+
+
+def catalog_api_url(page_nb: int, cat_id: int, brand_id: int, per_page: int = 96) -> str:
+    # Build query just like the requests version
+    query = {
+        "page": str(page_nb),
+        "per_page": str(per_page),
+        "time": str(int(time.time())),
+        "search_text": "",
+        "catalog_ids": str(cat_id),
+        "order": "relevance",
+        "catalog_from": "0",
+        "size_ids": "",
+        "brand_ids": str(brand_id),
+        "status_ids": "",
+        "color_ids": "",
+        "material_ids": "",
+        "currency": "EUR",
+        "disable_search_saving": "false"
+    }
+    return f"{VINTED_URL}api/v2/catalog/items?{urlencode(query)}"
+
+
+def catalog_page_url(cat_id: int, brand_id: int) -> str:
+    return f"{VINTED_URL}catalog?catalog[]={cat_id}&brand_ids[]={brand_id}"
+
+
+# Executed inside the page so requests carry the browser's TLS/HTTP2/cookies.
+# Fetches every URL with at most `parallelism` in flight and returns all
+# results, in input order, in a single round-trip.
+BATCH_FETCH_SCRIPT = """
+    async ([urls, useMobile, parallelism]) => {
+      const getCookie = (name) => {
+        const match = document.cookie.split('; ').find(r => r.startsWith(name + '='));
+        return match ? decodeURIComponent(match.split('=')[1]) : null;
+      };
+      const anon = getCookie('anon_id');
+      const csrf = (document.querySelector('meta[name="csrf-token"]')||{}).content || getCookie('csrf');
+      const headers = {
+        'accept': 'application/json, text/plain, */*',
+        'x-money-object': 'true'
+      };
+      if (anon) headers['x-anon-id'] = anon;
+      if (csrf) headers['x-csrf-token'] = csrf;
+      if (useMobile) {
+        headers['user-agent'] = 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36';
+        headers['sec-ch-ua'] = '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"';
+        headers['sec-ch-ua-mobile'] = '?1';
+        headers['sec-ch-ua-platform'] = '"Android"';
+      }
+      const results = new Array(urls.length);
+      let next = 0;
+      const worker = async () => {
+        while (next < urls.length) {
+          const i = next++;
+          try {
+            const r = await fetch(urls[i], { method: 'GET', headers, credentials: 'include' });
+            const text = await r.text();
+            let json = {};
+            try { json = JSON.parse(text); } catch (e) {}
+            // Body text is only kept for diagnostics on failures
+            results[i] = { status: r.status, json, text: r.status === 200 ? '' : text.slice(0, 2000) };
+          } catch (e) {
+            results[i] = { status: 0, json: {}, text: String(e) };
+          }
+        }
+      };
+      await Promise.all(Array.from({ length: Math.max(1, Math.min(parallelism, urls.length)) }, worker));
+      return results;
+    }
+"""
+
+
+def fetch_result_to_data(result: dict) -> dict:
+    status = result.get('status', 0)
+    if status != 200:
+        # Return status and body for diagnostics
+        return {"status": status, "error": True, "json": result.get('json'), "text": result.get('text', '')}
+    return result.get('json', {})
+
+
+def cookies_ua_session(cookies: list[dict], user_agent: str) -> requests.Session:
+    """requests.Session carrying a browser context's cookies and user agent."""
+    sess = requests.Session()
+    for c in cookies:
+        sess.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path', '/'))
+    sess.headers.update({
+        'accept': 'application/json, text/plain, */*',
+        'accept-language': 'fr-FR,fr;q=0.9,en;q=0.8',
+        'user-agent': user_agent,
+        'x-money-object': 'true',
+        'referer': VINTED_URL
+    })
+    return sess
+
+
 def launch_and_get_session(proxy=None, headless=True):
     with sync_playwright() as p:
-        proxy_conf = None
-        if proxy:
-            raw = proxy
-            if raw.startswith('http://'):
-                raw = raw[len('http://'):]
-            user = None
-            password = None
-            if '@' in raw:
-                creds, host = raw.split('@', 1)
-                if ':' in creds:
-                    user, password = creds.split(':', 1)
-                proxy_server = 'http://' + host
-            else:
-                proxy_server = 'http://' + raw
-            proxy_conf = {"server": proxy_server}
-            if user:
-                proxy_conf.update({"username": user, "password": password})
+        proxy_conf = build_proxy_conf(proxy)
 
         browser = p.chromium.launch(headless=headless, args=["--ignore-certificate-errors"])
         context = browser.new_context(proxy=proxy_conf, ignore_https_errors=True)
@@ -78,120 +185,66 @@ def test_api_fetch(session):
 
 
 class PlaywrightVintedClient:
-    def __init__(self, proxy: str | None = None, headless: bool = True, use_mobile_headers: bool = False):
+    def __init__(self, proxy: str | None = None, headless: bool = True, use_mobile_headers: bool = False,
+                 identity_store=None):
         self._pw = None
         self._browser = None
         self._context = None
         self._page = None
         self._use_mobile_headers = use_mobile_headers
+        self._warmed: set[tuple[int, int]] = set()
 
-        self._proxy_conf = None
-        if proxy:
-            raw = proxy
-            if raw.startswith('http://'):
-                raw = raw[len('http://'):]
-            user = None
-            password = None
-            if '@' in raw:
-                creds, host = raw.split('@', 1)
-                if ':' in creds:
-                    user, password = creds.split(':', 1)
-                proxy_server = 'http://' + host
-            else:
-                proxy_server = 'http://' + raw
-            self._proxy_conf = {"server": proxy_server}
-            if user:
-                self._proxy_conf.update({"username": user, "password": password})
-
-        # Launch & warm-up
+        self._proxy_conf = build_proxy_conf(proxy)
+
+        # Launch, then hydrate from a saved storage_state or warm up from scratch
+        identity_name = f"playwright-{proxy or 'direct'}"
+        identity = identity_store.load(identity_name) if identity_store is not None else None
         self._pw = sync_playwright().start()
         self._browser = self._pw.chromium.launch(headless=headless, args=["--ignore-certificate-errors"])
-        self._context = self._browser.new_context(proxy=self._proxy_conf, ignore_https_errors=True)
+        self._context = self._browser.new_context(
+            proxy=self._proxy_conf, ignore_https_errors=True,
+            storage_state=identity['storage_state'] if identity else None)
         self._page = self._context.new_page()
 
-        self._page.goto(VINTED_URL, wait_until='domcontentloaded', timeout=60000)
-        time.sleep(random.uniform(2, 4))
-        self._page.goto(VINTED_URL + 'catalog', wait_until='domcontentloaded', timeout=60000)
-        time.sleep(random.uniform(1, 3))
+        if identity is None:
+            self._page.goto(VINTED_URL, wait_until='domcontentloaded', timeout=60000)
+            time.sleep(random.uniform(2, 4))
+            self._page.goto(VINTED_URL + 'catalog', wait_until='domcontentloaded', timeout=60000)
+            time.sleep(random.uniform(1, 3))
+            if identity_store is not None:
+                identity_store.save(identity_name, storage_state=self._context.storage_state(), proxy=proxy)
 
-    def fetch_catalog_items(self, page_nb: int, cat_id: int, brand_id: int, per_page: int = 96) -> dict:
-        # Navigate to specific catalog/brand page to ensure proper cookies/tokens
+    def _warm_catalog(self, cat_id: int, brand_id: int) -> None:
+        # Navigate to the catalog/brand page once per catalog to get proper cookies/tokens
+        if (cat_id, brand_id) in self._warmed:
+            return
         try:
-            target = f"{VINTED_URL}catalog?catalog[]={cat_id}&brand_ids[]={brand_id}"
-            self._page.goto(target, wait_until='domcontentloaded', timeout=60000)
+            self._page.goto(catalog_page_url(cat_id, brand_id), wait_until='domcontentloaded', timeout=60000)
             time.sleep(random.uniform(1, 2))
         except Exception:
             pass
+        self._warmed.add((cat_id, brand_id))
 
-        # Build query just like the requests version
-        query = {
-            "page": str(page_nb),
-            "per_page": str(per_page),
-            "time": str(int(time.time())),
-            "search_text": "",
-            "catalog_ids": str(cat_id),
-            "order": "relevance",
-            "catalog_from": "0",
-            "size_ids": "",
-            "brand_ids": str(brand_id),
-            "status_ids": "",
-            "color_ids": "",
-            "material_ids": "",
-            "currency": "EUR",
-            "disable_search_saving": "false"
-        }
-        url = API_TEST.split('?')[0].replace('/api/v2/catalog/items', '/api/v2/catalog/items')
-        final_url = f"https://www.vinted.fr/api/v2/catalog/items?{urlencode(query)}"
-
-        # Execute fetch within the page context to preserve TLS/HTTP2/cookies
-        script = """
-            (url, useMobile) => {
-              const getCookie = (name) => {
-                const match = document.cookie.split('; ').find(r => r.startsWith(name + '='));
-                return match ? decodeURIComponent(match.split('=')[1]) : null;
-              };
-              const anon = getCookie('anon_id');
-              const csrf = (document.querySelector('meta[name="csrf-token"]')||{}).content || getCookie('csrf');
-              const headers = {
-                'accept': 'application/json, text/plain, */*',
-                'x-money-object': 'true'
-              };
-              if (anon) headers['x-anon-id'] = anon;
-              if (csrf) headers['x-csrf-token'] = csrf;
-              if (useMobile) {
-                headers['user-agent'] = 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36';
-                headers['sec-ch-ua'] = '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"';
-                headers['sec-ch-ua-mobile'] = '?1';
-                headers['sec-ch-ua-platform'] = '"Android"';
-              }
-              return fetch(url, {
-                method: 'GET',
-                headers,
-                credentials: 'include'
-              }).then(async r => ({ status: r.status, json: await r.json().catch(() => ({})), text: await r.text().catch(() => '') }))
-            }
+    def fetch_catalog_items_batch(self, targets: list[tuple[int, int, int]], per_page: int = 96,
+                                  parallelism: int = 4) -> list[dict]:
+        """Fetch many (cat_id, brand_id, page_nb) pages from inside the page in one round-trip.
+
+        Results are in input order, each shaped like fetch_catalog_items().
         """
-        result = self._page.evaluate(script, final_url, self._use_mobile_headers)
-        status = result.get('status', 0)
-        if status != 200:
-            # Return status and body for diagnostics
-            return {"status": status, "error": True, "json": result.get('json'), "text": result.get('text', '')}
-        return result.get('json', {})
+        if not targets:
+            return []
+        self._warm_catalog(targets[0][0], targets[0][1])
+        urls = [catalog_api_url(page_nb, cat_id, brand_id, per_page) for cat_id, brand_id, page_nb in targets]
+        results = self._page.evaluate(BATCH_FETCH_SCRIPT, [urls, self._use_mobile_headers, parallelism])
+        return [fetch_result_to_data(r) for r in results]
+
+    def fetch_catalog_items(self, page_nb: int, cat_id: int, brand_id: int, per_page: int = 96) -> dict:
+        return self.fetch_catalog_items_batch([(cat_id, brand_id, page_nb)], per_page=per_page)[0]
 
     def get_cookies_and_ua_session(self):
         cookies = self._context.cookies()
         user_agent = self._page.evaluate("() => navigator.userAgent")
-        sess = requests.Session()
-        for c in cookies:
-            sess.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path', '/'))
-        sess.headers.update({
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en;q=0.8',
-            'user-agent': user_agent,
-            'x-money-object': 'true',
-            'referer': VINTED_URL
-        })
-        return sess
+        return cookies_ua_session(cookies, user_agent)
 
     def close(self):
         try:
@@ -202,6 +255,254 @@ class PlaywrightVintedClient:
                 self._pw.stop()
 
 
+class _PoolSlot:
+    """One isolated browser context (own cookies, optional own proxy) of the pool."""
+    def __init__(self, index: int, proxy: str | None):
+        self.index = index
+        self.proxy = proxy
+        self.context = None
+        self.page = None
+        self.failures = 0
+        # (cat_id, brand_id) catalog pages already visited by this context
+        self.warmed: set[tuple[int, int]] = set()
+
+
+class PlaywrightVintedPool:
+    """One Chromium process hosting `size` isolated contexts leased to workers.
+
+    Playwright runs on its own thread and event loop, so any number of caller
+    threads can share the pool: each call leases an idle context, runs on the
+    loop, and returns it. Requests on different contexts run concurrently.
+    A context that errors or gets a non-200 `max_failures` times in a row is
+    closed and re-warmed on its own; the browser and the other contexts are
+    left alone. `proxies` are assigned round-robin, one per context.
+    With an identity_store, each context starts from its saved storage_state
+    when one is fresh and skips the warm-up navigations; a recycled
+    context's saved state is discarded. Every call on the loop is bounded by
+    `call_timeout`; a context whose call times out is recycled when released.
+    """
+
+    def __init__(self, size: int = 4, proxies: list[str | None] | None = None, headless: bool = True,
+                 use_mobile_headers: bool = False, max_failures: int = 1, lease_timeout: float = 300,
+                 identity_store=None, call_timeout: float = 180):
+        self.size = max(1, int(size))
+        self._identity_store = identity_store
+        self._use_mobile_headers = use_mobile_headers
+        self._max_failures = max(1, max_failures)
+        self._lease_timeout = lease_timeout
+        self._call_timeout = call_timeout
+        proxies = list(proxies or [None])
+        self._slots = [_PoolSlot(i, proxies[i % len(proxies)]) for i in range(self.size)]
+        self._idle: queue.Queue = queue.Queue()
+        self._pw = None
+        self._browser = None
+        self._closed = False
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='vinted-playwright-pool', daemon=True)
+        self._thread.start()
+        try:
+            self._call(self._start(headless))
+        except Exception:
+            self.close()
+            raise
+
+    # -- event loop plumbing -------------------------------------------------
+
+    def _call(self, coro, timeout: float | None = None):
+        timeout = self._call_timeout if timeout is None else timeout
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Playwright call did not finish within {timeout:g}s") from None
+
+    def _call_on(self, slot: _PoolSlot, coro):
+        """_call for work on a leased context; a timeout marks it for recycling."""
+        try:
+            return self._call(coro)
+        except TimeoutError:
+            # The cancelled call may have left the page mid-navigation
+            slot.failures = self._max_failures
+            raise
+
+    async def _start(self, headless: bool) -> None:
+        self._pw = await async_playwright().start()
+        self._browser = await self._pw.chromium.launch(headless=headless, args=["--ignore-certificate-errors"])
+        warmed = await asyncio.gather(*[self._open(slot) for slot in self._slots], return_exceptions=True)
+        if all(isinstance(res, BaseException) for res in warmed):
+            raise RuntimeError(f"No Playwright context could be opened: {warmed[0]}")
+        for slot, res in zip(self._slots, warmed):
+            if isinstance(res, BaseException):
+                # Stays in rotation; re-warmed when first leased
+                print(f"Playwright context {slot.index} failed to warm up: {res}")
+                slot.failures = self._max_failures
+            self._idle.put(slot)
+
+    def _identity_name(self, slot: _PoolSlot) -> str:
+        return f"playwright-{slot.index}-{slot.proxy or 'direct'}"
+
+    async def _open(self, slot: _PoolSlot) -> None:
+        store = self._identity_store
+        identity = store.load(self._identity_name(slot)) if store is not None else None
+        slot.context = await self._browser.new_context(
+            proxy=build_proxy_conf(slot.proxy), ignore_https_errors=True,
+            storage_state=identity['storage_state'] if identity else None)
+        slot.page = await slot.context.new_page()
+        if identity is None:
+            await slot.page.goto(VINTED_URL, wait_until='domcontentloaded', timeout=60000)
+            await asyncio.sleep(random.uniform(2, 4))
+            await slot.page.goto(VINTED_URL + 'catalog', wait_until='domcontentloaded', timeout=60000)
+            await asyncio.sleep(random.uniform(1, 3))
+            if store is not None:
+                store.save(self._identity_name(slot), storage_state=await slot.context.storage_state(),
+                           proxy=slot.proxy)
+        slot.failures = 0
+
+    async def _recycle(self, slot: _PoolSlot) -> None:
+        if self._identity_store is not None:
+            # The saved state is what got this context blocked
+            self._identity_store.delete(self._identity_name(slot))
+        try:
+            if slot.context is not None:
+                await slot.context.close()
+        except Exception:
+            pass
+        slot.context = None
+        slot.page = None
+        slot.warmed = set()
+        try:
+            await self._open(slot)
+        except Exception:
+            slot.failures = self._max_failures
+            raise
+
+    async def _fetch_batch(self, slot: _PoolSlot, targets: list[tuple[int, int, int]], per_page: int,
+                           parallelism: int) -> list[dict]:
+        cat_id, brand_id, _ = targets[0]
+        if (cat_id, brand_id) not in slot.warmed:
+            # Navigate to the catalog/brand page once to ensure proper cookies/tokens
+            try:
+                await slot.page.goto(catalog_page_url(cat_id, brand_id), wait_until='domcontentloaded', timeout=60000)
+                await asyncio.sleep(random.uniform(1, 2))
+            except Exception:
+                pass
+            slot.warmed.add((cat_id, brand_id))
+        urls = [catalog_api_url(page_nb, c, b, per_page) for c, b, page_nb in targets]
+        results = await slot.page.evaluate(BATCH_FETCH_SCRIPT, [urls, self._use_mobile_headers, parallelism])
+        return [fetch_result_to_data(r) for r in results]
+
+    async def _cookies_and_ua(self, slot: _PoolSlot):
+        cookies = await slot.context.cookies()
+        user_agent = await slot.page.evaluate("() => navigator.userAgent")
+        return cookies, user_agent
+
+    # -- leasing ---------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def lease(self):
+        """Borrow an idle context for the duration of the block."""
+        if self._closed:
+            raise RuntimeError("Playwright pool is closed")
+        try:
+            slot = self._idle.get(timeout=self._lease_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No Playwright context free after {self._lease_timeout}s") from None
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    def _needs_recycle(self, slot: _PoolSlot) -> bool:
+        return slot.context is None or slot.failures >= self._max_failures
+
+    def _ensure_ready(self, slot: _PoolSlot) -> None:
+        if self._needs_recycle(slot):
+            print(f"Recycling Playwright context {slot.index} (failures={slot.failures})")
+            self._call_on(slot, self._recycle(slot))
+
+    def _release(self, slot: _PoolSlot) -> None:
+        if self._closed:
+            return
+        if self._needs_recycle(slot):
+            try:
+                self._ensure_ready(slot)
+            except Exception as e:
+                # Keep the slot in rotation; its next lease retries the warm-up
+                print(f"Playwright context {slot.index} recycle failed: {e}")
+        self._idle.put(slot)
+
+    # -- public API (same surface as PlaywrightVintedClient) -------------------
+
+    def _run_batch(self, slot: _PoolSlot, targets, per_page: int, parallelism: int) -> list[dict]:
+        self._ensure_ready(slot)
+        try:
+            results = self._call_on(slot, self._fetch_batch(slot, targets, per_page, parallelism))
+        except TimeoutError:
+            raise
+        except Exception:
+            slot.failures += 1
+            raise
+        if any(isinstance(r, dict) and r.get('error') for r in results):
+            slot.failures += 1
+        else:
+            slot.failures = 0
+        return results
+
+    def fetch_catalog_items_batch(self, targets: list[tuple[int, int, int]], per_page: int = 96,
+                                  parallelism: int = 4) -> list[dict]:
+        """Fetch many (cat_id, brand_id, page_nb) pages with in-page fetch() calls.
+
+        One leased context warms up once (a single catalog navigation) and runs
+        the whole batch with at most `parallelism` requests in flight. Results
+        come back in input order, each shaped like fetch_catalog_items().
+        """
+        if not targets:
+            return []
+        with self.lease() as slot:
+            return self._run_batch(slot, list(targets), per_page, parallelism)
+
+    def fetch_catalog_items(self, page_nb: int, cat_id: int, brand_id: int, per_page: int = 96) -> dict:
+        return self.fetch_catalog_items_batch([(cat_id, brand_id, page_nb)], per_page=per_page)[0]
+
+    def get_cookies_and_ua_session(self):
+        with self.lease() as slot:
+            self._ensure_ready(slot)
+            cookies, user_agent = self._call_on(slot, self._cookies_and_ua(slot))
+        sess = cookies_ua_session(cookies, user_agent)
+        if slot.proxy:
+            proxy = slot.proxy if slot.proxy.startswith('http') else 'http://' + slot.proxy
+            sess.proxies.update({'http': proxy, 'https': proxy})
+        return sess
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        async def _shutdown():
+            for slot in self._slots:
+                with contextlib.suppress(Exception):
+                    if slot.context is not None:
+                        await slot.context.close()
+            with contextlib.suppress(Exception):
+                if self._browser is not None:
+                    await self._browser.close()
+            with contextlib.suppress(Exception):
+                if self._pw is not None:
+                    await self._pw.stop()
+
+        try:
+            if self._loop.is_running():
+                self._call(_shutdown(), timeout=60)
+        except Exception:
+            pass
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+
+
 if __name__ == '__main__':
     proxy = BRIGHT_PROXY
     print(f"Using proxy: {proxy}")